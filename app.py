@@ -1,47 +1,565 @@
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
-import requests
+import asyncio
+import codecs
 import datetime
-import re
-from dateparser.search import search_dates
-from recurrent import RecurringEvent
-from dateutil.rrule import DAILY, WEEKLY, MONTHLY
-from script import _build_task_from_text, _send_task_to_habitica, _check_habitica_connection
+import functools
+import json
+import os
+import zoneinfo
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Header, HTTPException, Request
+from starlette.requests import ClientDisconnect
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+from typing import Annotated
+from pydantic import AfterValidator, BaseModel, Field, model_validator
+from script import (_build_task_from_text, _build_tasks_from_texts, _send_task_to_habitica_async,
+                    _habitica_is_up, BATCH_CONCURRENCY,
+                    _start_health_refresher, _stop_health_refresher, _health_stats,
+                    _close_client, _close_async_client, _task_parser, warm_up,
+                    _startup_stats, render_metrics, _rate_limiter, _normalize_text, _today,
+                    _explain_tasks, PARSE_PROCESSES, _get_parse_pool, _in_worker,
+                    _merge_worker_stats, _close_parse_pool, _chunked, _user_cache, _dumps, parse_context,
+                    _user_parse_context_async, PARSE_LANGUAGES, negotiate_language,
+                    _with_language)
+from jobs import TaskQueue
+from idempotency import make_store, KEY_TTL, DEDUP_WINDOW
 # -----------------------------------------------------------------------------
 # FASTAPI APP
 # -----------------------------------------------------------------------------
 
+# Parsing is CPU-bound; run it off the event loop so slow parses don't stall
+# the in-flight Habitica requests. With PARSE_PROCESSES set it runs in a pool
+# of worker processes instead, so parsing isn't limited to one core.
+_parse_executor = ThreadPoolExecutor(max_workers=int(os.environ.get("PARSE_WORKERS", "4")),
+                                     thread_name_prefix="parse")
+
+async def _run_parse(func, arg):
+    """
+    Run func(arg) in the parser pool, or in the parse executor without one.
+    
+    A pool worker's parse metrics and cache counters come back with the
+    result and are merged here, so /metrics and /parse_cache cover the pool.
+    """
+    loop = asyncio.get_running_loop()
+    if not PARSE_PROCESSES:
+        return await loop.run_in_executor(_parse_executor, func, arg)
+    result, stats = await loop.run_in_executor(_get_parse_pool(), _in_worker, func, arg)
+    _merge_worker_stats(stats)
+    return result
+
+async def _run_parse_chunked(func, texts):
+    """Run a list function over texts, split into chunks across the parser pool."""
+    if not PARSE_PROCESSES:
+        return await _run_parse(func, texts)
+    chunks = await asyncio.gather(*(_run_parse(func, chunk) for chunk in _chunked(texts)))
+    return [result for chunk in chunks for result in chunk]
+
+async def _parse_text(text, context=None):
+    """Parse one text off the event loop, on context's clock."""
+    return await _run_parse(functools.partial(_build_task_from_text, context=context), text)
+
+async def _parse_texts(texts, context=None):
+    """Run _build_tasks_from_texts off the event loop."""
+    return await _run_parse_chunked(functools.partial(_build_tasks_from_texts, context=context),
+                                    texts)
+
+async def _explain_texts(texts, context=None):
+    """Run explain_task over texts off the event loop."""
+    return await _run_parse_chunked(functools.partial(_explain_tasks, context=context), texts)
+
+async def _request_context(user_id, api_token, timezone=None, language=None):
+    """
+    The clock a request's texts are parsed on: the timezone it names, or
+    else the one in the user's cached Habitica preferences; and their
+    language (None: the default).
+    """
+    if timezone:
+        context = parse_context(zoneinfo.ZoneInfo(timezone))
+    else:
+        context = await _user_parse_context_async(user_id, api_token)
+    return _with_language(context, language)
+
+def _request_language(language, accept_language):
+    """
+    The language of a request's texts: its "language" field, or else the
+    enabled language its Accept-Language header prefers; None for the default.
+    """
+    return language or negotiate_language(accept_language)
+
+# Run warm_up() on startup so the first request doesn't pay for imports
+# and locale loading
+WARMUP = os.environ.get("NLP_WARMUP", "0") == "1"
+
+# Answer /add_task with 202 and a job id, and submit tasks in the background
+TASK_QUEUE = os.environ.get("TASK_QUEUE", "0") == "1"
+_task_queue = None
+
+# Successful /add_task responses, replayed for repeated requests
+_response_store = make_store()
+# Futures of submissions in progress, by idempotency key, so concurrent
+# duplicates wait for the first instead of submitting again
+_inflight = {}
+
+@asynccontextmanager
+async def lifespan(app):
+    """Keep the cached Habitica health state fresh while the app is running."""
+    global _task_queue
+    _start_health_refresher()
+    if PARSE_PROCESSES:
+        # Start and warm the parser processes before taking traffic
+        await asyncio.get_running_loop().run_in_executor(_parse_executor, _get_parse_pool)
+    if WARMUP:
+        await asyncio.get_running_loop().run_in_executor(_parse_executor, warm_up)
+    if TASK_QUEUE:
+        _task_queue = TaskQueue()
+        _task_queue.start()
+    yield
+    if _task_queue:
+        _task_queue.stop()
+    await _stop_health_refresher()
+    _close_parse_pool()
+    await _close_async_client()
+    _close_client()
+
+class _JSONResponse(JSONResponse):
+    """JSONResponse encoded with orjson when it is installed."""
+    
+    def render(self, content):
+        return _dumps(content)
+
 app = FastAPI(title="Habitica NLP Task API",
               description="Convert natural language into Habitica tasks",
-              version="1.0.0")
+              version="1.0.0",
+              lifespan=lifespan,
+              default_response_class=_JSONResponse)
+
+# Largest list accepted by /add_tasks
+MAX_BATCH_SIZE = int(os.environ.get("MAX_BATCH_SIZE", "100"))
+# Longest line accepted by /add_tasks/stream, in characters
+STREAM_MAX_LINE = int(os.environ.get("STREAM_MAX_LINE", "4096"))
+# How created tasks are reported: "full" (the task as Habitica returned it),
+# "trimmed" (only TRIMMED_FIELDS of it) or "raw" (/add_task answers with
+# Habitica's response body, passed through without re-encoding)
+RESPONSE_MODE = os.environ.get("HABITICA_RESPONSE_MODE", "full")
+TRIMMED_FIELDS = ("id", "type", "text", "notes", "priority", "date", "value", "up", "down",
+                  "frequency", "everyX", "repeat", "daysOfMonth", "tags")
+
+def _check_timezone(name):
+    """Reject timezone names the IANA database doesn't know."""
+    if name is not None:
+        try:
+            zoneinfo.ZoneInfo(name)
+        except (zoneinfo.ZoneInfoNotFoundError, ValueError):
+            raise ValueError(f"unknown timezone {name!r}")
+    return name
+
+# IANA timezone name, e.g. "Europe/Warsaw"
+TimezoneName = Annotated[str | None, AfterValidator(_check_timezone)]
+
+def _check_language(code):
+    """Reject languages that aren't in PARSE_LANGUAGES."""
+    if code is not None and code not in PARSE_LANGUAGES:
+        raise ValueError(f"language {code!r} is not enabled; use one of {PARSE_LANGUAGES}")
+    return code
+
+# Language of the texts, one of PARSE_LANGUAGES, e.g. "pl"
+LanguageCode = Annotated[str | None, AfterValidator(_check_language)]
 
 class TaskRequest(BaseModel):
     user_id: str
     api_token: str
     text: str
+    timezone: TimezoneName = None
+    language: LanguageCode = None
+
+class BatchTaskRequest(BaseModel):
+    user_id: str
+    api_token: str
+    texts: list[str] = Field(min_length=1, max_length=MAX_BATCH_SIZE)
+    timezone: TimezoneName = None
+    language: LanguageCode = None
+
+class ParseRequest(BaseModel):
+    text: str | None = None
+    texts: list[str] | None = Field(default=None, min_length=1, max_length=MAX_BATCH_SIZE)
+    timezone: TimezoneName = None
+    now: datetime.datetime | None = None
+    language: LanguageCode = None
+
+    @model_validator(mode="after")
+    def _one_of_text_or_texts(self):
+        if (self.text is None) == (self.texts is None):
+            raise ValueError("give exactly one of 'text' or 'texts'")
+        return self
 
 @app.get("/status")
-def status():
-    """Check if Habitica API is up."""
-    if _check_habitica_connection():
+async def status():
+    """Check if Habitica API is up (served from the cached health state)."""
+    if _habitica_is_up(refresh_if_stale=False):
         return {"isUp": True}
     else:
         raise HTTPException(status_code=503, detail="Habitica API unavailable")
 
+@app.get("/health")
+async def health():
+    """Expose health cache hit/miss counters, staleness and breaker state."""
+    return _health_stats()
+
+@app.get("/parse_cache")
+async def parse_cache():
+    """Expose parse cache hit/miss counters and occupancy."""
+    return _task_parser.cache_info()
+
+@app.get("/startup")
+async def startup():
+    """Report import mode, dependency import, warmup and first-parse timings."""
+    return _startup_stats()
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus metrics: parse stages, upstream calls and cache hit rates."""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+@app.get("/rate_limits")
+async def rate_limits():
+    """Per-user token bucket state and limiter event counters."""
+    return _rate_limiter.snapshot()
+
+@app.get("/user_cache")
+async def user_cache():
+    """Cached users and hit/miss, duplicate and tag creation counters."""
+    return _user_cache.snapshot()
+
 @app.post("/add_task")
-def create_task(req: TaskRequest):
-    """Create a Habitica task from natural language."""
-    if not _check_habitica_connection():
+async def create_task(req: TaskRequest, idempotency_key: str | None = Header(default=None),
+                      accept_language: str | None = Header(default=None)):
+    """
+    Create a Habitica task from natural language.
+    
+    With TASK_QUEUE=1 the task is only parsed and queued; the response is
+    202 with a job id to poll at GET /jobs/{job_id}.
+    
+    A repeated Idempotency-Key (or, with DEDUP_WINDOW set, the same user and
+    text on the same day) gets the stored response of the first successful
+    request instead of creating the task again.
+    
+    The text is read in the request's "language", or else in the language
+    its Accept-Language header prefers among PARSE_LANGUAGES.
+    """
+    keys = _idempotency_keys(req, idempotency_key)
+    for key, _ in keys:
+        stored = _response_store.get(key)
+        if stored:
+            return _replay(stored)
+
+    inflight = next((_inflight[key] for key, _ in keys if key in _inflight), None)
+    if inflight:
+        stored = await asyncio.shield(inflight)
+        if stored:
+            return _replay(stored)
+
+    future = asyncio.get_running_loop().create_future()
+    for key, _ in keys:
+        _inflight[key] = future
+    stored = None
+    try:
+        status_code, body, raw = await _submit_task(req, _request_language(req.language,
+                                                                           accept_language))
+        # A passed-through body is stored as text, to replay it byte for byte
+        stored = ({"status": status_code, "body": body} if raw is None else
+                  {"status": status_code, "raw": raw.decode()})
+        for key, ttl in keys:
+            _response_store.put(key, stored, ttl)
+    finally:
+        for key, _ in keys:
+            _inflight.pop(key, None)
+        future.set_result(stored)
+
+    if raw is not None:
+        return Response(raw, status_code=status_code, media_type="application/json")
+    return _JSONResponse(status_code=status_code, content=body)
+
+def _idempotency_keys(req, idempotency_key):
+    """
+    Store keys, with their TTLs, under which this request's response is kept.
+    
+    Keys include a hash of the API token, as the user cache's do: a stored
+    response is looked up before the credentials are used, so a caller must
+    never be handed one created with someone else's.
+    """
+    user = _user_cache.key(req.user_id, req.api_token)
+    keys = []
+    if idempotency_key:
+        keys.append((f"key:{user}:{idempotency_key}", KEY_TTL))
+    if DEDUP_WINDOW > 0:
+        text = _normalize_text(req.text).lower()
+        keys.append((f"fingerprint:{user}:{_today().isoformat()}:{text}", DEDUP_WINDOW))
+    return keys
+
+def _replay(stored):
+    """Answer with a stored response."""
+    if "raw" in stored:
+        return Response(stored["raw"], status_code=stored["status"], media_type="application/json",
+                        headers={"Idempotent-Replayed": "true"})
+    return _JSONResponse(status_code=stored["status"], content=stored["body"],
+                        headers={"Idempotent-Replayed": "true"})
+
+async def _submit_task(req, language=None):
+    """
+    Parse and submit (or enqueue) one task, written in language.
+    
+    Returns:
+        tuple: (status code, response body, raw body) of a successful
+            submission, where raw is Habitica's response body to send as is
+            (or None); failures are raised as HTTPException
+    """
+    # Checked before the user's preferences are fetched, so a new user isn't
+    # kept waiting through connect retries when Habitica is down
+    if not _task_queue and not _habitica_is_up(refresh_if_stale=False):
         raise HTTPException(status_code=503, detail="Habitica API unavailable")
+    
+    context = await _request_context(req.user_id, req.api_token, req.timezone, language)
+    if _task_queue:
+        task_data = await _parse_text(req.text, context)
+        job_id = _task_queue.enqueue(req.user_id, req.api_token, req.text, task_data)
+        return 202, _note_degraded({"success": True, "jobId": job_id, "status": "queued"},
+                                   task_data), None
 
     try:
-        task_data = _build_task_from_text(req.text)
-        result = _send_task_to_habitica(req.user_id, req.api_token, task_data)
+        task_data = await _parse_text(req.text, context)
+        result = await _send_task_to_habitica_async(req.user_id, req.api_token, task_data,
+                                                    passthrough=RESPONSE_MODE == "raw")
 
-        if result["success"]:
-            return {"success": True, "task": result["data"]["data"]}
+        if result["success"] and RESPONSE_MODE == "raw":
+            # Coalesced submissions have no body of their own to pass on
+            return 200, result.get("data"), result.get("raw")
+        elif result["success"]:
+            return 200, _created(result, task_data), None
+        elif result.get("duplicate"):
+            raise HTTPException(status_code=409, detail=result["error"])
+        elif result.get("retryAfter"):
+            raise HTTPException(status_code=429, detail=result["error"],
+                                headers={"Retry-After": str(result["retryAfter"])})
         else:
             raise HTTPException(status_code=400, detail=result["error"])
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+def _created(result, task_data):
+    """Response item for a task Habitica created."""
+    task = result["data"]["data"]
+    if RESPONSE_MODE == "trimmed":
+        task = {field: task[field] for field in TRIMMED_FIELDS if field in task}
+    return _note_degraded({"success": True, "task": task}, task_data)
+
+def _note_degraded(body, task_data):
+    """Tell the caller which parse stages ran out of budget, if any."""
+    if task_data.get("degraded"):
+        body["degraded"] = task_data["degraded"]
+    return body
+
+
+@app.post("/parse")
+async def parse(req: ParseRequest, accept_language: str | None = Header(default=None)):
+    """
+    Parse text (or a list of texts) without creating anything in Habitica.
+    
+    Each result has the task as /add_task would send it, the branch each
+    parser stage took and the spans of the input it consumed. No
+    credentials are needed and no network I/O happens.
+    
+    Texts are parsed on the server's clock unless a timezone or a reference
+    time ("now", taken to be in that timezone, or UTC, if it has no offset)
+    is given, and in the language chosen as for /add_task.
+    """
+    context = None
+    if req.timezone or req.now:
+        zone = zoneinfo.ZoneInfo(req.timezone) if req.timezone else datetime.timezone.utc
+        now = req.now.replace(tzinfo=zone) if req.now and req.now.tzinfo is None else req.now
+        context = parse_context(zone, now=now)
+    context = _with_language(context, _request_language(req.language, accept_language))
+    if req.text is not None:
+        return (await _explain_texts([req.text], context))[0]
+    return {"results": await _explain_texts(req.texts, context)}
+
+@app.post("/add_tasks")
+async def create_tasks(req: BatchTaskRequest, accept_language: str | None = Header(default=None)):
+    """
+    Create several Habitica tasks from a list of natural language texts.
+    
+    Texts are parsed in one pass and submitted concurrently (at most
+    HABITICA_BATCH_CONCURRENCY at a time). Each item gets its own result,
+    so one bad line doesn't fail the rest.
+    """
+    if not _habitica_is_up(refresh_if_stale=False):
+        raise HTTPException(status_code=503, detail="Habitica API unavailable")
+
+    context = await _request_context(req.user_id, req.api_token, req.timezone,
+                                     _request_language(req.language, accept_language))
+    parsed = await _parse_texts(req.texts, context)
+    semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+    async def submit(item):
+        if not item["success"]:
+            return item
+        async with semaphore:
+            result = await _send_task_to_habitica_async(req.user_id, req.api_token, item["task"])
+        if result["success"]:
+            return _created(result, item["task"])
+        return result
+
+    results = await asyncio.gather(*(submit(item) for item in parsed))
+    return {"success": all(result["success"] for result in results), "results": results}
+
+@app.post("/add_tasks/stream")
+async def create_tasks_stream(request: Request, x_api_user: str = Header(),
+                              x_api_key: str = Header(), x_timezone: str | None = Header(default=None),
+                              accept_language: str | None = Header(default=None)):
+    """
+    Create tasks from a stream of lines, answering with a stream of results.
+    
+    The body is read incrementally: one task per line, as plain text, a JSON
+    string or a JSON object with a "text" field. Each line is parsed as it
+    arrives and submitted with at most HABITICA_BATCH_CONCURRENCY in flight;
+    the body isn't read further until a slot frees up, and slots only free up
+    as the client reads results, so memory stays flat for any input size.
+    
+    The response is NDJSON: {"line": n, "success": ..., ...} per non-blank
+    line, in completion order, then a {"done": true, ...} summary. An
+    X-Timezone header plays the part of /add_tasks's "timezone"; the
+    language comes from Accept-Language.
+    """
+    if not _habitica_is_up(refresh_if_stale=False):
+        raise HTTPException(status_code=503, detail="Habitica API unavailable")
+    try:
+        _check_timezone(x_timezone)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    
+    context = await _request_context(x_api_user, x_api_key, x_timezone,
+                                     negotiate_language(accept_language))
+    return _DuplexStreamingResponse(
+        _stream_results(request.stream(), x_api_user, x_api_key, context),
+        media_type="application/x-ndjson")
+
+class _DuplexStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse that reads the request body while it answers.
+    
+    StreamingResponse listens for the client disconnecting by consuming
+    receive() (before ASGI spec 2.4, which uvicorn doesn't claim yet), which
+    would swallow the body we are still reading. Here the body reader sees a
+    disconnect itself, as ClientDisconnect.
+    """
+    
+    async def __call__(self, scope, receive, send):
+        try:
+            await self.stream_response(send)
+        except OSError:
+            raise ClientDisconnect()
+
+async def _stream_lines(chunks):
+    """Split a byte stream into (line number, text) pairs, skipping blank lines."""
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    pending = ""
+    number = 0
+    # Inside a line that was too long: it was reported and is being dropped
+    skipping = False
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            number += 1
+            if skipping:
+                skipping = False
+            elif len(line) > STREAM_MAX_LINE:
+                yield number, None
+            elif line.strip():
+                yield number, line
+        if len(pending) > STREAM_MAX_LINE:
+            if not skipping:
+                skipping = True
+                yield number + 1, None
+            pending = ""
+    pending += decoder.decode(b"", final=True)
+    if pending.strip() and not skipping:
+        yield number + 1, pending
+
+def _line_text(line):
+    """The task text of one stream line."""
+    if line is None:
+        raise ValueError(f"Line longer than {STREAM_MAX_LINE} characters")
+    line = line.strip()
+    if line[0] not in "{\"":
+        return line
+    value = json.loads(line)
+    if isinstance(value, dict):
+        value = value.get("text")
+    if not isinstance(value, str):
+        raise ValueError('Expected a JSON string or an object with a "text" string')
+    return value
+
+async def _stream_results(chunks, user_id, api_token, context=None):
+    """Parse and submit the lines of chunks, yielding NDJSON results."""
+    window = asyncio.Semaphore(BATCH_CONCURRENCY)
+    results = asyncio.Queue()
+    submissions = set()
+    
+    async def submit(number, line):
+        try:
+            task_data = await _parse_text(_line_text(line), context)
+            result = await _send_task_to_habitica_async(user_id, api_token, task_data)
+            if result["success"]:
+                result = _created(result, task_data)
+        except Exception as e:
+            result = {"success": False, "error": str(e)}
+        await results.put({"line": number, **result})
+    
+    async def read():
+        try:
+            async for number, line in _stream_lines(chunks):
+                await window.acquire()
+                submission = asyncio.create_task(submit(number, line))
+                submissions.add(submission)
+                submission.add_done_callback(submissions.discard)
+            while submissions:
+                await asyncio.wait(set(submissions))
+        finally:
+            results.put_nowait(None)
+    
+    reader = asyncio.create_task(read())
+    summary = {"done": True, "succeeded": 0, "failed": 0}
+    try:
+        while (result := await results.get()) is not None:
+            # The slot is given back once the client has taken the result
+            window.release()
+            summary["succeeded" if result["success"] else "failed"] += 1
+            yield _dumps(result) + b"\n"
+        try:
+            await reader
+        except Exception as e:
+            # The request body broke off; lines after that weren't read
+            summary["error"] = f"Reading the request failed: {e}"
+        yield _dumps(summary) + b"\n"
+    finally:
+        reader.cancel()
+        for submission in list(submissions):
+            submission.cancel()
+
+@app.get("/jobs")
+async def jobs():
+    """Count queued task submissions per status."""
+    if _task_queue is None:
+        raise HTTPException(status_code=404, detail="The task queue is off (TASK_QUEUE=1)")
+    return _task_queue.stats()
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Status of a queued task submission."""
+    job = _task_queue.get(job_id) if _task_queue else None
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
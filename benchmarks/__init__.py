@@ -0,0 +1,7 @@
+"""
+Benchmarks for the Habitica NLP task service.
+
+Run each one from the repository root as a module, e.g.:
+
+    python -m benchmarks.http_client
+"""
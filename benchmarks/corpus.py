@@ -0,0 +1,79 @@
+"""
+Synthetic but realistic task phrases for the parsing benchmarks.
+
+Phrases are built from templates the way our automations and widgets
+write them, with a fixed seed so every run parses the same corpus.
+"""
+
+import random
+
+ACTIVITIES = [
+    "buy milk", "call mom", "water plants", "pay rent", "clean the kitchen",
+    "take out the trash", "review pull requests", "book dentist appointment",
+    "renew passport", "send invoice to client", "read 20 pages", "go for a run",
+    "stretch", "meditate", "practice guitar", "write journal", "do laundry",
+    "prepare slides for standup", "backup laptop", "order birthday gift",
+]
+
+HABITS = [
+    "drink water", "smoke", "eat vegetables", "check social media", "floss",
+    "snack after dinner", "walk the dog", "stand up from desk",
+]
+
+REWARDS = [
+    "movie night", "new video game", "fancy coffee", "day off", "takeaway dinner",
+    "hour of gaming", "concert ticket",
+]
+
+DIFFICULTIES = ["", "", "", "trivial", "easy", "medium", "hard", "!0", "!1", "!2", "!3"]
+
+TODO_DATES = [
+    "", "today", "tomorrow", "day after tomorrow", "on friday", "next monday",
+    "this saturday", "in 3 days", "in 2 weeks", "2025-03-14", "14/03/2025",
+    "01.04.2025", "on 5 march", "by end of month", "next week",
+]
+
+FREQUENCIES = [
+    "every day", "daily", "every 3 days", "every week", "weekly", "every 2 weeks",
+    "every month", "monthly", "every 15th", "every 1st", "every monday",
+    "every monday and friday", "every tuesday and thursday", "every sat",
+    "every other day", "every weekday",
+]
+
+HABIT_MARKERS = ["habit", "habit +", "habit -", "habit up", "habit down", "+", "-"]
+
+def _join(*parts):
+    return " ".join(part for part in parts if part)
+
+def _todo(rng):
+    return _join(rng.choice(ACTIVITIES), rng.choice(TODO_DATES), rng.choice(DIFFICULTIES))
+
+def _daily(rng):
+    return _join(rng.choice(ACTIVITIES), rng.choice(FREQUENCIES), rng.choice(DIFFICULTIES))
+
+def _habit(rng):
+    marker = rng.choice(HABIT_MARKERS)
+    habit = rng.choice(HABITS)
+    parts = (marker, habit) if rng.random() < 0.5 else (habit, marker)
+    return _join(*parts, rng.choice(DIFFICULTIES))
+
+def _reward(rng):
+    return _join(rng.choice(REWARDS), f"${rng.choice([5, 10, 20, 50, 100])}")
+
+# Rough mix of what reaches /add_task
+_GENERATORS = [(_todo, 0.55), (_daily, 0.30), (_habit, 0.10), (_reward, 0.05)]
+
+def build_corpus(size=2000, seed=1234):
+    """
+    Build a deterministic list of task phrases.
+
+    Args:
+        size (int): Number of phrases
+        seed (int): Random seed
+
+    Returns:
+        list: Phrases, with repeats in roughly the proportions seen in traffic
+    """
+    rng = random.Random(seed)
+    generators, weights = zip(*_GENERATORS)
+    return [rng.choices(generators, weights)[0](rng) for _ in range(size)]
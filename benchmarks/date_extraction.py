@@ -0,0 +1,59 @@
+"""
+Fast-path vs dateparser benchmark for todo date extraction.
+
+Times _fast_extract_date against the dateparser fallback
+(_search_date_in_text) on the phrasings the fast path covers, and shows
+where the two disagree (dateparser resolves bare weekdays into the past
+and reads ISO dates day-first, the fast path does neither).
+
+Usage: python -m benchmarks.date_extraction [repeats]
+"""
+
+import sys
+import time
+
+from script import _fast_extract_date, _search_date_in_text
+
+PHRASES = [
+    "buy milk today",
+    "buy milk tomorrow",
+    "lunch with sam day after tomorrow",
+    "call mom on friday",
+    "team sync next friday",
+    "finish report in 3 days",
+    "renew passport in 2 weeks",
+    "dentist 2025-11-12",
+    "dentist 12/11/2025",
+    "pay rent by 01.12.2025",
+]
+
+def _time_per_call(func, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for phrase in PHRASES:
+            func(phrase)
+    return (time.perf_counter() - start) / (repeats * len(PHRASES))
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    
+    # Warm both paths so one-off imports and locale loading aren't timed
+    for phrase in PHRASES:
+        _fast_extract_date(phrase)
+        _search_date_in_text(phrase)
+    
+    fast = _time_per_call(_fast_extract_date, repeats * 100)
+    fallback = _time_per_call(_search_date_in_text, repeats)
+    
+    print(f"fast path   {fast * 1e6:10.1f} µs/phrase")
+    print(f"dateparser  {fallback * 1e6:10.1f} µs/phrase")
+    print(f"speedup     {fallback / fast:10.0f}x\n")
+    
+    for phrase in PHRASES:
+        fast_result = _fast_extract_date(phrase)
+        fallback_result = _search_date_in_text(phrase)
+        marker = "  " if fast_result == fallback_result else "≠ "
+        print(f"{marker}{phrase:<36} fast={fast_result['date']}  dateparser={fallback_result['date']}")
+
+if __name__ == "__main__":
+    main()
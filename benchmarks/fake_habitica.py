@@ -0,0 +1,296 @@
+"""
+Local stand-in for the parts of the Habitica API this service calls.
+
+Serves GET /api/v3/status, GET /api/v3/user (preferences only), GET and
+POST /api/v3/tasks/user and GET and POST /api/v3/tags, keeping created
+tasks and tags in memory per user.
+Latency, throttling (429 with Retry-After) and server errors can be
+injected, and a per-user budget can be enforced with Habitica's
+X-RateLimit-* headers, so the API can be load-tested offline: point
+HABITICA_API_URL at it.
+
+Usage:
+    python -m benchmarks.fake_habitica [--port 8081] [--latency-ms 50] [--jitter-ms 20]
+        [--throttle-rate 0.01] [--error-rate 0.01] [--user-limit 30]
+"""
+
+import argparse
+import datetime
+import hashlib
+import json
+import random
+import threading
+import time
+import uuid
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+API_ROOT = "/api/v3"
+
+# Habitica's budget window, and the date format of its X-RateLimit-Reset
+RATE_LIMIT_WINDOW = 60
+_RESET_FORMAT = "%a %b %d %Y %H:%M:%S GMT+0000 (Coordinated Universal Time)"
+
+class _FakeHabiticaHandler(BaseHTTPRequestHandler):
+    """Answers one keep-alive connection's requests like Habitica would."""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def _handle(self, method):
+        url = urlsplit(self.path)
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        server = self.server
+
+        if server.latency or server.jitter:
+            time.sleep(max(0.0, server.latency + random.uniform(-server.jitter, server.jitter)))
+
+        path = url.path[len(API_ROOT):] if url.path.startswith(API_ROOT) else None
+        if path == "/status" and method == "GET":
+            return self._send(200, {"success": True, "data": {"status": "up"}})
+
+        roll = random.random()
+        if roll < server.error_rate:
+            return self._send(server.error_status, {"success": False, "error": "InternalServerError",
+                                                    "message": "Injected failure"})
+        if roll < server.error_rate + server.throttle_rate:
+            return self._send(429, {"success": False, "error": "TooManyRequests",
+                                    "message": "Injected throttling"}, {"Retry-After": "1"})
+
+        route = {("GET", "/user"): self._user,
+                 ("GET", "/tasks/user"): self._list_tasks, ("POST", "/tasks/user"): self._create_tasks,
+                 ("GET", "/tags"): self._list_tags, ("POST", "/tags"): self._create_tag}.get((method, path))
+        if route is None:
+            return self._send(404, {"success": False, "error": "NotFound",
+                                    "message": f"{method} {url.path} not found"})
+
+        user_id = self.headers.get("x-api-user")
+        if not user_id or not self.headers.get("x-api-key"):
+            return self._send(401, {"success": False, "error": "NotAuthorized",
+                                    "message": "Missing authentication headers."})
+
+        allowed, rate_headers = self._spend_budget(user_id)
+        if not allowed:
+            rate_headers["Retry-After"] = str(int(server.window_reset(user_id) - time.time()) + 1)
+            return self._send(429, {"success": False, "error": "TooManyRequests",
+                                    "message": "User rate limit exceeded"}, rate_headers)
+
+        try:
+            payload = json.loads(body) if body else None
+        except ValueError:
+            return self._send(400, {"success": False, "error": "BadRequest",
+                                    "message": "Malformed JSON"}, rate_headers)
+        status, data = route(user_id, payload, parse_qs(url.query))
+        self._send(status, data, rate_headers)
+
+    def _spend_budget(self, user_id):
+        """
+        Count a request against the user's budget.
+
+        Returns:
+            tuple: (whether the budget allowed it, X-RateLimit-* headers)
+        """
+        server = self.server
+        if not server.user_limit:
+            return True, {}
+        remaining = server.spend(user_id)
+        reset = datetime.datetime.fromtimestamp(server.window_reset(user_id), datetime.timezone.utc)
+        return remaining is not None, {"X-RateLimit-Limit": str(server.user_limit),
+                                       "X-RateLimit-Remaining": str(remaining or 0),
+                                       "X-RateLimit-Reset": reset.strftime(_RESET_FORMAT)}
+
+    def _user(self, user_id, *_):
+        preferences = {"timezoneOffset": self.server.timezone_offset,
+                       "dayStart": self.server.day_start}
+        return 200, {"success": True, "data": {"_id": user_id, "preferences": preferences}}
+
+    def _list_tasks(self, user_id, _, query):
+        kinds = query.get("type", [None])[0]
+        tasks = self.server.user_items("tasks", user_id)
+        if kinds:
+            tasks = [task for task in tasks if f"{task.get('type')}s" == kinds]
+        return self._listing(tasks)
+
+    def _create_tasks(self, user_id, payload, _):
+        items = payload if isinstance(payload, list) else [payload]
+        if not items or not all(isinstance(item, dict) and item.get("text") for item in items):
+            return 400, {"success": False, "error": "BadRequest", "message": "Task text is required."}
+        created = [self.server.add_item("tasks", user_id, {"type": "todo", **item}) for item in items]
+        return 201, {"success": True, "data": created if isinstance(payload, list) else created[0]}
+
+    def _list_tags(self, user_id, *_):
+        return self._listing(self.server.user_items("tags", user_id))
+
+    def _create_tag(self, user_id, payload, _):
+        if not isinstance(payload, dict) or not payload.get("name"):
+            return 400, {"success": False, "error": "BadRequest", "message": "Tag name is required."}
+        return 201, {"success": True, "data": self.server.add_item("tags", user_id, payload)}
+
+    def _listing(self, items):
+        """A list response, or 304 if the caller's ETag still matches."""
+        body = {"success": True, "data": items}
+        etag = '"' + hashlib.sha1(json.dumps(body, sort_keys=True).encode()).hexdigest() + '"'
+        if self.headers.get("If-None-Match") == etag:
+            return 304, None
+        self._etag = etag
+        return 200, body
+
+    def _send(self, status, body, headers=None):
+        payload = json.dumps(body).encode() if body is not None else b""
+        self.send_response(status)
+        if body is not None:
+            self.send_header("Content-Type", "application/json")
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        etag = getattr(self, "_etag", None)
+        if etag:
+            self.send_header("ETag", etag)
+            self._etag = None
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+        self.server.count(status)
+
+    def log_message(self, *args):
+        pass
+
+class FakeHabitica(ThreadingHTTPServer):
+    """
+    Threaded fake Habitica server.
+
+    Args:
+        port (int): Port to listen on (0 picks a free one)
+        latency (float): Seconds added to every response
+        jitter (float): Latency varies uniformly by up to this many seconds
+        throttle_rate (float): Fraction of API calls answered with 429
+        error_rate (float): Fraction of API calls answered with error_status
+        error_status (int): Status of injected failures
+        user_limit (int): Requests per user per minute before a 429, with
+            X-RateLimit-* headers on every response (0 disables)
+        timezone_offset (int): Every user's preferences.timezoneOffset
+            (minutes behind UTC, as in JavaScript)
+        day_start (int): Every user's preferences.dayStart (hour)
+    """
+
+    daemon_threads = True
+
+    def __init__(self, port=0, latency=0.0, jitter=0.0, throttle_rate=0.0, error_rate=0.0,
+                 error_status=503, user_limit=0, timezone_offset=0, day_start=0):
+        super().__init__(("127.0.0.1", port), _FakeHabiticaHandler)
+        self.latency = latency
+        self.jitter = jitter
+        self.throttle_rate = throttle_rate
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.user_limit = user_limit
+        self.timezone_offset = timezone_offset
+        self.day_start = day_start
+        self.connections = 0
+        self.statuses = Counter()
+        self.lock = threading.Lock()
+        self._items = {"tasks": {}, "tags": {}}
+        self._windows = {}
+
+    @property
+    def url(self):
+        """API root to use as HABITICA_API_URL."""
+        return f"http://127.0.0.1:{self.server_address[1]}{API_ROOT}"
+
+    def count(self, status):
+        with self.lock:
+            self.statuses[status] += 1
+
+    def user_items(self, kind, user_id):
+        with self.lock:
+            return list(self._items[kind].get(user_id, ()))
+
+    def add_item(self, kind, user_id, item):
+        item = {**item, "id": str(uuid.uuid4())}
+        with self.lock:
+            self._items[kind].setdefault(user_id, []).append(item)
+        return item
+
+    def spend(self, user_id):
+        """Spend one request of the user's budget; returns what's left, None if none was."""
+        now = time.time()
+        with self.lock:
+            started, used = self._windows.get(user_id, (now, 0))
+            if now - started >= RATE_LIMIT_WINDOW:
+                started, used = now, 0
+            if used >= self.user_limit:
+                return None
+            self._windows[user_id] = (started, used + 1)
+            return self.user_limit - used - 1
+
+    def window_reset(self, user_id):
+        """Epoch time at which the user's budget refills."""
+        with self.lock:
+            started, _ = self._windows.get(user_id, (time.time(), 0))
+        return started + RATE_LIMIT_WINDOW
+
+def start(**options):
+    """
+    Start a FakeHabitica on a background thread.
+
+    Args:
+        **options: FakeHabitica arguments
+
+    Returns:
+        FakeHabitica: The running server; call shutdown() to stop it
+    """
+    server = FakeHabitica(**options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def add_arguments(parser):
+    """Add the fault-injection options shared with benchmarks.load."""
+    parser.add_argument("--latency-ms", type=float, default=0, help="latency added to every response")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="uniform variation of the latency")
+    parser.add_argument("--throttle-rate", type=float, default=0,
+                        help="fraction of API calls answered with 429")
+    parser.add_argument("--error-rate", type=float, default=0,
+                        help="fraction of API calls answered with --error-status")
+    parser.add_argument("--error-status", type=int, default=503, help="status of injected failures")
+    parser.add_argument("--user-limit", type=int, default=0,
+                        help="requests per user per minute, as Habitica enforces (0: unlimited)")
+    parser.add_argument("--timezone-offset", type=int, default=0,
+                        help="users' timezoneOffset preference, in minutes behind UTC")
+    parser.add_argument("--day-start", type=int, default=0, help="users' dayStart preference")
+
+def options_from(args):
+    """FakeHabitica arguments from parsed add_arguments() options."""
+    return {"latency": args.latency_ms / 1000, "jitter": args.jitter_ms / 1000,
+            "throttle_rate": args.throttle_rate, "error_rate": args.error_rate,
+            "error_status": args.error_status, "user_limit": args.user_limit,
+            "timezone_offset": args.timezone_offset, "day_start": args.day_start}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--port", type=int, default=8081, help="port to listen on")
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    server = FakeHabitica(port=args.port, **options_from(args))
+    print(f"fake Habitica at {server.url}; set HABITICA_API_URL={server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"{server.connections} connections, responses by status: {dict(server.statuses)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+"""
+Golden corpus check of the parser's output and per-phrase latency.
+
+Parses every case of benchmarks/golden.jsonl under a frozen clock and
+compares the result with the Habitica task stored next to it. Each case is
+also timed (best of --repeats uncached parses), and with --compare the
+times are checked against an earlier run's --json output, so a parser
+change is gated on both accuracy and speed. Exits with status 1 when the
+accuracy falls below --min-accuracy (or the baseline's), or when any
+phrase got slower than --max-slowdown times its baseline time plus
+--slack-us. Nothing here touches the network.
+
+A case is a JSON line with the text and, optionally, its language, a
+timezone and a day start (as a user's Habitica preferences would give
+them), a host timezone to run the server in (for cases that must not
+depend on it) and the expected task. Every other case runs with TZ=UTC, so
+results don't depend on the machine's timezone. A case whose expected task
+changed on purpose can keep the earlier output under "before", for review;
+it is not checked. --update rewrites every expected task with
+the current output: review the diff before committing it.
+
+Usage:
+    python -m benchmarks.golden [--json out.json] [--compare baseline.json]
+        [--max-slowdown 2] [--slack-us 50] [--repeats 5] [--update]
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from zoneinfo import ZoneInfo
+
+import languages
+
+# Outputs must come from parsing, not from a persistent cache, never be cut
+# short by a deadline, and every language with a table must be enabled
+# (English first, as the default)
+os.environ["PARSE_CACHE_PATH"] = ""
+os.environ["PARSE_DEADLINE_MS"] = "0"
+os.environ["PARSE_LANGUAGES"] = ",".join(languages.LANGUAGES)
+# The server's own timezone must not leak into any output; pin it so the
+# expected tasks hold on every machine
+os.environ["TZ"] = "UTC"
+time.tzset()
+
+import script
+
+GOLDEN_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "golden.jsonl")
+
+# A Wednesday morning: the server's clock for cases without a timezone, and
+# the UTC instant for cases with one
+FROZEN_NOW = datetime.datetime(2025, 1, 15, 9, 0)
+
+# Fields of a case, in the order --update writes them
+_CASE_FIELDS = ("text", "language", "timezone", "dayStart", "hostTimezone", "task", "before")
+
+def load_cases(path=GOLDEN_PATH):
+    """
+    Read the golden cases.
+
+    Args:
+        path (str): JSON lines file of cases
+
+    Returns:
+        list: Case dicts, in file order
+    """
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def _write_cases(cases, path=GOLDEN_PATH):
+    with open(path, "w", encoding="utf-8") as f:
+        for case in cases:
+            fields = {field: case[field] for field in _CASE_FIELDS if case.get(field) is not None}
+            f.write(json.dumps(fields, ensure_ascii=False) + "\n")
+
+def _case_key(case):
+    """What identifies a case across runs: the same text can recur in other settings."""
+    return (case["text"], case.get("language"), case.get("timezone"), case.get("dayStart"),
+            case.get("hostTimezone"))
+
+def _context(case):
+    """The ParseContext a user with the case's settings would get."""
+    timezone = case.get("timezone")
+    if timezone is None:
+        return script.parse_context(language=case.get("language"))
+    now = FROZEN_NOW.replace(tzinfo=datetime.timezone.utc)
+    return script.parse_context(ZoneInfo(timezone), case.get("dayStart") or 0, now,
+                                case.get("language"))
+
+@contextmanager
+def _host_timezone(name):
+    """Run the server in timezone name (as TZ would set it) for the block."""
+    if not name:
+        yield
+        return
+    os.environ["TZ"] = name
+    time.tzset()
+    try:
+        yield
+    finally:
+        os.environ["TZ"] = "UTC"
+        time.tzset()
+
+def _parse(text, context):
+    """One uncached parse of text; returns the task and the nanoseconds it took."""
+    token = script._parse_context.set(context)
+    try:
+        started = time.perf_counter_ns()
+        task = script._parse_task(text)
+        elapsed = time.perf_counter_ns() - started
+    finally:
+        script._parse_context.reset(token)
+    return task.to_dict(), elapsed
+
+def _check(case, repeats):
+    context = _context(case)
+    text = script._normalize_text(case["text"])
+    with _host_timezone(case.get("hostTimezone")):
+        task, best = _parse(text, context)
+        for _ in range(repeats - 1):
+            best = min(best, _parse(text, context)[1])
+    return {
+        "text": case["text"],
+        "language": case.get("language"),
+        "timezone": case.get("timezone"),
+        "dayStart": case.get("dayStart"),
+        "hostTimezone": case.get("hostTimezone"),
+        "passed": task == case.get("task"),
+        "expected": case.get("task"),
+        "actual": task,
+        "us": best / 1e3,
+    }
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run(cases, repeats=5):
+    """
+    Parse and time every case.
+
+    Args:
+        cases (list): Cases from load_cases()
+        repeats (int): Parses per case; the fastest is its time
+
+    Returns:
+        dict: Machine-readable results
+    """
+    with script.freeze_clock(FROZEN_NOW):
+        script.warm_up()
+        phrases = [_check(case, repeats) for case in cases]
+
+    passed = sum(phrase["passed"] for phrase in phrases)
+    return {
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "frozenNow": FROZEN_NOW.isoformat(),
+        "cases": len(phrases),
+        "passed": passed,
+        "accuracy": passed / len(phrases) if phrases else 1.0,
+        "totalUs": sum(phrase["us"] for phrase in phrases),
+        "phrases": phrases,
+    }
+
+def _slowdowns(results, baseline, max_slowdown, slack_us, repeats):
+    """
+    Phrases slower than max_slowdown times their baseline time plus slack_us.
+
+    A phrase that looks slower is timed again with four times the repeats
+    before it counts, so one noisy moment on a shared CI runner doesn't
+    fail the run.
+
+    Returns:
+        list: (phrase, baseline microseconds) pairs
+    """
+    before = {_case_key(phrase): phrase["us"] for phrase in baseline["phrases"]}
+    slower = []
+    with script.freeze_clock(FROZEN_NOW):
+        for phrase in results["phrases"]:
+            previous = before.get(_case_key(phrase))
+            if previous is None or phrase["us"] <= previous * max_slowdown + slack_us:
+                continue
+            phrase["us"] = min(phrase["us"], _check(phrase, 4 * repeats)["us"])
+            if phrase["us"] > previous * max_slowdown + slack_us:
+                slower.append((phrase, previous))
+    return slower
+
+def _describe(phrase):
+    settings = [phrase[field] for field in ("language", "timezone") if phrase[field]]
+    if phrase["dayStart"]:
+        settings.append(f"dayStart {phrase['dayStart']}")
+    if phrase.get("hostTimezone"):
+        settings.append(f"server in {phrase['hostTimezone']}")
+    return phrase["text"] + (f" ({', '.join(settings)})" if settings else "")
+
+def _print_report(results, baseline, slower, max_slowdown, slack_us):
+    for phrase in results["phrases"]:
+        if not phrase["passed"]:
+            print(f"≠ {_describe(phrase)}")
+            print(f"    expected: {json.dumps(phrase['expected'], ensure_ascii=False)}")
+            print(f"    actual:   {json.dumps(phrase['actual'], ensure_ascii=False)}")
+    for phrase, previous in slower:
+        print(f"slower: {_describe(phrase)}: {previous:.0f} µs -> {phrase['us']:.0f} µs")
+
+    print(f"\n{results['passed']}/{results['cases']} cases match ({results['accuracy']:.1%}),"
+          f" clock frozen at {results['frozenNow']}")
+    line = f"total parse time {results['totalUs'] / 1e3:.1f} ms"
+    if baseline:
+        line += (f" ({100 * (results['totalUs'] - baseline['totalUs']) / baseline['totalUs']:+.0f}%"
+                 f" vs {baseline.get('commit') or 'baseline'}), phrases slower than"
+                 f" {max_slowdown:g}x + {slack_us:g} µs: {len(slower)}")
+    print(line)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--cases", default=GOLDEN_PATH, help="golden JSON lines file")
+    parser.add_argument("--repeats", type=int, default=5, help="parses per case; the fastest counts")
+    parser.add_argument("--json", metavar="PATH", help="write results as JSON")
+    parser.add_argument("--compare", metavar="PATH", help="baseline JSON to gate latency against")
+    parser.add_argument("--min-accuracy", type=float, default=1.0,
+                        help="fail below this fraction of matching cases")
+    parser.add_argument("--max-slowdown", type=float, default=2.0,
+                        help="fail if a phrase takes more than this times its baseline time...")
+    parser.add_argument("--slack-us", type=float, default=50,
+                        help="...plus this many microseconds (absorbs timer noise)")
+    parser.add_argument("--update", action="store_true",
+                        help="rewrite the expected tasks with the current output")
+    args = parser.parse_args()
+    args.repeats = max(1, args.repeats)
+
+    cases = load_cases(args.cases)
+    results = run(cases, args.repeats)
+
+    if args.update:
+        changed = 0
+        for case, phrase in zip(cases, results["phrases"]):
+            changed += not phrase["passed"]
+            case["task"] = phrase["actual"]
+        _write_cases(cases, args.cases)
+        print(f"updated {changed} of {len(cases)} cases in {args.cases}")
+        return
+
+    baseline = slower = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        slower = _slowdowns(results, baseline, args.max_slowdown, args.slack_us, args.repeats)
+    _print_report(results, baseline, slower or [], args.max_slowdown, args.slack_us)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+
+    failed = results["accuracy"] < args.min_accuracy or bool(slower)
+    if baseline and results["accuracy"] < baseline["accuracy"]:
+        print(f"accuracy dropped from {baseline['accuracy']:.1%}")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Connection reuse benchmark for the pooled Habitica client.
+
+Starts the local Habitica stand-in (benchmarks.fake_habitica), then
+submits the same batch of tasks twice: once with one-shot `requests.post`
+calls (the old behaviour) and once through the shared HabiticaClient. The
+server counts the TCP connections it accepts, so the pooled run should
+report a handful of connections instead of one per task.
+
+Usage: python -m benchmarks.http_client [requests] [threads]
+"""
+
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from benchmarks import fake_habitica
+from script import HabiticaClient
+
+HEADERS = {"x-api-user": "benchmark", "x-api-key": "benchmark"}
+
+def _run(label, server, post, total, threads):
+    server.connections = 0
+    task = {"type": "todo", "text": "benchmark task"}
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        statuses = list(pool.map(lambda _: post(task).status_code, range(total)))
+    elapsed = time.perf_counter() - start
+    
+    print(f"{label:<10} {total} requests in {elapsed:.3f}s "
+          f"({total / elapsed:,.0f} req/s), "
+          f"{server.connections} connections, "
+          f"{sum(s == 201 for s in statuses)} ok")
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    threads = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    
+    server = fake_habitica.start()
+    base_url = server.url
+    
+    _run("one-shot", server,
+         lambda task: requests.post(f"{base_url}/tasks/user", json=task, headers=HEADERS,
+                                    timeout=10),
+         total, threads)
+    
+    client = HabiticaClient(base_url=base_url, pool_size=threads)
+    _run("pooled", server, lambda task: client.post("/tasks/user", json=task, headers=HEADERS),
+         total, threads)
+    client.close()
+    
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
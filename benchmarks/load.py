@@ -0,0 +1,229 @@
+"""
+End-to-end load test of the API's POST /add_task.
+
+Sends requests at fixed target rates, each for --duration seconds, and
+reports achieved throughput, p50/p95/p99 latency and errors by status.
+The load is open loop: every request leaves at its scheduled time whether
+or not earlier ones have been answered, and latency is measured from that
+time, so a saturated service shows up as growing latency and a throughput
+below target instead of quietly slowing the test down. Stepping the rate
+up finds the saturation point.
+
+With --spawn, benchmarks.fake_habitica and the API (uvicorn, with
+HABITICA_API_URL pointed at the fake) are started as subprocesses, so the
+whole test runs offline; the fault-injection options go to the fake, and
+any other settings (PARSE_PROCESSES, RATE_LIMIT_PER_MINUTE, ...) are taken
+from the environment.
+
+Usage:
+    python -m benchmarks.load --spawn [--rps 10,25,50,100] [--duration 10] [--users 1000]
+        [--latency-ms 50] [--throttle-rate 0.01] [--error-rate 0.01] [--json out.json]
+    python -m benchmarks.load --url http://127.0.0.1:8000 [--rps 50]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+import httpx
+
+from benchmarks import fake_habitica
+from benchmarks.corpus import build_corpus
+
+# A step saturates when a queue builds up, i.e. the requests sent in its
+# last quarter wait this many times longer (median) than those in its first
+# quarter, or when it fails more than this fraction of its requests.
+# Slow but steady responses (e.g. retried 429s) don't count.
+SATURATION_GROWTH = 2.0
+SATURATION_ERRORS = 0.01
+
+# Not imported from benchmarks.parsing, which clears PARSE_CACHE_PATH in the
+# environment the spawned API inherits
+def _percentile(sorted_values, fraction):
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+async def _send(client, url, payload, scheduled):
+    try:
+        response = await client.post(f"{url}/add_task", json=payload)
+        outcome = response.status_code
+    except httpx.TimeoutException:
+        outcome = "timeout"
+    except httpx.HTTPError:
+        outcome = "connectionError"
+    return outcome, time.perf_counter() - scheduled
+
+async def _step(client, url, rps, duration, texts, users):
+    """
+    Send rps requests a second for duration seconds.
+
+    Returns:
+        tuple: ((outcome, latency) per request in sending order, seconds
+            from the first request to the last response)
+    """
+    total = max(1, int(rps * duration))
+    pending = []
+    started = time.perf_counter()
+    for i in range(total):
+        scheduled = started + i / rps
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        payload = {"user_id": f"load-user-{i % users}", "api_token": "load-token",
+                   "text": texts[i % len(texts)]}
+        pending.append(asyncio.ensure_future(_send(client, url, payload, scheduled)))
+    results = await asyncio.gather(*pending)
+    return results, time.perf_counter() - started
+
+def _median(values):
+    return _percentile(sorted(values), 0.5) if values else 0.0
+
+def _summarize(rps, results, elapsed):
+    statuses = Counter(str(outcome) for outcome, _ in results)
+    latencies = [latency for _, latency in results]
+    ok = statuses.get("200", 0)
+    error_rate = 1 - ok / len(results)
+    quarter = max(1, len(latencies) // 4)
+    growth = _median(latencies[-quarter:]) / (_median(latencies[:quarter]) or 1e-9)
+    latencies.sort()
+    return {
+        "targetRps": rps,
+        "sent": len(results),
+        "achievedRps": ok / elapsed,
+        "errorRate": error_rate,
+        "p50Ms": _percentile(latencies, 0.50) * 1e3,
+        "p95Ms": _percentile(latencies, 0.95) * 1e3,
+        "p99Ms": _percentile(latencies, 0.99) * 1e3,
+        "latencyGrowth": growth,
+        "statuses": dict(statuses),
+        "saturated": growth > SATURATION_GROWTH or error_rate > SATURATION_ERRORS,
+    }
+
+async def _run_steps(url, rates, duration, users, connections, timeout):
+    texts = build_corpus(2000)
+    limits = httpx.Limits(max_connections=connections, max_keepalive_connections=connections)
+    async with httpx.AsyncClient(timeout=timeout, limits=limits) as client:
+        steps = []
+        for rps in rates:
+            results, elapsed = await _step(client, url, rps, duration, texts, users)
+            steps.append(_summarize(rps, results, elapsed))
+            _print_step(steps[-1])
+        return steps
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def _wait_until_up(url, process, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{process.args} exited with status {process.returncode}")
+        try:
+            httpx.get(url, timeout=1)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    raise RuntimeError(f"{url} didn't come up within {timeout}s")
+
+@contextmanager
+def _spawned(args):
+    """Run the fake Habitica and the API; yield the API's URL."""
+    fake_port, api_port = _free_port(), _free_port()
+    fake_args = [f"--latency-ms={args.latency_ms}", f"--jitter-ms={args.jitter_ms}",
+                 f"--throttle-rate={args.throttle_rate}", f"--error-rate={args.error_rate}",
+                 f"--error-status={args.error_status}", f"--user-limit={args.user_limit}",
+                 f"--timezone-offset={args.timezone_offset}", f"--day-start={args.day_start}"]
+    fake_url = f"http://127.0.0.1:{fake_port}{fake_habitica.API_ROOT}"
+    env = {**os.environ, "HABITICA_API_URL": fake_url}
+    env.setdefault("NLP_WARMUP", "1")
+
+    processes = []
+    try:
+        processes.append(subprocess.Popen(
+            [sys.executable, "-m", "benchmarks.fake_habitica", f"--port={fake_port}", *fake_args],
+            stdout=subprocess.DEVNULL))
+        _wait_until_up(f"{fake_url}/status", processes[-1])
+        processes.append(subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app:app", f"--port={api_port}", "--log-level=warning"],
+            env=env))
+        api_url = f"http://127.0.0.1:{api_port}"
+        _wait_until_up(f"{api_url}/startup", processes[-1])
+        yield api_url
+    finally:
+        for process in reversed(processes):
+            process.terminate()
+            process.wait()
+
+def run(url, rates, duration=10, users=1000, connections=500, timeout=30):
+    """
+    Run the load test against an API at url.
+
+    Returns:
+        dict: Machine-readable results
+    """
+    steps = asyncio.run(_run_steps(url, rates, duration, users, connections, timeout))
+    saturated = next((step["targetRps"] for step in steps if step["saturated"]), None)
+    return {
+        "commit": _git_commit(),
+        "durationSeconds": duration,
+        "users": users,
+        "steps": steps,
+        "saturatesAtRps": saturated,
+    }
+
+def _print_step(step):
+    statuses = ", ".join(f"{status}: {count}" for status, count in sorted(step["statuses"].items()))
+    print(f"{step['targetRps']:>8g}{step['achievedRps']:>10.1f}{step['p50Ms']:>9.0f}"
+          f"{step['p95Ms']:>9.0f}{step['p99Ms']:>9.0f}{step['latencyGrowth']:>8.1f}x"
+          f"{step['errorRate']:>8.1%}"
+          f"  {'SATURATED ' if step['saturated'] else ''}{statuses}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="API to load (without --spawn)")
+    parser.add_argument("--spawn", action="store_true",
+                        help="start the fake Habitica and the API instead of using --url")
+    parser.add_argument("--rps", default="10,25,50,100", help="comma-separated target rates")
+    parser.add_argument("--duration", type=float, default=10, help="seconds per rate")
+    parser.add_argument("--users", type=int, default=1000,
+                        help="distinct user ids to spread requests over (each has its own rate limit)")
+    parser.add_argument("--connections", type=int, default=500, help="client connection limit")
+    parser.add_argument("--timeout", type=float, default=30, help="per-request timeout (seconds)")
+    parser.add_argument("--json", metavar="PATH", help="write results as JSON")
+    fake_habitica.add_arguments(parser)
+    args = parser.parse_args()
+
+    rates = [float(rate) for rate in args.rps.split(",")]
+    print(f"{'rps':>8}{'achieved':>10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'growth':>9}"
+          f"{'errors':>8}  statuses")
+    if args.spawn:
+        with _spawned(args) as url:
+            results = run(url, rates, args.duration, args.users, args.connections, args.timeout)
+    else:
+        results = run(args.url, rates, args.duration, args.users, args.connections, args.timeout)
+
+    saturated = results["saturatesAtRps"]
+    print(f"\nsaturates at {saturated:g} rps" if saturated else "\nno step saturated")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Scaling benchmark for the multi-process parser pool.
+
+Parses the same corpus in-process and with pools of 1, 2, 4 and 8 warmed
+worker processes (PARSE_PROCESSES), under a frozen clock and with the
+workers' parse caches (in memory and on disk) disabled, so the numbers are raw parsing throughput.
+Use it to size containers: efficiency drops once the pool outgrows the
+cores actually available.
+
+Usage:
+    python -m benchmarks.parse_pool [--size N] [--processes 1,2,4,8] [--json out.json]
+"""
+
+import argparse
+import json
+import os
+import platform
+import time
+
+# Workers inherit the environment when they are spawned
+os.environ["PARSE_CACHE_SIZE"] = "0"
+os.environ["PARSE_CACHE_PATH"] = ""
+
+import script
+from benchmarks.corpus import build_corpus
+from benchmarks.parsing import FROZEN_NOW, _git_commit
+
+def _throughput(parse, corpus, rounds):
+    """Best tasks/second over a few rounds."""
+    best = float("inf")
+    for _ in range(rounds):
+        started = time.perf_counter()
+        parse(corpus)
+        best = min(best, time.perf_counter() - started)
+    return len(corpus) / best
+
+def run(size=4000, seed=1234, process_counts=(1, 2, 4, 8), rounds=3):
+    """
+    Run the benchmark.
+
+    Returns:
+        dict: Machine-readable results
+    """
+    corpus = build_corpus(size, seed)
+
+    with script.freeze_clock(FROZEN_NOW):
+        script.warm_up()
+        baseline = _throughput(script._build_tasks_from_texts, corpus, rounds)
+
+        pools = []
+        for processes in process_counts:
+            pool = script._new_parse_pool(processes)
+            try:
+                rate = _throughput(
+                    lambda texts: script._map_in_pool(script._build_tasks_from_texts, texts, pool),
+                    corpus, rounds)
+            finally:
+                pool.shutdown()
+            pools.append({
+                "processes": processes,
+                "tasksPerSec": rate,
+                "speedup": rate / baseline,
+                "efficiency": rate / baseline / processes,
+            })
+
+    return {
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "cpus": os.cpu_count(),
+        "corpusSize": size,
+        "chunk": script.PARSE_POOL_CHUNK,
+        "inProcessTasksPerSec": baseline,
+        "pools": pools,
+    }
+
+def _print_report(results):
+    print(f"corpus: {results['corpusSize']} phrases, {results['cpus']} CPUs, "
+          f"chunks of {results['chunk']}\n")
+    print(f"{'processes':<12}{'tasks/s':>12}{'speedup':>10}{'efficiency':>12}")
+    print(f"{'in-process':<12}{results['inProcessTasksPerSec']:>12,.0f}{1:>10.2f}{'':>12}")
+    for row in results["pools"]:
+        print(f"{row['processes']:<12}{row['tasksPerSec']:>12,.0f}{row['speedup']:>10.2f}"
+              f"{row['efficiency']:>11.0%}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size", type=int, default=4000, help="number of phrases")
+    parser.add_argument("--seed", type=int, default=1234, help="corpus random seed")
+    parser.add_argument("--processes", default="1,2,4,8",
+                        help="comma-separated pool sizes (default: 1,2,4,8)")
+    parser.add_argument("--json", metavar="PATH", help="write results as JSON")
+    args = parser.parse_args()
+
+    counts = [int(count) for count in args.processes.split(",")]
+    results = run(args.size, args.seed, counts)
+    _print_report(results)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
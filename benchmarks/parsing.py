@@ -0,0 +1,158 @@
+"""
+Offline benchmark for the parsing pipeline.
+
+Runs every stage of _build_task_from_text, and the whole pipeline, over a
+generated corpus under a frozen clock. Reports throughput, p50/p95/p99
+latency and memory, and can write the results as JSON to compare runs
+across commits. Nothing here touches the network.
+
+Usage:
+    python -m benchmarks.parsing [--size N] [--json out.json] [--compare baseline.json]
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import resource
+import subprocess
+import time
+import tracemalloc
+
+# Uncached numbers must come from parsing, not from a persistent cache
+os.environ["PARSE_CACHE_PATH"] = ""
+
+import script
+from benchmarks.corpus import build_corpus
+
+# A Wednesday morning, so weekday and "next ..." phrases resolve the same
+# way on every run
+FROZEN_NOW = datetime.datetime(2025, 1, 15, 9, 0)
+
+def _stages(corpus):
+    """Each stage with the inputs it actually sees in the pipeline."""
+    tokens = [script._tokenize(text) for text in corpus]
+    types = {text: script._determine_task_type(stream) for text, stream in zip(corpus, tokens)}
+    todos = [text for text in corpus if types[text] == "todo"]
+    dailies = [text for text in corpus if types[text] == "daily"]
+
+    return [
+        ("tokenize", script._tokenize, corpus),
+        ("determine_task_type", script._determine_task_type, tokens),
+        ("extract_difficulty", script._extract_difficulty, tokens),
+        ("extract_date_from_text", script._extract_date_from_text, todos),
+        ("extract_frequency_pattern", script._extract_frequency_pattern, dailies),
+        ("remove_frequency_words", script._remove_frequency_words_from_text, dailies),
+        ("end_to_end_uncached", script._parse_task, corpus),
+    ]
+
+def _percentile(sorted_values, fraction):
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+def _measure(func, inputs):
+    latencies = []
+    for text in inputs:
+        started = time.perf_counter_ns()
+        func(text)
+        latencies.append(time.perf_counter_ns() - started)
+
+    latencies.sort()
+    total = sum(latencies)
+    return {
+        "calls": len(latencies),
+        "opsPerSec": len(latencies) / (total / 1e9) if total else 0.0,
+        "p50Us": _percentile(latencies, 0.50) / 1e3,
+        "p95Us": _percentile(latencies, 0.95) / 1e3,
+        "p99Us": _percentile(latencies, 0.99) / 1e3,
+    }
+
+def _measure_memory(corpus):
+    script._task_parser.clear_cache()
+    tracemalloc.start()
+    for text in corpus:
+        script._build_task_from_text(text)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "pipelinePeakKiB": peak / 1024,
+        "maxRssKiB": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run(size=2000, seed=1234):
+    """
+    Run the benchmark.
+
+    Returns:
+        dict: Machine-readable results
+    """
+    corpus = build_corpus(size, seed)
+
+    with script.freeze_clock(FROZEN_NOW):
+        script.warm_up()
+        script._task_parser.clear_cache()
+        stages = {name: _measure(func, inputs) for name, func, inputs in _stages(corpus)}
+
+        # Second pass over a primed cache: the steady state for repeat phrases
+        for text in corpus:
+            script._build_task_from_text(text)
+        stages["end_to_end_cached"] = _measure(script._build_task_from_text, corpus)
+
+        memory = _measure_memory(corpus)
+
+    return {
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "frozenNow": FROZEN_NOW.isoformat(),
+        "corpusSize": size,
+        "seed": seed,
+        "stages": stages,
+        "memory": memory,
+    }
+
+def _print_report(results, baseline=None):
+    print(f"corpus: {results['corpusSize']} phrases, clock frozen at {results['frozenNow']}\n")
+    print(f"{'stage':<28}{'calls':>7}{'ops/s':>12}{'p50 µs':>10}{'p95 µs':>10}{'p99 µs':>10}")
+    for name, stats in results["stages"].items():
+        line = (f"{name:<28}{stats['calls']:>7}{stats['opsPerSec']:>12,.0f}"
+                f"{stats['p50Us']:>10.1f}{stats['p95Us']:>10.1f}{stats['p99Us']:>10.1f}")
+        if baseline and name in baseline["stages"]:
+            before = baseline["stages"][name]["p50Us"]
+            if before:
+                line += f"   p50 {100 * (stats['p50Us'] - before) / before:+.0f}%"
+        print(line)
+
+    memory = results["memory"]
+    print(f"\npipeline peak traced memory: {memory['pipelinePeakKiB']:,.0f} KiB, "
+          f"max RSS: {memory['maxRssKiB']:,} KiB")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size", type=int, default=2000, help="number of phrases")
+    parser.add_argument("--seed", type=int, default=1234, help="corpus random seed")
+    parser.add_argument("--json", metavar="PATH", help="write results as JSON")
+    parser.add_argument("--compare", metavar="PATH", help="baseline JSON to diff against")
+    args = parser.parse_args()
+
+    results = run(args.size, args.seed)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+    _print_report(results, baseline)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
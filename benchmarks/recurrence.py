@@ -0,0 +1,144 @@
+"""
+Recurrence recognizer vs the matcher chain it replaced.
+
+Times the manual frequency fallback, frequency object and cleaned text
+together, as it is now (one scan of the combined recurrence regex) and as
+it was before (four matcher/builder pairs, each with its own re.search
+calls, then a separate pass to strip frequency words). The old chain is
+kept below for reference only. Also shows where the two disagree: the
+phrasings the old chain didn't know.
+
+Usage: python -m benchmarks.recurrence [repeats]
+"""
+
+import re
+import sys
+import time
+
+from script import _manual_frequency_parsing, _tokenize, _WHITESPACE_RE, _build_repeat
+
+PHRASES = [
+    "water plants every day",
+    "take vitamins daily",
+    "stretch every 3 days",
+    "review budget every week",
+    "clean the fridge every 2 weeks",
+    "pay rent every month",
+    "pay bills every 15th",
+    "gym every monday and friday",
+    "standup every weekday",
+    "go for a run every other day",
+    "gym mon-fri",
+    "pay bills every 2nd and 15th",
+    "brunch weekends",
+    "run every other tuesday",
+    "review every 2 weeks on monday",
+    "read a chapter",
+]
+
+# -----------------------------------------------------------------------------
+# The previous implementation
+# -----------------------------------------------------------------------------
+
+_DAY_NAMES = r"monday|tuesday|wednesday|thursday|friday|saturday|sunday"
+_DAY_ABBREVIATIONS = r"mon|tue|wed|thu|fri|sat|sun"
+
+_DAILY_RE = re.compile(r"daily|every day|everyday")
+_EVERY_N_DAYS_RE = re.compile(r"every (\d+) days?")
+_WEEKLY_RE = re.compile(r"weekly|every week")
+_EVERY_N_WEEKS_RE = re.compile(r"every (\d+) weeks?")
+_MONTHLY_RE = re.compile(r"monthly|every month")
+_EVERY_N_MONTHS_RE = re.compile(r"every (\d+) months?")
+_EVERY_ORDINAL_RE = re.compile(r"every (\d+)(?:st|nd|rd|th)")
+
+_FREQUENCY_WORDS_RE = re.compile(
+    r"\b(?:"
+    r"every\s+\d+\s+(?:days?|weeks?|months?|years?)"
+    r"|every\s+\d+(?:st|nd|rd|th)"
+    r"|every\s+(?:day|week|month|year)"
+    rf"|every\s+(?:{_DAY_NAMES}|{_DAY_ABBREVIATIONS})"
+    rf"|(?:and|or)\s+(?:{_DAY_NAMES})"
+    r"|daily|weekly|monthly|yearly|everyday"
+    rf"|{_DAY_NAMES}|{_DAY_ABBREVIATIONS}"
+    r")\b",
+    re.IGNORECASE,
+)
+
+def _interval(text, every_re, every_n_re):
+    if every_re.search(text):
+        return {"interval": 1}
+    match = every_n_re.search(text)
+    return {"interval": int(match.group(1))} if match else None
+
+def _match_monthly(text):
+    found = _interval(text, _MONTHLY_RE, _EVERY_N_MONTHS_RE)
+    if found:
+        return found
+    match = _EVERY_ORDINAL_RE.search(text)
+    return {"interval": 1, "day": int(match.group(1))} if match else None
+
+def _build_monthly(match_data):
+    result = {"frequency": "monthly", "everyX": match_data["interval"]}
+    if "day" in match_data:
+        result["daysOfMonth"] = [match_data["day"]]
+    return result
+
+def legacy_manual_frequency_parsing(text, weekdays):
+    """The matcher chain as it was, given the text's weekday codes."""
+    text_lower = text.lower().strip()
+    patterns = [
+        (lambda t: _interval(t, _DAILY_RE, _EVERY_N_DAYS_RE),
+         lambda m: {"frequency": "daily", "everyX": m["interval"]}),
+        (lambda t: _interval(t, _WEEKLY_RE, _EVERY_N_WEEKS_RE),
+         lambda m: {"frequency": "weekly", "everyX": m["interval"]}),
+        (_match_monthly, _build_monthly),
+        (lambda _: {"days": weekdays} if weekdays else None,
+         lambda m: {"frequency": "weekly", "everyX": 1, "repeat": _build_repeat(m["days"])}),
+    ]
+    for matcher, builder in patterns:
+        match_data = matcher(text_lower)
+        if match_data:
+            result = builder(match_data)
+            break
+    else:
+        result = {"frequency": "daily", "everyX": 1}
+    result["text"] = _WHITESPACE_RE.sub(" ", _FREQUENCY_WORDS_RE.sub("", text)).strip()
+    return result
+
+# -----------------------------------------------------------------------------
+
+def _weekdays(text):
+    return list(dict.fromkeys(token.value for token in _tokenize(text).having("weekday")))
+
+def _time_per_call(func, inputs, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for args in inputs:
+            func(*args)
+    return (time.perf_counter() - start) / (repeats * len(inputs))
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+
+    # The old chain got its weekdays from the tokenizer, which ran anyway;
+    # they are computed up front so neither side is charged for tokenizing
+    legacy_inputs = [(phrase, _weekdays(phrase)) for phrase in PHRASES]
+    inputs = [(phrase,) for phrase in PHRASES]
+
+    legacy = _time_per_call(legacy_manual_frequency_parsing, legacy_inputs, repeats)
+    current = _time_per_call(_manual_frequency_parsing, inputs, repeats)
+
+    print(f"matcher chain  {legacy * 1e6:8.1f} µs/phrase")
+    print(f"recognizer     {current * 1e6:8.1f} µs/phrase")
+    print(f"speedup        {legacy / current:8.2f}x\n")
+
+    for phrase, weekdays in legacy_inputs:
+        before = legacy_manual_frequency_parsing(phrase, weekdays)
+        after = _manual_frequency_parsing(phrase)
+        if before == after:
+            print(f"  {phrase}")
+        else:
+            print(f"≠ {phrase}\n    before: {before}\n    after:  {after}")
+
+if __name__ == "__main__":
+    main()
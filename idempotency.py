@@ -0,0 +1,130 @@
+"""
+Stored responses for duplicate-submission suppression.
+
+/add_task keeps the response of every successful submission under its
+Idempotency-Key (and, optionally, a fingerprint of user, text and date) so
+that a retried request is answered from here instead of creating the task
+again. Stores are bounded and entries expire after a TTL.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+# "memory" (per process) or "sqlite" (shared by all workers on the host)
+STORE_BACKEND = os.environ.get("IDEMPOTENCY_STORE", "memory")
+STORE_PATH = os.environ.get("IDEMPOTENCY_STORE_PATH", "idempotency.sqlite3")
+STORE_MAX_ENTRIES = int(os.environ.get("IDEMPOTENCY_MAX_ENTRIES", "10000"))
+# How long a response stays replayable for its Idempotency-Key
+KEY_TTL = float(os.environ.get("IDEMPOTENCY_TTL", "86400"))
+# Window in seconds for fingerprint matching without a key; 0 disables it
+DEDUP_WINDOW = float(os.environ.get("DEDUP_WINDOW", "0"))
+
+# =============================================================================
+# STORES
+# =============================================================================
+
+class MemoryResponseStore:
+    """
+    In-process LRU store with per-entry expiry.
+
+    Args:
+        max_entries (int): Entries kept before the least recently used is dropped
+    """
+
+    def __init__(self, max_entries=STORE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the stored value for key, or None if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key, value, ttl):
+        """Store a JSON-serializable value for ttl seconds."""
+        with self._lock:
+            self._entries[key] = (time.time() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+class SqliteResponseStore:
+    """
+    SQLite-backed store shared by every process using the same file.
+
+    Expired rows are purged, and the table trimmed to max_entries, every
+    few hundred writes.
+
+    Args:
+        path (str): SQLite database file
+        max_entries (int): Rows kept after a purge
+    """
+
+    PURGE_EVERY = 200
+
+    def __init__(self, path=STORE_PATH, max_entries=STORE_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self._local = threading.local()
+        self._writes = 0
+        with self._connection() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS responses"
+                         " (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)")
+            conn.execute("CREATE INDEX IF NOT EXISTS responses_expiry ON responses (expires_at)")
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        """Return the stored value for key, or None if missing or expired."""
+        row = self._connection().execute(
+            "SELECT value FROM responses WHERE key = ? AND expires_at > ?",
+            (key, time.time())).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, key, value, ttl):
+        """Store a JSON-serializable value for ttl seconds."""
+        now = time.time()
+        with self._connection() as conn:
+            conn.execute("INSERT OR REPLACE INTO responses (key, value, expires_at) VALUES (?, ?, ?)",
+                         (key, json.dumps(value), now + ttl))
+            self._writes += 1
+            if self._writes % self.PURGE_EVERY == 0:
+                conn.execute("DELETE FROM responses WHERE expires_at <= ?", (now,))
+                conn.execute(
+                    "DELETE FROM responses WHERE key IN (SELECT key FROM responses"
+                    " ORDER BY expires_at DESC LIMIT -1 OFFSET ?)", (self.max_entries,))
+
+    def __len__(self):
+        return self._connection().execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+def make_store():
+    """Build the store selected by IDEMPOTENCY_STORE."""
+    if STORE_BACKEND == "sqlite":
+        return SqliteResponseStore()
+    return MemoryResponseStore()
@@ -0,0 +1,234 @@
+"""
+Durable task submission queue.
+
+Parsed tasks are stored in a SQLite file and drained into Habitica by a
+pool of worker threads, so the API can answer before Habitica does.
+Failed submissions that may succeed later (transport errors, 429, 5xx)
+are retried with exponential backoff; each Habitica user is held to a
+minimum interval between submissions.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+from script import _send_task_to_habitica, _cached_health
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+QUEUE_PATH = os.environ.get("TASK_QUEUE_PATH", "task_queue.sqlite3")
+QUEUE_WORKERS = int(os.environ.get("TASK_QUEUE_WORKERS", "4"))
+QUEUE_MAX_ATTEMPTS = int(os.environ.get("TASK_QUEUE_MAX_ATTEMPTS", "5"))
+# Habitica allows 30 requests per minute per user
+QUEUE_USER_INTERVAL = float(os.environ.get("TASK_QUEUE_USER_INTERVAL", "2"))
+# First retry delay in seconds; doubles with every attempt
+QUEUE_RETRY_BACKOFF = float(os.environ.get("TASK_QUEUE_RETRY_BACKOFF", "5"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    api_token TEXT,
+    text TEXT NOT NULL,
+    task TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    result TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    run_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (status, run_at);
+"""
+
+# =============================================================================
+# QUEUE
+# =============================================================================
+
+class TaskQueue:
+    """
+    SQLite-backed queue of parsed tasks waiting to be sent to Habitica.
+
+    Job states: queued → running → succeeded | failed. A job whose
+    submission fails retryably goes back to queued with a later run_at.
+    API tokens are kept only until the job finishes.
+
+    Args:
+        path (str): SQLite database file
+        workers (int): Number of worker threads
+        max_attempts (int): Submissions per job before giving up
+        user_interval (float): Minimum seconds between two submissions for
+            the same Habitica user
+        retry_backoff (float): Delay before the first retry, doubled per attempt
+    """
+
+    def __init__(self, path=QUEUE_PATH, workers=QUEUE_WORKERS, max_attempts=QUEUE_MAX_ATTEMPTS,
+                 user_interval=QUEUE_USER_INTERVAL, retry_backoff=QUEUE_RETRY_BACKOFF):
+        self.path = path
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.user_interval = user_interval
+        self.retry_backoff = retry_backoff
+
+        self._local = threading.local()
+        self._claim_lock = threading.Lock()
+        self._user_next_send = {}
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._threads = []
+
+        with self._connection() as conn:
+            conn.executescript(_SCHEMA)
+            # Jobs that were in flight when the process died are retried
+            conn.execute("UPDATE jobs SET status = 'queued' WHERE status = 'running'")
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def enqueue(self, user_id, api_token, text, task):
+        """
+        Store a parsed task for submission.
+
+        Returns:
+            str: Job id
+        """
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, user_id, api_token, text, task, status, created_at,"
+                " updated_at, run_at) VALUES (?, ?, ?, ?, ?, 'queued', ?, ?, ?)",
+                (job_id, user_id, api_token, text, json.dumps(task), now, now, now))
+        self._wakeup.set()
+        return job_id
+
+    def get(self, job_id):
+        """
+        Look up a job.
+
+        Returns:
+            dict or None: Public view of the job (never includes the token)
+        """
+        row = self._connection().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+
+        job = {
+            "id": row["id"],
+            "status": row["status"],
+            "attempts": row["attempts"],
+            "text": row["text"],
+            "createdAt": row["created_at"],
+            "updatedAt": row["updated_at"],
+        }
+        if row["status"] == "succeeded":
+            job["task"] = json.loads(row["result"])
+        if row["error"]:
+            job["error"] = row["error"]
+        return job
+
+    def stats(self):
+        """Count jobs per status."""
+        rows = self._connection().execute(
+            "SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+        return {row["status"]: row["n"] for row in rows}
+
+    def start(self):
+        """Start the worker threads."""
+        self._stop.clear()
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"task-queue-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout=5):
+        """Ask the workers to finish their current job and exit."""
+        self._stop.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout=timeout)
+        self._threads = []
+
+    # -------------------------------------------------------------------------
+    # Workers
+    # -------------------------------------------------------------------------
+
+    def _work(self):
+        while not self._stop.is_set():
+            job, wait = self._claim() if _cached_health() else (None, 1.0)
+            if job is None:
+                self._wakeup.wait(timeout=wait)
+                self._wakeup.clear()
+                continue
+            self._run(job)
+
+    def _claim(self):
+        """
+        Mark the oldest ready job of a user who is under budget as running.
+
+        Returns:
+            tuple: (job row or None, seconds to wait before trying again)
+        """
+        now = time.time()
+        wait = 1.0
+        with self._claim_lock:
+            conn = self._connection()
+            with conn:
+                candidates = conn.execute(
+                    "SELECT * FROM jobs WHERE status = 'queued' AND run_at <= ?"
+                    " ORDER BY run_at LIMIT 100", (now,)).fetchall()
+                if len(self._user_next_send) > 10000:
+                    self._user_next_send = {user: at for user, at in self._user_next_send.items()
+                                            if at > now}
+                for row in candidates:
+                    next_send = self._user_next_send.get(row["user_id"], 0)
+                    if next_send > now:
+                        wait = min(wait, next_send - now)
+                        continue
+                    claimed = conn.execute(
+                        "UPDATE jobs SET status = 'running', attempts = attempts + 1,"
+                        " updated_at = ? WHERE id = ? AND status = 'queued'",
+                        (now, row["id"])).rowcount
+                    if claimed:
+                        self._user_next_send[row["user_id"]] = now + self.user_interval
+                        return row, 0
+
+                next_run_at = conn.execute(
+                    "SELECT MIN(run_at) FROM jobs WHERE status = 'queued' AND run_at > ?",
+                    (now,)).fetchone()[0]
+                if next_run_at is not None:
+                    wait = min(wait, next_run_at - now)
+        return None, wait
+
+    def _run(self, job):
+        result = _send_task_to_habitica(job["user_id"], job["api_token"], json.loads(job["task"]))
+        attempts = job["attempts"] + 1
+        now = time.time()
+
+        with self._connection() as conn:
+            if result["success"]:
+                conn.execute(
+                    "UPDATE jobs SET status = 'succeeded', api_token = NULL, result = ?,"
+                    " error = NULL, updated_at = ? WHERE id = ?",
+                    (json.dumps(result["data"]["data"]), now, job["id"]))
+            elif result.get("retryable") and attempts < self.max_attempts:
+                run_at = now + self.retry_backoff * 2 ** (attempts - 1)
+                conn.execute(
+                    "UPDATE jobs SET status = 'queued', error = ?, updated_at = ?, run_at = ?"
+                    " WHERE id = ?", (result["error"], now, run_at, job["id"]))
+            else:
+                conn.execute(
+                    "UPDATE jobs SET status = 'failed', api_token = NULL, error = ?,"
+                    " updated_at = ? WHERE id = ?", (result["error"], now, job["id"]))
@@ -0,0 +1,214 @@
+"""
+Per-language rule tables for the parser.
+
+Each table lists the words and phrases the parser recognizes in one
+language. They are plain data: script.py compiles the tables of the
+languages enabled with PARSE_LANGUAGES into keyword maps and regular
+expressions once, at import, and every parse uses the set for its
+language. Adding a language means adding a table here.
+
+Phrases are lowercase and may span several words ("day after tomorrow");
+any run of whitespace matches between the words. Weekdays are numbered
+from Monday = 0.
+
+Keys:
+    date_languages: dateparser languages for dates outside the fast path
+        (None: DATEPARSER_LANGUAGES)
+    recurrent: Whether recurrent understands the language
+    habit, up, down: Words marking a habit and its buttons
+    difficulty: Habitica priority → words for it, easiest first
+    weekdays: Weekday names, in dates and recurrences
+    recurring_weekdays: Names that only ever mean a recurrence ("mon",
+        "montags", "piątki")
+    range_weekdays: Short names only used in ranges ("Mo-Fr")
+    date_prefixes: Words before a date that belong to it ("on", "by")
+    relative_days: Phrase → days from today
+    date_in, date_units: "in 3 days": the word before the count, and
+        unit → days
+    next, this: Modifiers of a weekday in a date; "next" skips today
+    every, other, on, and, or: Connectives of recurrences
+    units: Unit after a count ("every 3 days") → "day", "week", "month" or "year"
+    period_units: Unit straight after "every" → the same
+    adverbs: Single words for a period ("daily") → the same
+    ordinal: Regex of a day of the month ("15th")
+    month_suffix: Phrases after days of the month ("of the month")
+    range_from, range_to: Words around a range of weekdays
+    workdays, workday, weekends, weekend: Plural phrases, which may stand
+        alone, and singular ones, which follow "every"
+    frequency: Words that make a text a daily
+    qualified_every: Words that make a text a daily only when followed by
+        a count, unit or weekday (Polish "co" is also "what")
+    warmup: Phrases warm_up parses, to load the language's dateparser data
+"""
+
+# =============================================================================
+# ENGLISH
+# =============================================================================
+
+EN = {
+    "date_languages": None,
+    "recurrent": True,
+    "habit": ("habit",),
+    "up": ("up",),
+    "down": ("down",),
+    "difficulty": {"0.1": ("trivial",), "1": ("easy",), "1.5": ("medium",), "2": ("hard",)},
+    "weekdays": {"monday": 0, "tuesday": 1, "wednesday": 2, "thursday": 3, "friday": 4,
+                 "saturday": 5, "sunday": 6},
+    "recurring_weekdays": {"mon": 0, "tue": 1, "wed": 2, "thu": 3, "fri": 4, "sat": 5, "sun": 6},
+    "range_weekdays": {},
+    "date_prefixes": ("on", "by", "due"),
+    "relative_days": {"today": 0, "tomorrow": 1, "day after tomorrow": 2},
+    "date_in": ("in",),
+    "date_units": {"day": 1, "days": 1, "week": 7, "weeks": 7},
+    "next": ("next",),
+    "this": ("this",),
+    "every": ("every",),
+    "other": ("other",),
+    "on": ("on",),
+    "and": ("and",),
+    "or": ("or",),
+    "units": {"day": "day", "days": "day", "week": "week", "weeks": "week",
+              "month": "month", "months": "month", "year": "year", "years": "year"},
+    "period_units": {"day": "day", "week": "week", "month": "month", "year": "year"},
+    "adverbs": {"everyday": "day", "daily": "day", "weekly": "week", "monthly": "month",
+                "yearly": "year"},
+    "ordinal": r"\d{1,2}(?:st|nd|rd|th)",
+    "month_suffix": ("of the month", "of each month", "of every month"),
+    "range_from": (),
+    "range_to": ("to", "through", "thru"),
+    "workdays": ("weekdays",),
+    "workday": ("weekday",),
+    "weekends": ("weekends",),
+    "weekend": ("weekend",),
+    "frequency": ("every", "everyday", "daily", "weekly", "monthly", "weekdays", "weekends"),
+    "qualified_every": (),
+    "warmup": (
+        "buy milk tomorrow",
+        "dentist appointment on 5 march",
+        "exercise every monday and friday hard",
+        "pay rent every 15th",
+        "habit drink water +",
+        "$20 movie night",
+    ),
+}
+
+# =============================================================================
+# POLISH
+# =============================================================================
+
+# Weekdays are listed in the cases dates use: nominative and accusative
+# ("w piątek") and genitive ("do piątku"). Plurals mean a recurrence ("w
+# piątki"), except "środy" and "soboty", which are also genitive singular.
+PL = {
+    "date_languages": ["pl"],
+    "recurrent": False,
+    "habit": ("nawyk",),
+    "up": (),
+    "down": (),
+    "difficulty": {"0.1": ("banalne", "banalny", "banalna", "trywialne", "trywialny"),
+                   "1": ("łatwe", "łatwy", "łatwa"),
+                   "1.5": ("średnie", "średni", "średnia"),
+                   "2": ("trudne", "trudny", "trudna")},
+    "weekdays": {"poniedziałek": 0, "poniedziałku": 0, "wtorek": 1, "wtorku": 1,
+                 "środa": 2, "środę": 2, "środy": 2, "czwartek": 3, "czwartku": 3,
+                 "piątek": 4, "piątku": 4, "sobota": 5, "sobotę": 5, "soboty": 5,
+                 "niedziela": 6, "niedzielę": 6, "niedzieli": 6},
+    "recurring_weekdays": {"poniedziałki": 0, "wtorki": 1, "czwartki": 3, "piątki": 4,
+                           "niedziele": 6},
+    "range_weekdays": {"pon": 0, "wt": 1, "śr": 2, "czw": 3, "pt": 4, "sob": 5, "nd": 6,
+                       "ndz": 6, "niedz": 6},
+    "date_prefixes": ("w", "we", "na", "do"),
+    "relative_days": {"dziś": 0, "dzisiaj": 0, "jutro": 1, "pojutrze": 2},
+    "date_in": ("za",),
+    "date_units": {"dzień": 1, "dni": 1, "tydzień": 7, "tygodnie": 7, "tygodni": 7},
+    "next": ("następny", "następną", "przyszły", "przyszłą"),
+    "this": ("ten", "tę", "tą", "najbliższy", "najbliższą"),
+    "every": ("co", "każdy", "każdą", "każde", "każdego", "w każdy", "w każdą", "we wszystkie"),
+    "other": ("drugi", "drugą", "drugie"),
+    "on": ("w", "we"),
+    "and": ("i", "oraz"),
+    "or": ("lub", "albo"),
+    "units": {"dzień": "day", "dni": "day", "tydzień": "week", "tygodnie": "week",
+              "tygodni": "week", "miesiąc": "month", "miesiące": "month", "miesięcy": "month",
+              "rok": "year", "lata": "year", "lat": "year"},
+    "period_units": {"dzień": "day", "dnia": "day", "tydzień": "week", "tygodnia": "week",
+                     "miesiąc": "month", "miesiąca": "month", "rok": "year", "roku": "year"},
+    "adverbs": {"codziennie": "day", "cotygodniowo": "week", "comiesięcznie": "month",
+                "corocznie": "year"},
+    "ordinal": r"\d{1,2}(?:\.|-go|-ego)?",
+    "month_suffix": ("dnia miesiąca", "każdego miesiąca", "miesiąca"),
+    "range_from": ("od",),
+    "range_to": ("do",),
+    "workdays": ("dni robocze", "dni powszednie"),
+    "workday": ("dzień roboczy", "dzień powszedni"),
+    "weekends": ("weekendy",),
+    "weekend": ("weekend",),
+    "frequency": ("codziennie", "cotygodniowo", "comiesięcznie", "corocznie", "każdy", "każdą",
+                  "każde", "każdego", "poniedziałki", "wtorki", "czwartki", "piątki",
+                  "niedziele", "weekendy", "robocze", "powszednie"),
+    "qualified_every": ("co",),
+    "warmup": (
+        "kupić mleko jutro",
+        "dentysta 5 marca",
+        "siłownia w poniedziałki i piątki trudne",
+        "czynsz każdego 10. dnia miesiąca",
+        "nawyk pić wodę +",
+    ),
+}
+
+# =============================================================================
+# GERMAN
+# =============================================================================
+
+DE = {
+    "date_languages": ["de"],
+    "recurrent": False,
+    "habit": ("gewohnheit",),
+    "up": (),
+    "down": (),
+    "difficulty": {"0.1": ("trivial",), "1": ("leicht",), "1.5": ("mittel",),
+                   "2": ("schwer",)},
+    "weekdays": {"montag": 0, "dienstag": 1, "mittwoch": 2, "donnerstag": 3, "freitag": 4,
+                 "samstag": 5, "sonnabend": 5, "sonntag": 6},
+    "recurring_weekdays": {"montags": 0, "dienstags": 1, "mittwochs": 2, "donnerstags": 3,
+                           "freitags": 4, "samstags": 5, "sonnabends": 5, "sonntags": 6},
+    "range_weekdays": {"mo": 0, "di": 1, "mi": 2, "do": 3, "fr": 4, "sa": 5, "so": 6},
+    "date_prefixes": ("am", "bis", "bis zum", "fällig am"),
+    "relative_days": {"heute": 0, "morgen": 1, "übermorgen": 2},
+    "date_in": ("in",),
+    "date_units": {"tag": 1, "tagen": 1, "woche": 7, "wochen": 7},
+    "next": ("nächsten", "nächster", "nächste", "kommenden", "kommender", "kommende"),
+    "this": ("diesen", "dieser", "diese"),
+    "every": ("jeden", "jede", "jedes", "alle"),
+    "other": ("zweiten", "zweite", "zwei"),
+    "on": ("am", "an"),
+    "and": ("und",),
+    "or": ("oder",),
+    "units": {"tag": "day", "tage": "day", "tagen": "day", "woche": "week", "wochen": "week",
+              "monat": "month", "monate": "month", "monaten": "month",
+              "jahr": "year", "jahre": "year", "jahren": "year"},
+    "period_units": {"tag": "day", "woche": "week", "monat": "month", "jahr": "year"},
+    "adverbs": {"täglich": "day", "wöchentlich": "week", "monatlich": "month",
+                "jährlich": "year"},
+    "ordinal": r"\d{1,2}\.",
+    "month_suffix": ("des monats", "jedes monats", "im monat"),
+    "range_from": ("von",),
+    "range_to": ("bis",),
+    "workdays": ("werktags", "wochentags", "werktagen", "wochentagen"),
+    "workday": ("werktag", "wochentag"),
+    "weekends": ("wochenends", "wochenenden", "wochenende"),
+    "weekend": ("wochenende",),
+    "frequency": ("jeden", "jede", "jedes", "alle", "täglich", "wöchentlich", "monatlich",
+                  "jährlich", "werktags", "wochentags", "wochenends", "montags", "dienstags",
+                  "mittwochs", "donnerstags", "freitags", "samstags", "sonnabends", "sonntags"),
+    "qualified_every": (),
+    "warmup": (
+        "Milch kaufen morgen",
+        "Zahnarzt am 5. März",
+        "Sport jeden Montag und Freitag schwer",
+        "Miete zahlen jeden 15.",
+        "Gewohnheit Wasser trinken +",
+    ),
+}
+
+LANGUAGES = {"en": EN, "pl": PL, "de": DE}
@@ -0,0 +1,163 @@
+"""
+Persistent parse cache shared by every worker on the host.
+
+TaskParser's in-memory cache is per process and empty after a restart.
+This SQLite file sits behind it: a miss there is looked up here before
+the text is parsed, and fresh results are written back. Rows are keyed by
+normalized text, its language, the user's timezone and date and the parser
+version, so results from other days or from other parsing rules are never
+served; they are purged along with the oldest rows beyond the size bound.
+"""
+
+import datetime
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+# SQLite file of the cache; empty disables it
+CACHE_PATH = os.environ.get("PARSE_CACHE_PATH", "")
+# Rows kept after a purge
+CACHE_MAX_ENTRIES = int(os.environ.get("PARSE_CACHE_DISK_ENTRIES", "50000"))
+
+# =============================================================================
+# STORE
+# =============================================================================
+
+class SqliteParseCache:
+    """
+    SQLite-backed parse results, shared by every process using the same file.
+
+    Reads never write, so hits don't contend across workers. Every few
+    hundred writes, rows of other parser versions or from before yesterday
+    (users west of us may still be on it) are purged and the table is
+    trimmed to max_entries, oldest first. SQLite errors (a locked or
+    unwritable file) are counted and treated as misses: the cache must
+    never fail a parse.
+
+    Args:
+        path (str): SQLite database file
+        version (str): Parser version; rows of any other version are ignored
+        max_entries (int): Rows kept after a purge
+    """
+
+    PURGE_EVERY = 200
+
+    def __init__(self, path, version, max_entries=CACHE_MAX_ENTRIES):
+        self.path = path
+        self.version = version
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self._local = threading.local()
+        self._writes = 0
+        self._lock = threading.Lock()
+        with self._connection() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS parses"
+                         " (text TEXT NOT NULL, day TEXT NOT NULL, version TEXT NOT NULL,"
+                         " task TEXT NOT NULL, created_at REAL NOT NULL,"
+                         " PRIMARY KEY (text, day, version))")
+            conn.execute("CREATE INDEX IF NOT EXISTS parses_age ON parses (created_at)")
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _count(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def get(self, text, day, zone=None, language="en"):
+        """
+        Look up the task parsed from text, in language, on day, in zone.
+
+        Args:
+            text (str): Normalized text
+            day (datetime.date): The user's date
+            zone (datetime.tzinfo): The user's timezone; None for the server's clock
+            language (str): The text's language
+
+        Returns:
+            dict or None: The stored task, None on a miss or an error
+        """
+        try:
+            row = self._connection().execute(
+                "SELECT task FROM parses WHERE text = ? AND day = ? AND version = ?",
+                (text, _day_key(day, zone, language), self.version)).fetchone()
+        except sqlite3.Error:
+            self._count("errors")
+            return None
+        self._count("hits" if row else "misses")
+        return json.loads(row[0]) if row else None
+
+    def put(self, text, day, task, zone=None, language="en"):
+        """Store the task parsed from text, in language, on day, in zone."""
+        try:
+            with self._connection() as conn:
+                conn.execute("INSERT OR REPLACE INTO parses (text, day, version, task, created_at)"
+                             " VALUES (?, ?, ?, ?, ?)",
+                             (text, _day_key(day, zone, language), self.version, json.dumps(task),
+                              time.time()))
+                with self._lock:
+                    self._writes += 1
+                    purge = self._writes % self.PURGE_EVERY == 0
+                if purge:
+                    self._purge(conn, day)
+        except sqlite3.Error:
+            self._count("errors")
+
+    def _purge(self, conn, day):
+        conn.execute("DELETE FROM parses WHERE version != ? OR day < ?",
+                     (self.version, (day - datetime.timedelta(days=1)).isoformat()))
+        conn.execute("DELETE FROM parses WHERE rowid IN (SELECT rowid FROM parses"
+                     " ORDER BY created_at DESC LIMIT -1 OFFSET ?)", (self.max_entries,))
+
+    def info(self):
+        """
+        Report cache effectiveness.
+
+        Returns:
+            dict: path, parser version, hits, misses, errors and row count
+        """
+        try:
+            rows = self._connection().execute("SELECT COUNT(*) FROM parses").fetchone()[0]
+        except sqlite3.Error:
+            rows = None
+        with self._lock:
+            return {"path": self.path, "version": self.version, "hits": self.hits,
+                    "misses": self.misses, "errors": self.errors, "rows": rows}
+
+def _day_key(day, zone, language):
+    """The day column: the date and language, then the timezone if there is one."""
+    key = f"{day.isoformat()} {language}"
+    return key if zone is None else f"{key} {zone}"
+
+def make_parse_cache(version):
+    """
+    Build the cache configured by PARSE_CACHE_PATH.
+
+    Args:
+        version (str): Parser version
+
+    Returns:
+        SqliteParseCache or None: None if the cache is off or can't be opened
+    """
+    if not CACHE_PATH or not version:
+        return None
+    try:
+        return SqliteParseCache(CACHE_PATH, version)
+    except sqlite3.Error as e:
+        print(f"Parse cache disabled, can't open {CACHE_PATH}: {e}", file=sys.stderr)
+        return None
@@ -4,18 +4,270 @@ Habitica Natural Language Task Parser
 A command-line tool that converts natural language into Habitica tasks.
 Supports todos, habits, dailies, and rewards with smart parsing.
 
-Usage: python habitica_nlp.py <user_id> <api_token>
+Usage: python script.py <user_id> <api_token> [--file PATH]
+       python script.py --dry-run --file PATH [--output PATH] [--processes N]
 """
 
+import time
+
+_IMPORT_STARTED = time.perf_counter()
+
 import requests
 import json
+import os
 import sys
 import datetime
 import re
 import datetime
-from dateparser.search import search_dates
-from recurrent import RecurringEvent
+import threading
+import argparse
+import asyncio
+import bisect
+import contextvars
+import functools
+import hashlib
+import importlib.metadata
+import operator
+import multiprocessing
+from collections import OrderedDict, namedtuple
+from contextlib import contextmanager
+import httpx
+try:
+    import orjson
+except ImportError:
+    orjson = None
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, TimeoutError as FutureTimeout
+from dateutil import parser as date_parser
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from dateutil.rrule import DAILY, WEEKLY, MONTHLY
+from parse_cache import make_parse_cache
+import languages
+
+# =============================================================================
+# HEAVY DEPENDENCIES
+# =============================================================================
+
+# dateparser and recurrent dominate import time. In "lazy" mode (default) they
+# are imported on first use; "eager" imports them along with this module.
+IMPORT_MODE = os.environ.get("NLP_IMPORT_MODE", "lazy")
+
+_startup_timings = {
+    "importMode": IMPORT_MODE,
+    "moduleImportSeconds": None,
+    "dependencyImportSeconds": {},
+    "warmupSeconds": None,
+    "firstParseSeconds": None,
+}
+
+_search_dates = None
+_RecurringEvent = None
+_dependency_lock = threading.Lock()
+
+def _load_search_dates():
+    """Import dateparser's search_dates on first use."""
+    global _search_dates
+    if _search_dates is None:
+        with _dependency_lock:
+            if _search_dates is None:
+                started = time.perf_counter()
+                from dateparser.search import search_dates
+                _startup_timings["dependencyImportSeconds"]["dateparser"] = time.perf_counter() - started
+                _search_dates = search_dates
+    return _search_dates
+
+def _load_recurring_event():
+    """Import recurrent's RecurringEvent on first use."""
+    global _RecurringEvent
+    if _RecurringEvent is None:
+        with _dependency_lock:
+            if _RecurringEvent is None:
+                started = time.perf_counter()
+                from recurrent import RecurringEvent
+                _startup_timings["dependencyImportSeconds"]["recurrent"] = time.perf_counter() - started
+                _RecurringEvent = RecurringEvent
+    return _RecurringEvent
+
+if IMPORT_MODE == "eager":
+    _load_search_dates()
+    _load_recurring_event()
+
+# =============================================================================
+# METRICS
+# =============================================================================
+
+# With metrics disabled the stage timers are never installed, so the hot
+# path runs exactly as if they didn't exist.
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "1") == "1"
+
+# Histogram bucket upper bounds in seconds, from cache hits to slow upstreams
+LATENCY_BUCKETS = (0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01,
+                   0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class _Counter:
+    """Prometheus-style counter with one set of labels."""
+    
+    def __init__(self, name, help_text, labels):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.values = {}
+        self.lock = threading.Lock()
+    
+    def inc(self, *label_values):
+        with self.lock:
+            self.values[label_values] = self.values.get(label_values, 0) + 1
+    
+    def drain(self):
+        """Take the values counted so far, leaving the counter at zero."""
+        with self.lock:
+            values, self.values = self.values, {}
+        return values
+    
+    def merge(self, values):
+        """Add values drained from the same counter in another process."""
+        with self.lock:
+            for label_values, value in values.items():
+                self.values[label_values] = self.values.get(label_values, 0) + value
+    
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self.lock:
+            for label_values, value in sorted(self.values.items()):
+                lines.append(f"{self.name}{{{_format_labels(self.labels, label_values)}}} {value}")
+        return lines
+
+class _Histogram:
+    """Prometheus-style histogram with fixed buckets and one set of labels."""
+    
+    def __init__(self, name, help_text, labels, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.buckets = buckets
+        self.series = {}  # label values -> [bucket counts..., sum, count]
+        self.lock = threading.Lock()
+    
+    def observe(self, seconds, *label_values):
+        index = bisect.bisect_left(self.buckets, seconds)
+        with self.lock:
+            series = self.series.get(label_values)
+            if series is None:
+                series = self.series[label_values] = [0] * (len(self.buckets) + 2)
+            if index < len(self.buckets):
+                series[index] += 1
+            series[-2] += seconds
+            series[-1] += 1
+    
+    def drain(self):
+        """Take the observations so far, leaving the histogram empty."""
+        with self.lock:
+            series, self.series = self.series, {}
+        return series
+    
+    def merge(self, series):
+        """Add observations drained from the same histogram in another process."""
+        with self.lock:
+            for label_values, other in series.items():
+                mine = self.series.get(label_values)
+                if mine is None:
+                    self.series[label_values] = list(other)
+                else:
+                    self.series[label_values] = [a + b for a, b in zip(mine, other)]
+    
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self.lock:
+            for label_values, series in sorted(self.series.items()):
+                labels = _format_labels(self.labels, label_values)
+                cumulative = 0
+                for bound, count in zip(self.buckets, series):
+                    cumulative += count
+                    lines.append(f'{self.name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f'{self.name}_bucket{{{labels},le="+Inf"}} {series[-1]}')
+                lines.append(f"{self.name}_sum{{{labels}}} {series[-2]}")
+                lines.append(f"{self.name}_count{{{labels}}} {series[-1]}")
+        return lines
+
+def _format_labels(names, values):
+    return ",".join(f'{name}="{value}"' for name, value in zip(names, values))
+
+_TASKS_PARSED = _Counter("nlp_tasks_total", "Tasks parsed, by task type", ("type",))
+_STAGE_SECONDS = _Histogram("nlp_parse_stage_seconds", "Time spent in each parsing stage",
+                            ("stage",))
+_FREQUENCY_SECONDS = _Histogram("nlp_frequency_parse_seconds",
+                                "Frequency parsing time, by the branch that produced the result",
+                                ("branch",))
+_DATE_SECONDS = _Histogram("nlp_date_parse_seconds",
+                           "Date extraction time, by the branch that produced the result",
+                           ("branch",))
+_PARSE_DEGRADED = _Counter("nlp_parse_degraded_total",
+                           "Parses that skipped a slow library call, by stage and reason",
+                           ("stage", "reason"))
+_UPSTREAM_SECONDS = _Histogram("habitica_request_seconds",
+                               "Habitica API latency including retries", ("method", "path"))
+_UPSTREAM_RESPONSES = _Counter("habitica_responses_total",
+                               "Habitica API responses by status code ('error' for transport failures)",
+                               ("method", "path", "status"))
+
+# Recorded wherever texts are parsed, so parser processes send theirs back
+# to the parent (see _in_worker)
+_PARSE_METRICS = [_TASKS_PARSED, _STAGE_SECONDS, _FREQUENCY_SECONDS, _DATE_SECONDS,
+                  _PARSE_DEGRADED]
+_METRICS = _PARSE_METRICS + [_UPSTREAM_SECONDS, _UPSTREAM_RESPONSES]
+
+def _timed(stage):
+    """Decorator recording a function's run time under nlp_parse_stage_seconds."""
+    def decorate(func):
+        if not METRICS_ENABLED:
+            return func
+        
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                _STAGE_SECONDS.observe(time.perf_counter() - started, stage)
+        return wrapper
+    return decorate
+
+def _record_upstream(method, path, started, status):
+    """Record one Habitica call's latency and status code."""
+    if METRICS_ENABLED:
+        _UPSTREAM_SECONDS.observe(time.perf_counter() - started, method, path)
+        _UPSTREAM_RESPONSES.inc(method, path, status)
+
+def render_metrics():
+    """
+    Render all metrics in the Prometheus text exposition format.
+    
+    Cache counters are read at scrape time, so they're always present.
+    
+    Returns:
+        str: Metrics text
+    """
+    lines = []
+    for metric in _METRICS:
+        lines.extend(metric.render())
+    
+    cache = _task_parser.cache_info()
+    health = _health_stats()
+    for name, help_text, kind, value in (
+        ("nlp_parse_cache_hits_total", "Parse cache hits", "counter", cache["hits"]),
+        ("nlp_parse_cache_misses_total", "Parse cache misses", "counter", cache["misses"]),
+        ("nlp_parse_cache_entries", "Parse cache occupancy", "gauge", cache["size"]),
+        ("nlp_parse_disk_cache_hits_total", "Persistent parse cache hits", "counter",
+         cache.get("disk", {}).get("hits", 0)),
+        ("nlp_parse_disk_cache_misses_total", "Persistent parse cache misses", "counter",
+         cache.get("disk", {}).get("misses", 0)),
+        ("habitica_health_cache_hits_total", "Fresh health state reads", "counter", health["hits"]),
+        ("habitica_health_cache_misses_total", "Stale health state reads", "counter", health["misses"]),
+        ("habitica_breaker_open", "1 if the circuit breaker is open", "gauge", int(health["breakerOpen"])),
+    ):
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}", f"{name} {value}"]
+    
+    return "\n".join(lines) + "\n"
 
 # =============================================================================
 # MAIN FUNCTIONS
@@ -23,13 +275,40 @@ from dateutil.rrule import DAILY, WEEKLY, MONTHLY
 
 def main():
     """Main entry point for the script."""
-    if len(sys.argv) < 3:
-        print("Usage: python script.py <user_id> <api_token>")
-        sys.exit(1)
-    
-    user_id = sys.argv[1]
-    api_token = sys.argv[2]
+    parser = argparse.ArgumentParser(description="Create Habitica tasks from natural language.")
+    parser.add_argument("user_id", nargs="?", help="Habitica user ID")
+    parser.add_argument("api_token", nargs="?", help="Habitica API token")
+    parser.add_argument("--file", metavar="PATH",
+                        help="create one task per line of PATH ('-' for stdin) instead of prompting")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="only parse --file and write the tasks as JSON lines; no credentials needed")
+    parser.add_argument("--output", metavar="PATH", default="-",
+                        help="where --dry-run writes its JSON lines (default: stdout)")
+    parser.add_argument("--processes", type=int,
+                        help="parser processes for --file; 0 parses in this process (default:"
+                             " PARSE_PROCESSES, and one per CPU for --dry-run)")
+    args = parser.parse_args()
+    
+    if args.dry_run:
+        if not args.file:
+            parser.error("--dry-run needs --file")
+        processes = args.processes if args.processes is not None else os.cpu_count() or 1
+        _run_dry_run(args.file, args.output, processes)
+        _close_parse_pool()
+        return
+    if not args.user_id or not args.api_token:
+        parser.error("user_id and api_token are required")
+    
+    if args.file:
+        _run_batch(args.user_id, args.api_token, args.file, args.processes)
+    else:
+        _run_interactive(args.user_id, args.api_token)
     
+    _close_parse_pool()
+    _close_client()
+
+def _run_interactive(user_id, api_token):
+    """Prompt for tasks until the user quits."""
     print("Habitica Natural Language Task Creator")
     print("Type your task naturally (e.g., 'exercise every monday', 'buy groceries tomorrow')")
     
@@ -50,6 +329,67 @@ def main():
         else:
             print(f"❌ Error: {result['error']}")
 
+def _run_batch(user_id, api_token, path, processes=None):
+    """Create a task for every non-empty line of a file or stdin."""
+    if path == "-":
+        lines = sys.stdin.read().splitlines()
+    else:
+        with open(path, encoding="utf-8") as f:
+            lines = f.read().splitlines()
+    
+    texts = [line.strip() for line in lines if line.strip()]
+    results = create_tasks_from_texts(user_id, api_token, texts, processes=processes)
+    
+    for text, result in zip(texts, results):
+        if result["success"]:
+            print(f"✅ {text}")
+        else:
+            print(f"❌ {text}: {result['error']}")
+    
+    failed = sum(not result["success"] for result in results)
+    print(f"\n{len(results) - failed}/{len(results)} tasks created")
+    if failed:
+        sys.exit(1)
+
+# Lines read per round, per parser process; bounds memory
+DRY_RUN_CHUNK = 500
+
+def _run_dry_run(path, output, processes):
+    """
+    Stream a file through the parser, writing one JSON object per line.
+    
+    Input is read and parsed in bounded chunks spread over `processes`
+    worker processes (0 parses in this one), so memory stays flat for any
+    file size and output order matches input order.
+    """
+    source = sys.stdin if path == "-" else open(path, encoding="utf-8")
+    sink = sys.stdout if output == "-" else open(output, "w", encoding="utf-8")
+    chunk_size = DRY_RUN_CHUNK * max(1, processes)
+    pool = _get_parse_pool(processes) if processes else None
+    
+    try:
+        line_number = 0
+        while True:
+            chunk = []
+            for line in source:
+                line_number += 1
+                if line.strip():
+                    chunk.append((line_number, line))
+                if len(chunk) >= chunk_size:
+                    break
+            if not chunk:
+                break
+            
+            lines = [line for _, line in chunk]
+            explained = _map_in_pool(_explain_tasks, lines, pool) if pool else _explain_tasks(lines)
+            for (number, _), result in zip(chunk, explained):
+                sink.write(json.dumps({"line": number, **result}) + "\n")
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
+
 def create_task_from_text(user_id, api_token, text):
     """
     Main function to create a Habitica task from natural language text.
@@ -62,534 +402,3027 @@ def create_task_from_text(user_id, api_token, text):
     Returns:
         dict: Success status and result data or error message
     """
-    if not _check_habitica_connection():
+    if not _habitica_is_up():
         return {"success": False, "error": "Habitica API unavailable"}
     
-    # Parse the text and build the task
-    task_data = _build_task_from_text(text)
+    # Parse the text and build the task, on the user's clock
+    task_data = _build_task_from_text(text, _user_parse_context(user_id, api_token))
     
     # Send to Habitica API
     return _send_task_to_habitica(user_id, api_token, task_data)
 
-# =============================================================================
-# TASK PARSING FUNCTIONS
-# =============================================================================
+# Maximum number of task submissions in flight for a single batch
+BATCH_CONCURRENCY = int(os.environ.get("HABITICA_BATCH_CONCURRENCY", "5"))
 
-def _build_task_from_text(text):
+def create_tasks_from_texts(user_id, api_token, texts, concurrency=BATCH_CONCURRENCY,
+                            processes=None):
     """
-    Parse natural language text and build a complete task object.
+    Create many Habitica tasks at once.
+    
+    All texts are parsed up front, then submitted concurrently with at most
+    `concurrency` requests in flight.
     
     Args:
-        text (str): Natural language task description
+        user_id (str): Habitica user ID
+        api_token (str): Habitica API token
+        texts (list): Natural language task descriptions
+        concurrency (int): Maximum parallel submissions
+        processes (int): Parser processes; 0 parses in this process
+            (default: PARSE_PROCESSES)
         
     Returns:
-        dict: Complete task object ready for Habitica API
+        list: One result dict per text, in input order
     """
-    # Step 1: Determine what type of task this is
-    task_type = _determine_task_type(text)
-    
-    # Step 2: Build base task object
-    task = {"type": task_type}
+    if not _habitica_is_up():
+        return [{"success": False, "error": "Habitica API unavailable"} for _ in texts]
+    
+    if processes is None:
+        processes = PARSE_PROCESSES
+    build = functools.partial(_build_tasks_from_texts,
+                              context=_user_parse_context(user_id, api_token))
+    if processes:
+        parsed = _map_in_pool(build, texts, _get_parse_pool(processes))
+    else:
+        parsed = build(texts)
     
-    # Step 3: Add type-specific parsing
-    if task_type == "reward":
-        _parse_reward_task(task, text)
-    elif task_type == "habit":
-        _parse_habit_task(task, text)
-    elif task_type == "todo":
-        _parse_todo_task(task, text)
-    elif task_type == "daily":
-        _parse_daily_task(task, text)
+    def submit(item):
+        if not item["success"]:
+            return item
+        return _send_task_to_habitica(user_id, api_token, item["task"])
     
-    return task
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        return list(pool.map(submit, parsed))
+
+# =============================================================================
+# PARSE ENGINE
+# =============================================================================
+
+# Number of parsed tasks kept in the in-process LRU cache (0 disables it)
+PARSE_CACHE_SIZE = int(os.environ.get("PARSE_CACHE_SIZE", "1024"))
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+# Reference time for relative dates; None means the real clock. Set through
+# freeze_clock() so benchmarks and tests get reproducible dates.
+_frozen_now = None
 
-def _determine_task_type(text):
+# Whose clock and language a parse runs on: `now` is the user's wall-clock
+# time, moved back by their day start (Habitica's "custom day start"), `zone`
+# the timezone due dates are anchored in (both None: the server's clock), and
+# `language` one of PARSE_LANGUAGES
+ParseContext = namedtuple("ParseContext", "now zone language")
+
+# The ParseContext of the parse in progress, if any. A context variable, so
+# it follows the parse onto the PARSE_SLOW_THREADS helpers.
+_parse_context = contextvars.ContextVar("parse_context", default=None)
+
+def parse_context(zone=None, day_start=0, now=None, language=None):
     """
-    Analyze text to determine what type of Habitica task it should be.
+    Build the ParseContext for a user.
     
-    Rules:
-    - Contains "$" → reward
-    - Contains "habit" or "+" or "-" → habit  
-    - Contains frequency words → daily
-    - Default → todo
-    """
-    text_lower = text.lower().strip()
+    Args:
+        zone (datetime.tzinfo): The user's timezone; None parses on the
+            server's clock, with due dates at UTC midnight
+        day_start (int): Hour the user's day starts at; earlier hours still
+            count as the day before
+        now (datetime.datetime): Timezone-aware reference time (default: now)
+        language (str): Language of the texts (default: DEFAULT_LANGUAGE)
     
-    if "$" in text:
-        return "reward"
-    elif any(keyword in text_lower for keyword in ["habit", "+", "-"]):
-        return "habit"
-    elif any(keyword in text_lower for keyword in ["every", "daily", "weekly", "monthly"]):
-        return "daily"
-    else:
-        return "todo"
+    Returns:
+        ParseContext: Context to pass to _build_task_from_text
+    """
+    language = language or DEFAULT_LANGUAGE
+    if language not in _LANGUAGE_RULES:
+        raise ValueError(f"language {language!r} is not enabled (PARSE_LANGUAGES)")
+    if zone is None:
+        return ParseContext(None, None, language)
+    local = (now or datetime.datetime.now(datetime.timezone.utc)).astimezone(zone)
+    return ParseContext(local.replace(tzinfo=None) - datetime.timedelta(hours=day_start), zone,
+                        language)
 
-# =============================================================================
-# TASK TYPE PARSERS
-# =============================================================================
+def _now():
+    """Current reference datetime for parsing: the user's, if a context sets one."""
+    context = _parse_context.get()
+    if context is not None and context.now is not None:
+        return context.now
+    return _frozen_now or datetime.datetime.now()
 
-def _parse_reward_task(task, text):
-    """Parse a reward task - extracts value and clean text."""
-    value = _extract_reward_value(text)
-    clean_text = text.replace(f"${value}", "").strip() if value else text
-    
-    task["value"] = int(value) if value else 10  # Default value
-    task["text"] = clean_text
+def _today():
+    """Current reference date for parsing."""
+    return _now().date()
 
-def _parse_habit_task(task, text):
-    """Parse a habit task - determines up/down buttons and difficulty."""
-    # Remove the word "habit" from text
-    clean_text = text.replace("habit", "").strip()
+@contextmanager
+def freeze_clock(moment):
+    """
+    Parse as if the current time were `moment` inside the with block.
     
-    # Determine which buttons should be enabled
-    has_up = "up" in clean_text or "+" in clean_text
-    has_down = "down" in clean_text or "-" in clean_text
+    Args:
+        moment (datetime.datetime): Reference time for relative dates
+    """
+    global _frozen_now
+    previous = _frozen_now
+    _frozen_now = moment
+    try:
+        yield
+    finally:
+        _frozen_now = previous
+
+class TaskParser:
+    """
+    Memoizing front end for the parsing pipeline.
     
-    # If neither specified, enable both (default behavior)
-    if not has_up and not has_down:
-        has_up = has_down = True
+    Results are kept in a bounded LRU cache keyed by the normalized text,
+    the language, the user's timezone and today's date there, so relative
+    expressions ("tomorrow") are re-parsed once the user's day changes.
+    With PARSE_CACHE_PATH set, misses fall through to a
+    SQLite cache shared by every worker and kept across restarts, further
+    keyed by the parser version. The parser also owns the RecurringEvent
+    instances, which are expensive to build; recurrent keeps per-parse
+    state on them, so each thread gets its own.
     
-    # Clean up the text
-    clean_text = clean_text.replace("up", "").replace("down", "")
-    clean_text = clean_text.replace("+", "").replace("-", "").strip()
+    With a parser pool, the workers' parsers send their counters back with
+    every chunk (see _in_worker); cache_info() includes them.
     
-    # Extract difficulty and finalize text
-    difficulty, final_text = _extract_difficulty(clean_text)
+    Args:
+        cache_size (int): Maximum number of cached results (0 disables caching)
+    """
     
-    task["up"] = has_up
-    task["down"] = has_down
-    task["priority"] = difficulty
-    task["text"] = final_text
+    def __init__(self, cache_size=PARSE_CACHE_SIZE):
+        self.cache_size = cache_size
+        self.hits = 0
+        self.misses = 0
+        self._workers = {}  # parser process id -> its latest counters()
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._disk = None
+        self._disk_opened = False
+    
+    def _disk_cache(self):
+        """The persistent cache, opened on first use; None if it is off."""
+        if not self._disk_opened:
+            with self._lock:
+                if not self._disk_opened:
+                    self._disk = make_parse_cache(parser_version())
+                    self._disk_opened = True
+        return self._disk
+    
+    def parse(self, text, context=None):
+        """
+        Parse text into a Habitica task, serving repeats from the cache.
+        
+        Args:
+            text (str): Natural language task description
+            context (ParseContext): The user's clock and language; None
+                parses DEFAULT_LANGUAGE on the server's clock, with due
+                dates at UTC midnight
+        
+        Returns:
+            dict: A fresh task object the caller is free to mutate
+        """
+        text = _normalize_text(text)
+        today = context.now.date() if context and context.now else _today()
+        zone = context.zone if context else None
+        language = context.language if context else DEFAULT_LANGUAGE
+        key = (text, today, zone, language)
+        
+        with self._lock:
+            task = self._cache.get(key)
+            if task is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                if METRICS_ENABLED:
+                    _TASKS_PARSED.inc(task.type)
+                return task.to_dict()
+            self.misses += 1
+        
+        disk = self._disk_cache()
+        task_data = disk.get(text, today, zone, language) if disk else None
+        if task_data is not None:
+            if METRICS_ENABLED:
+                _TASKS_PARSED.inc(task_data["type"])
+            self._remember(key, Task.from_dict(task_data))
+            return task_data
+        
+        started = time.perf_counter()
+        token = _parse_context.set(context)
+        try:
+            task = _parse_task(text)
+        finally:
+            _parse_context.reset(token)
+        if _startup_timings["firstParseSeconds"] is None:
+            _startup_timings["firstParseSeconds"] = time.perf_counter() - started
+        if METRICS_ENABLED:
+            _TASKS_PARSED.inc(task.type)
+        
+        task_data = task.to_dict()
+        if not (task.degraded and _TRANSIENT_DEGRADATIONS & set(task.degraded.values())):
+            self._remember(key, task)
+            if disk:
+                disk.put(text, today, task_data, zone, language)
+        return task_data
+    
+    def _remember(self, key, task):
+        """Keep task in the in-memory cache; it is never mutated once there."""
+        if self.cache_size > 0:
+            with self._lock:
+                self._cache[key] = task
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+    
+    def recurring_event(self):
+        """Return this thread's RecurringEvent for the reference date."""
+        events = getattr(self._local, "events", None)
+        if events is None:
+            events = self._local.events = {}
+        today = _today()
+        event = events.get(today)
+        if event is None:
+            # Users on either side of midnight need two or three dates at once
+            if len(events) >= 3:
+                events.clear()
+            event = events[today] = _load_recurring_event()(now_date=_now())
+        return event
+    
+    def counters(self):
+        """
+        This process's cache counters, to send to the parent of a parser pool.
+        
+        Returns:
+            dict: hits, misses and size, and the persistent cache's hits,
+                misses and errors under "disk" if it is on
+        """
+        disk = self._disk_cache()
+        with self._lock:
+            counters = {"hits": self.hits, "misses": self.misses, "size": len(self._cache)}
+        if disk:
+            counters["disk"] = {"hits": disk.hits, "misses": disk.misses, "errors": disk.errors}
+        return counters
+    
+    def add_worker(self, pid, counters):
+        """Keep the latest counters() of the parser process pid."""
+        with self._lock:
+            self._workers[pid] = counters
+    
+    def cache_info(self):
+        """
+        Report cache effectiveness, across this process and its parser pool.
+        
+        With a pool, this process only counts once it has parsed something
+        itself, so an API that only hands texts to the pool reports just
+        the workers.
+        
+        Returns:
+            dict: hits, misses, hit rate, current size and capacity summed
+                over the processes counted ("processes"), plus the
+                persistent cache's counters under "disk" if it is on
+        """
+        disk = self._disk_cache()
+        with self._lock:
+            workers = list(self._workers.values())
+            counted = list(workers)
+            if not workers or self.hits or self.misses:
+                counted.insert(0, {"hits": self.hits, "misses": self.misses,
+                                   "size": len(self._cache)})
+        hits = sum(counters["hits"] for counters in counted)
+        misses = sum(counters["misses"] for counters in counted)
+        info = {
+            "hits": hits,
+            "misses": misses,
+            "hitRate": hits / (hits + misses) if hits + misses else 0.0,
+            "size": sum(counters["size"] for counters in counted),
+            "maxSize": self.cache_size * len(counted),
+            "processes": len(counted),
+        }
+        if disk:
+            info["disk"] = disk.info()
+            for counters in workers:
+                for name, value in counters.get("disk", {}).items():
+                    info["disk"][name] += value
+        return info
+    
+    def clear_cache(self):
+        """Drop all cached results and reset the counters."""
+        with self._lock:
+            self._cache.clear()
+            self._workers.clear()
+            self.hits = self.misses = 0
 
-def _parse_todo_task(task, text):
-    """Parse a todo task - extracts due date and difficulty."""
-    # replace "monday" with "2025-08-28" to avoid interpreting d.strftime("weekdays as in the past
-    text = _replace_weekday_with_date(text)
-    # Extract any date information
-    date_info = _extract_date_from_text(text)
+def _normalize_text(text):
+    """Trim the text and collapse runs of whitespace to single spaces."""
+    return _WHITESPACE_RE.sub(" ", text).strip()
+
+# Sections of this file whose code decides what a text parses to
+_PARSER_SECTIONS = ("# PARSE ENGINE\n", "# HEALTH STATE\n")
+
+@functools.lru_cache(maxsize=None)
+def parser_version():
+    """
+    Fingerprint of everything that decides what a text parses to.
     
-    # Extract difficulty from remaining text
-    difficulty, final_text = _extract_difficulty(date_info["text"])
+    Hashes the parsing code in this file, the language rule tables, the
+    dateparser and recurrent versions and the settings that change results,
+    so results cached on disk are dropped as soon as any of them changes.
     
-    task["text"] = final_text
-    task["priority"] = difficulty
-    if date_info["date"]:
-        task["date"] = f"{date_info['date']}T00:00:00.000Z"
+    Returns:
+        str or None: The fingerprint, None if the source can't be read
+    """
+    try:
+        with open(__file__, encoding="utf-8") as f:
+            source = f.read()
+        with open(languages.__file__, encoding="utf-8") as f:
+            tables = f.read()
+    except OSError:
+        return None
+    start, end = (source.find(header) for header in _PARSER_SECTIONS)
+    digest = hashlib.sha256(source[start:end].encode())
+    digest.update(tables.encode())
+    for package in ("dateparser", "recurrent"):
+        try:
+            digest.update(f"{package}={importlib.metadata.version(package)}".encode())
+        except importlib.metadata.PackageNotFoundError:
+            digest.update(f"{package}=?".encode())
+    digest.update(f"{DATE_LANGUAGES}{PARSE_MAX_CHARS}".encode())
+    return digest.hexdigest()[:16]
 
-def _parse_daily_task(task, text):
-    """Parse a daily task - extracts frequency pattern and difficulty."""
-    # Extract frequency information (most complex part)
-    frequency_info = _extract_frequency_pattern(text)
+_task_parser = TaskParser()
+
+def warm_up():
+    """
+    Import the NLP libraries and run a few canned parses.
     
-    # Extract difficulty from the cleaned text
-    difficulty, final_text = _extract_difficulty(frequency_info["text"])
+    Each enabled language parses its table's warmup phrases: one per parser
+    branch, plus a date outside the fast path so dateparser loads that
+    language's locale data. Parses bypass the cache so they don't skew its
+    hit/miss counters.
     
-    # Build the complete daily task
-    task.update(frequency_info)
-    task["priority"] = difficulty
-    task["text"] = final_text
+    Returns:
+        float: Seconds spent warming up
+    """
+    started = time.perf_counter()
+    _load_search_dates()
+    _load_recurring_event()
+    for language, rules in _LANGUAGE_RULES.items():
+        token = _parse_context.set(parse_context(language=language))
+        try:
+            for phrase in rules.warmup:
+                _parse_task(phrase)
+        finally:
+            _parse_context.reset(token)
+    _startup_timings["warmupSeconds"] = time.perf_counter() - started
+    return _startup_timings["warmupSeconds"]
+
+def _startup_stats():
+    """
+    Report import, warmup and first-parse timings for this process.
+    
+    Returns:
+        dict: Import mode and the timings in seconds (None if not yet measured)
+    """
+    return {**_startup_timings,
+            "dependencyImportSeconds": dict(_startup_timings["dependencyImportSeconds"])}
 
 # =============================================================================
-# EXTRACTION UTILITIES
+# PARSE POOL
 # =============================================================================
 
-def _extract_reward_value(text):
-    """Extract dollar amount from reward text (e.g., '$50' → '50')."""
-    if "$" not in text:
-        return ""
-    
-    match = re.search(r"\$(\d+)", text)
-    return match.group(1) if match else ""
+# Worker processes that parse for the API and the bulk CLI; 0 parses in the
+# calling process
+PARSE_PROCESSES = int(os.environ.get("PARSE_PROCESSES", "0"))
+# Texts sent to a worker per round trip. Results come back as one pickled
+# list per chunk, which shares the repeated dict keys across the chunk.
+PARSE_POOL_CHUNK = int(os.environ.get("PARSE_POOL_CHUNK", "64"))
+
+_parse_pool = None
+_parse_pool_lock = threading.Lock()
 
-def _extract_difficulty(text):
+def _init_parse_worker(frozen_now):
+    """Pool initializer: adopt the parent's clock and warm this process's parsers."""
+    global _frozen_now
+    _frozen_now = frozen_now
+    warm_up()
+
+def _new_parse_pool(processes):
     """
-    Extract difficulty level from text and return clean text.
+    Start a pool of warmed parser processes.
     
-    Supported formats:
-    - trivial, !0 → 0.1 (trivial)
-    - easy, !1 → 1.0 (easy) 
-    - medium, !2 → 1.5 (medium)
-    - hard, !3 → 2.0 (hard)
+    Workers are spawned rather than forked: the API forks from a process
+    that already runs threads (parse executor, job workers), and a
+    fork can inherit one of their locks held.
     
+    Args:
+        processes (int): Number of worker processes
+        
     Returns:
-        tuple: (difficulty_value, clean_text)
+        ProcessPoolExecutor: Pool whose workers have all finished warming up
     """
-    difficulty_map = {
-        ("trivial", "!0"): "0.1",
-        ("easy", "!1"): "1",
-        ("medium", "!2"): "1.5", 
-        ("hard", "!3"): "2",
-    }
-    
-    text_lower = text.lower()
-    
-    for keywords, difficulty_value in difficulty_map.items():
-        for keyword in keywords:
-            if keyword in text_lower:
-                clean_text = text.replace(keyword, "", 1).strip()
-                return difficulty_value, clean_text
-    
-    # Default to easy if no difficulty specified
-    return "1", text
+    pool = ProcessPoolExecutor(max_workers=processes,
+                               mp_context=multiprocessing.get_context("spawn"),
+                               initializer=_init_parse_worker, initargs=(_frozen_now,))
+    # Workers start on demand; make them all start, and wait until each has
+    # warmed up and answered
+    ready = set()
+    while len(ready) < processes:
+        ready.update(future.result() for future in
+                     [pool.submit(_parse_worker_pid) for _ in range(processes)])
+    return pool
 
-def _extract_date_from_text(text):
+def _in_worker(func, arg):
     """
-    Extract date information from text using smart date parsing.
+    Run func(arg) in a parser process, returning the result with the
+    process's parse statistics for _merge_worker_stats in the parent.
     
-    Returns:
-        dict: {"date": "YYYY-MM-DD" or "", "text": "remaining text"}
+    Metrics are drained, so each observation reaches the parent once;
+    cache counters are totals, which the parent keeps per process.
     """
-    # enforce DMY first, prevent MDY fallback
-    results = search_dates(
-        text,
-        settings={
-            "DATE_ORDER": "DMY",
-            "PREFER_DAY_OF_MONTH": "first",
-            "RETURN_AS_TIMEZONE_AWARE": False
-        }
-    )
-    
-    if not results:
-        return {"date": "", "text": text}
-    
-    date_match, date_obj = results[-1]
-    formatted_date = date_obj.strftime("%Y-%m-%d")
-    clean_text = text.replace(date_match, "").strip()
-    
-    return {"date": formatted_date, "text": clean_text}
+    result = func(arg)
+    return result, {"pid": os.getpid(),
+                    "metrics": [metric.drain() for metric in _PARSE_METRICS],
+                    "cache": _task_parser.counters()}
 
-def _replace_weekday_with_date(text):
+def _merge_worker_stats(stats):
+    """Fold a parser process's statistics from _in_worker into this process's."""
+    for metric, values in zip(_PARSE_METRICS, stats["metrics"]):
+        metric.merge(values)
+    _task_parser.add_worker(stats["pid"], stats["cache"])
+
+def _parse_worker_pid():
+    """Pool readiness probe; lingers briefly so one worker can't answer for all."""
+    time.sleep(0.05)
+    return os.getpid()
+
+def _get_parse_pool(processes=None):
     """
-    CURRENTLY NOT FUNCTIONING!!!
-    Replace weekday words with a natural language date.
-    Makes the API work. Don't ask.
+    Shared parser pool, started on first use.
     
-    Examples:
-    - "monday" → "oct 13"
+    Args:
+        processes (int): Pool size if it has to be started
+            (default: PARSE_PROCESSES, or one per CPU)
+    """
+    global _parse_pool
+    with _parse_pool_lock:
+        if _parse_pool is None:
+            _parse_pool = _new_parse_pool(processes or PARSE_PROCESSES or os.cpu_count() or 1)
+        return _parse_pool
+
+def _close_parse_pool():
+    """Shut down the shared parser pool, if it was started."""
+    global _parse_pool
+    with _parse_pool_lock:
+        if _parse_pool is not None:
+            _parse_pool.shutdown()
+            _parse_pool = None
+
+def _chunked(texts, size=PARSE_POOL_CHUNK):
+    """Split texts into lists of at most size items."""
+    return [texts[start:start + size] for start in range(0, len(texts), size)]
+
+def _map_in_pool(func, texts, pool=None):
+    """
+    Run func over chunks of texts in a parser pool.
     
+    Args:
+        func (callable): Takes a list of texts and returns one result per text
+        texts (list): Texts to process
+        pool (ProcessPoolExecutor): Pool to use (default: the shared pool)
+        
     Returns:
-        str: Formatted date string
+        list: Results in input order
     """
-    
-    return text
+    pool = pool or _get_parse_pool()
+    results = []
+    for chunk, stats in pool.map(functools.partial(_in_worker, func), _chunked(list(texts))):
+        _merge_worker_stats(stats)
+        results.extend(chunk)
+    return results
 
 # =============================================================================
-# FREQUENCY PARSING (MOST COMPLEX PART)
+# PARSE BUDGET
 # =============================================================================
 
-def _extract_frequency_pattern(text):
+# Milliseconds one parse may spend before dateparser and recurrent are
+# skipped or abandoned; 0 means no limit
+PARSE_DEADLINE_MS = float(os.environ.get("PARSE_DEADLINE_MS", "0"))
+# Texts longer than this never reach dateparser or recurrent
+PARSE_MAX_CHARS = int(os.environ.get("PARSE_MAX_CHARS", "1000"))
+# Threads that run library calls under a deadline. A call that overran
+# keeps its thread until it returns, so this also caps abandoned work.
+PARSE_SLOW_THREADS = int(os.environ.get("PARSE_SLOW_THREADS", "4"))
+
+# Degradations that depend on load rather than on the text; results
+# carrying one of them aren't cached
+_TRANSIENT_DEGRADATIONS = {"deadline", "busy"}
+
+_slow_executor = None
+_slow_executor_lock = threading.Lock()
+_slow_slots = threading.BoundedSemaphore(PARSE_SLOW_THREADS)
+
+def _get_slow_executor():
+    """Return the executor for library calls under a deadline, creating it on first use."""
+    global _slow_executor
+    if _slow_executor is None:
+        with _slow_executor_lock:
+            if _slow_executor is None:
+                _slow_executor = ThreadPoolExecutor(max_workers=PARSE_SLOW_THREADS,
+                                                    thread_name_prefix="parse-slow")
+    return _slow_executor
+
+def _within_budget(stage, func, text):
     """
-    Extract frequency pattern from text for daily tasks.
+    Run a slow third-party parsing call within the parse's budget.
     
-    This is the most complex parsing because it needs to handle:
-    - "every day", "daily" → daily frequency
-    - "every monday" → weekly on mondays
-    - "every monday and friday" → weekly on multiple days
-    - "every 2 weeks" → weekly with interval
-    - "every 15th" → monthly on specific day
+    Texts over PARSE_MAX_CHARS are refused outright. With PARSE_DEADLINE_MS
+    set, the call runs on a helper thread and is abandoned when the parse's
+    deadline passes; it is skipped if the deadline has already passed or
+    every helper thread is still busy with earlier calls. A refused call is
+    recorded as a degradation of the parse, and the caller takes its
+    cheaper path.
+    
+    Args:
+        stage (str): "date" or "frequency"
+        func (callable): The call, taking text
+        text (str): Task text
     
     Returns:
-        dict: Frequency information in Habitica format
+        The call's result, or None if it was refused
     """
-    # Try smart parsing first with recurrent library
-    smart_result = _try_smart_frequency_parsing(text)
-    if smart_result:
-        return smart_result
-    
-    # Fall back to manual pattern matching
-    return _manual_frequency_parsing(text)
+    if len(text) > PARSE_MAX_CHARS:
+        return _degrade(stage, "tooLong")
+    
+    deadline = getattr(_trace, "deadline", None)
+    if deadline is None:
+        return func(text)
+    
+    remaining = deadline - time.perf_counter()
+    if remaining <= 0:
+        return _degrade(stage, "deadline")
+    if not _slow_slots.acquire(blocking=False):
+        return _degrade(stage, "busy")
+    
+    cuts = getattr(_trace, "cuts", None)
+    future = _get_slow_executor().submit(contextvars.copy_context().run, _call_traced, func,
+                                         text, cuts is not None)
+    future.add_done_callback(lambda _: _slow_slots.release())
+    try:
+        result, helper_cuts = future.result(timeout=remaining)
+    except FutureTimeout:
+        return _degrade(stage, "deadline")
+    if helper_cuts:
+        cuts.extend(helper_cuts)
+    return result
 
-def _try_smart_frequency_parsing(text):
+def _call_traced(func, text, tracing):
     """
-    Use the recurrent library for intelligent frequency parsing.
+    func(text) on a helper thread, with the cuts it made if the caller traces.
     
-    This handles complex natural language like "every other tuesday"
-    or "twice a week" that simple regex can't handle.
+    The cuts only reach the caller's trace with a result it uses, so an
+    abandoned call can't add to a later parse's spans.
     """
+    _trace.cuts = [] if tracing else None
     try:
-        parser = RecurringEvent()
-        rrule = parser.parse(text.lower())
-        
-        if rrule:
-            return _convert_rrule_to_habitica_format(rrule, text)
-            
-    except Exception:
-        # If smart parsing fails, we'll use manual parsing
-        pass
-    
+        return func(text), _trace.cuts
+    finally:
+        _trace.cuts = None
+
+def _degrade(stage, reason):
+    """Record that stage fell back to its cheaper path for reason."""
+    if METRICS_ENABLED:
+        _PARSE_DEGRADED.inc(stage, reason)
+    degraded = getattr(_trace, "degraded", None)
+    if degraded is not None:
+        degraded[stage] = reason
     return None
 
-def _convert_rrule_to_habitica_format(rrule, original_text):
+def _strip_parse_notes(task_data):
+    """The task without the fields that are meant for our callers, not Habitica."""
+    if "degraded" not in task_data:
+        return task_data
+    return {key: value for key, value in task_data.items() if key != "degraded"}
+
+# =============================================================================
+# TASK MODEL
+# =============================================================================
+
+class Task:
     """
-    Convert a dateutil rrule object into Habitica's frequency format.
+    A parsed task, in the fields Habitica's task API takes.
     
-    This maps recurrent's output to what Habitica expects in the API.
+    The parsing steps fill one in; fields left as None were not set and
+    are left out of to_dict(). The parse cache keeps Task objects and hands
+    out a fresh dict per call, which copies far less than deep-copying a
+    cached dict.
+    
+    Args:
+        type (str): "todo", "daily", "habit" or "reward"
     """
-    frequency = rrule._freq
-    interval = rrule._interval or 1
-    weekdays = rrule._byweekday
-    month_days = rrule._bymonthday
     
-    clean_text = _remove_frequency_words_from_text(original_text)
-    base_result = {"text": clean_text}
+    __slots__ = ("type", "text", "priority", "date", "value", "up", "down", "frequency",
+                 "every_x", "repeat", "days_of_month", "tags", "degraded")
     
-    if frequency == DAILY:
-        return {
-            "frequency": "daily",
-            "everyX": interval,
-            **base_result
-        }
+    # (attribute, Habitica field), in the order to_dict() writes them
+    FIELDS = (("type", "type"), ("text", "text"), ("priority", "priority"), ("date", "date"),
+              ("value", "value"), ("up", "up"), ("down", "down"), ("frequency", "frequency"),
+              ("every_x", "everyX"), ("repeat", "repeat"), ("days_of_month", "daysOfMonth"),
+              ("tags", "tags"), ("degraded", "degraded"))
     
-    elif frequency == WEEKLY:
-        result = {
-            "frequency": "weekly",
-            "everyX": interval,
-            **base_result
-        }
-        
-        # Add specific weekdays if specified
-        if weekdays:
-            result["repeat"] = _build_weekday_repeat_object(weekdays)
-        
-        return result
+    def __init__(self, type):
+        self.type = type
+        self.text = self.priority = self.date = self.value = self.up = self.down = None
+        self.frequency = self.every_x = self.repeat = self.days_of_month = None
+        self.tags = self.degraded = None
     
-    elif frequency == MONTHLY:
+    def to_dict(self):
+        """
+        The task as a JSON-ready dict the caller is free to mutate.
+        
+        Returns:
+            dict: Habitica field names to values, set fields only
+        """
+        task = {}
+        for attribute, field in self.FIELDS:
+            value = getattr(self, attribute)
+            if value is not None:
+                # Lists and dicts hold only scalars, so one level of copying is enough
+                task[field] = value.copy() if isinstance(value, (list, dict)) else value
+        return task
+    
+    @classmethod
+    def from_dict(cls, data):
+        """Rebuild a Task from to_dict() output."""
+        task = cls(data["type"])
+        for attribute, field in cls.FIELDS[1:]:
+            setattr(task, attribute, data.get(field))
+        return task
+
+# =============================================================================
+# TASK PARSING FUNCTIONS
+# =============================================================================
+
+def _build_task_from_text(text, context=None):
+    """
+    Parse natural language text and build a complete task object.
+    
+    Repeated texts are answered from the shared TaskParser's cache.
+    
+    Args:
+        text (str): Natural language task description
+        context (ParseContext): The user's clock (see parse_context); None
+            parses on the server's
+        
+    Returns:
+        dict: Complete task object ready for Habitica API
+    """
+    return _task_parser.parse(text, context)
+
+@_timed("end_to_end")
+def _parse_task(text):
+    """
+    Run the full, uncached parsing pipeline on text.
+    
+    Slow library calls are bounded by PARSE_DEADLINE_MS and PARSE_MAX_CHARS
+    (see _within_budget). If any was skipped, task.degraded maps the
+    stage to the reason; it is stripped before the task is sent.
+    
+    Args:
+        text (str): Natural language task description
+        
+    Returns:
+        Task: The parsed task
+    """
+    _trace.deadline = (time.perf_counter() + PARSE_DEADLINE_MS / 1000
+                       if PARSE_DEADLINE_MS > 0 else None)
+    _trace.degraded = degraded = {}
+    try:
+        task = _run_parse_steps(text)
+    finally:
+        _trace.deadline = _trace.degraded = None
+    
+    if degraded:
+        task.degraded = degraded
+    return task
+
+def _run_parse_steps(text):
+    """The steps of _parse_task."""
+    # Step 1: Split the text into tokens once; every later step reads them
+    tokens = _tokenize(text)
+    
+    # Step 2: Determine what type of task this is
+    task_type = _determine_task_type(tokens)
+    
+    # Step 3: Build base task object
+    task = Task(task_type)
+    
+    # Step 4: Add type-specific parsing
+    if task_type == "reward":
+        _parse_reward_task(task, tokens)
+    elif task_type == "habit":
+        _parse_habit_task(task, tokens)
+    elif task_type == "todo":
+        _parse_todo_task(task, tokens)
+    elif task_type == "daily":
+        _parse_daily_task(task, tokens)
+    
+    # Step 5: Tags by name; submission resolves them to the user's tag ids
+    tags = tokens.having("tag")
+    if tags:
+        # Once per tag as tags are looked up ("#travel #Travel" is one tag),
+        # spelled as it first appears
+        names = {}
+        for tag in tags:
+            names.setdefault(_lookup_key(tag.value), tag.value)
+        task.tags = list(names.values())
+    
+    return task
+
+def explain_task(text, context=None):
+    """
+    Parse text and report how the parser got to its result.
+    
+    Runs the uncached pipeline with branch tracing switched on. No network
+    I/O is involved.
+    
+    Args:
+        text (str): Natural language task description
+        context (ParseContext): The user's clock; None parses on the server's
+        
+    Returns:
+        dict: {"text": normalized input, "task": {...}, "branches": {stage: branch},
+            "spans": [{"start", "end", "text"}, ...]} where spans are the parts
+            of the input the parser cut out of the task title
+    """
+    text = _normalize_text(text)
+    _trace.branches = {}
+    _trace.cuts = []
+    _trace.titles = {}
+    token = _parse_context.set(context)
+    try:
+        task = _parse_task(text).to_dict()
+        branches, cuts, titles = _trace.branches, _trace.cuts, _trace.titles
+    finally:
+        _trace.branches = _trace.cuts = _trace.titles = None
+        _parse_context.reset(token)
+    
+    return {
+        "text": text,
+        "task": task,
+        "branches": {"type": task["type"], **branches},
+        "spans": _consumed_spans(text, cuts, titles),
+    }
+
+def _explain_tasks(texts, context=None):
+    """explain_task over a list of texts."""
+    return [explain_task(text, context) for text in texts]
+
+def _consumed_spans(text, cuts, titles):
+    """
+    Character ranges of text that the parser cut out, from the recorded cuts.
+    
+    Cuts from text itself (keyword tokens) are taken as they are. The date
+    and frequency steps cut from the title _Tokens.without() left; those
+    are mapped back through the pieces of text the title is made of, so a
+    cut across a removed token becomes one span on either side of it.
+    
+    Args:
+        text (str): Normalized input
+        cuts (list): (string cut from, start, end) as _note_cut recorded them
+        titles (dict): Title → its (title offset, text offset, length) pieces
+    
+    Returns:
+        list: {"start", "end", "text"} per span, in text order, without
+            surrounding whitespace; overlapping cuts are merged
+    """
+    ranges = []
+    for source, start, end in cuts:
+        pieces = [(0, 0, len(text))] if source == text else titles.get(source, ())
+        for offset, original, length in pieces:
+            low, high = max(start, offset), min(end, offset + length)
+            if low < high:
+                ranges.append((original + low - offset, original + high - offset))
+    
+    spans = []
+    for start, end in sorted(ranges):
+        while start < end and text[start].isspace():
+            start += 1
+        while end > start and text[end - 1].isspace():
+            end -= 1
+        if start == end:
+            continue
+        if spans and start <= spans[-1][1]:
+            spans[-1][1] = max(spans[-1][1], end)
+        else:
+            spans.append([start, end])
+    return [{"start": start, "end": end, "text": text[start:end]} for start, end in spans]
+
+def _note_branch(stage, branch):
+    """Record which branch a stage took, when explain_task is tracing."""
+    branches = getattr(_trace, "branches", None)
+    if branches is not None:
+        branches[stage] = branch
+
+def _note_cut(source, start, end):
+    """Record that source[start:end] was cut from the title, when explain_task is tracing."""
+    cuts = getattr(_trace, "cuts", None)
+    if cuts is not None:
+        cuts.append((source, start, end))
+
+_trace = threading.local()
+
+def _build_tasks_from_texts(texts, context=None):
+    """
+    Parse a batch of texts in one pass, all on the same ParseContext.
+    
+    A text that fails to parse doesn't abort the batch; its slot carries
+    the error instead.
+    
+    Returns:
+        list: {"success": True, "task": {...}} or {"success": False, "error": "..."}
+            per text, in input order
+    """
+    results = []
+    for text in texts:
+        try:
+            results.append({"success": True, "task": _build_task_from_text(text, context)})
+        except Exception as e:
+            results.append({"success": False, "error": f"Could not parse task: {e}"})
+    return results
+
+@_timed("determine_task_type")
+def _determine_task_type(tokens):
+    """
+    Analyze the tokens to determine what type of Habitica task it should be.
+    
+    Rules:
+    - Contains "$" → reward
+    - Contains the word "habit" or a standalone "+" or "-" → habit
+    - Contains frequency words → daily
+    - Default → todo
+    """
+    if tokens.has("reward"):
+        return "reward"
+    elif tokens.has("habit") or tokens.has("sign"):
+        return "habit"
+    elif tokens.has("frequency"):
+        return "daily"
+    else:
+        return "todo"
+
+# =============================================================================
+# TASK TYPE PARSERS
+# =============================================================================
+
+def _parse_reward_task(task, tokens):
+    """Parse a reward task - extracts value and clean text."""
+    value, value_token = _extract_reward_value(tokens)
+    
+    task.value = int(value) if value else 10  # Default value
+    # Only the amount used is cut: "$abc" or a second amount stays in the title
+    task.text = tokens.without([value_token] if value_token else [])
+
+def _parse_habit_task(task, tokens):
+    """Parse a habit task - determines up/down buttons and difficulty."""
+    # "habit", "+" and "-" are markers wherever they are; "up"/"down" only
+    # at either end, so "stand up from desk" keeps its "up"
+    markers = tokens.having("habit") + tokens.having("sign") + tokens.at_edges("direction")
+    
+    # Determine which buttons should be enabled
+    directions = {token.value for token in markers if token.category in ("sign", "direction")}
+    has_up = "up" in directions
+    has_down = "down" in directions
+    
+    # If neither specified, enable both (default behavior)
+    if not has_up and not has_down:
+        has_up = has_down = True
+    
+    # Extract difficulty and finalize text
+    difficulty, difficulty_token = _extract_difficulty(tokens)
+    if difficulty_token:
+        markers.append(difficulty_token)
+    
+    task.up = has_up
+    task.down = has_down
+    task.priority = difficulty
+    task.text = tokens.without(markers)
+
+def _parse_todo_task(task, tokens):
+    """Parse a todo task - extracts due date and difficulty."""
+    difficulty, difficulty_token = _extract_difficulty(tokens)
+    text = tokens.without([difficulty_token] if difficulty_token else [])
+    
+    # replace "monday" with "2025-08-28" to avoid interpreting d.strftime("weekdays as in the past
+    text = _replace_weekday_with_date(text)
+    # Extract any date information
+    date_info = _extract_date_from_text(text)
+    
+    task.text = date_info["text"]
+    task.priority = difficulty
+    if date_info["date"]:
+        task.date = _due_date(date_info["date"])
+
+def _due_date(date):
+    """
+    Habitica due date for a "YYYY-MM-DD" date: midnight where the user is.
+    
+    Without a ParseContext, or with one that only sets the language, that
+    is taken to be UTC midnight (never the server's local midnight).
+    """
+    context = _parse_context.get()
+    if context is None or context.zone is None:
+        return f"{date}T00:00:00.000Z"
+    midnight = datetime.datetime.combine(datetime.date.fromisoformat(date), datetime.time(),
+                                         context.zone)
+    return midnight.astimezone(datetime.timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+def _parse_daily_task(task, tokens):
+    """Parse a daily task - extracts frequency pattern and difficulty."""
+    difficulty, difficulty_token = _extract_difficulty(tokens)
+    text = tokens.without([difficulty_token] if difficulty_token else [])
+    
+    # Extract frequency information (most complex part)
+    frequency_info = _extract_frequency_pattern(text)
+    
+    # Build the complete daily task
+    task.frequency = frequency_info["frequency"]
+    task.every_x = frequency_info["everyX"]
+    task.repeat = frequency_info.get("repeat")
+    task.days_of_month = frequency_info.get("daysOfMonth")
+    task.text = frequency_info["text"]
+    task.priority = difficulty
+
+# =============================================================================
+# EXTRACTION UTILITIES
+# =============================================================================
+
+def _extract_reward_value(tokens):
+    """
+    Extract the first dollar amount from reward tokens (e.g., '$50' → '50').
+    
+    Returns:
+        tuple: (amount, or "" if there is none; its token, or None)
+    """
+    for token in tokens.having("reward"):
+        if token.value:
+            return token.value, token
+    return "", None
+
+@_timed("extract_difficulty")
+def _extract_difficulty(tokens):
+    """
+    Find the difficulty keyword among the tokens.
+    
+    Supported formats:
+    - trivial, !0 → 0.1 (trivial)
+    - easy, !1 → 1.0 (easy) 
+    - medium, !2 → 1.5 (medium)
+    - hard, !3 → 2.0 (hard)
+    
+    Each language has its own words for the levels (see languages.py);
+    the "!0"-"!3" shortcuts work in all of them. Keywords count as whole
+    words only ("hardware" is not "hard"). If the text has several, the
+    easiest wins, a word before its shortcut.
+    
+    Returns:
+        tuple: (difficulty_value, token to remove from the text, or None)
+    """
+    candidates = tokens.having("difficulty")
+    if candidates:
+        ranks = _rules().difficulty_ranks
+        token = min(candidates, key=lambda token: ranks[token.text.lower()])
+        _note_branch("difficulty", token.text.lower())
+        return token.value, token
+    
+    _note_branch("difficulty", "default")
+    # Default to easy if no difficulty specified
+    return "1", None
+
+# enforce DMY first, prevent MDY fallback
+DATE_SEARCH_SETTINGS = {
+    "DATE_ORDER": "DMY",
+    "PREFER_DAY_OF_MONTH": "first",
+    "RETURN_AS_TIMEZONE_AWARE": False
+}
+
+# Languages handed to dateparser for English texts; pinning them skips its
+# language detection. Other languages use their own (see languages.py).
+DATE_LANGUAGES = os.environ.get("DATEPARSER_LANGUAGES", "en").split(",")
+
+def _fast_date_pattern(table):
+    """
+    The phrasings that make up nearly all todo dates, in table's language.
+    
+    A leading "on"/"by"/"due" belongs to the date and is removed with it.
+    Numeric dates are the same in every language.
+    """
+    return re.compile(
+        rf"(?:\b(?:{_alternation(table['date_prefixes'])})\s+)?\b(?:"
+        rf"(?P<relative>{_alternation(table['relative_days'])})"
+        rf"|(?:{_alternation(table['date_in'])})\s+(?P<count>\d{{1,3}})"
+        rf"\s+(?P<unit>{_alternation(table['date_units'])})"
+        rf"|(?:(?P<modifier>{_alternation(table['next'] + table['this'])})\s+)?"
+        rf"(?P<weekday>{_alternation(table['weekdays'])})"
+        r"|(?P<iso_year>\d{4})-(?P<iso_month>\d{1,2})-(?P<iso_day>\d{1,2})"
+        r"|(?P<day>\d{1,2})(?P<sep>[./-])(?P<month>\d{1,2})(?P=sep)(?P<year>\d{4})"
+        # Not "today's": a possessive day belongs to the title
+        r")(?![\w'’])",
+        re.IGNORECASE,
+    )
+
+@_timed("extract_date_from_text")
+def _extract_date_from_text(text):
+    """
+    Extract date information from text using smart date parsing.
+    
+    Common phrasings are handled by _fast_extract_date; only the rest go
+    through dateparser's much slower search.
+    
+    Returns:
+        dict: {"date": "YYYY-MM-DD" or "", "text": "remaining text"}
+    """
+    started = time.perf_counter()
+    result = _fast_extract_date(text)
+    branch = "fast"
+    if not result:
+        result = _within_budget("date", _search_date_in_text, text)
+        branch = "dateparser"
+        if result is None:
+            # Out of budget: no date rather than a late one
+            result = {"date": "", "text": text}
+            branch = "degraded"
+    
+    if METRICS_ENABLED:
+        _DATE_SECONDS.observe(time.perf_counter() - started, branch)
+    _note_branch("date", branch if result["date"] else "none")
+    return result
+
+def _fast_extract_date(text, today=None):
+    """
+    Recognize "today", "tomorrow", "in 3 days", "(next) friday",
+    ISO (2025-10-13) and day-first (13/10/2025, 13.10.2025) dates.
+    
+    Weekdays resolve to their next occurrence (today counts, except after
+    "next"), never to one in the past.
+    
+    Args:
+        text (str): Task text
+        today (datetime.date): Reference date, defaults to the current date
+    
+    Returns:
+        dict or None: Same shape as _extract_date_from_text, None on a miss
+    """
+    rules = _rules()
+    matches = list(rules.fast_date_re.finditer(text))
+    if not matches:
+        return None
+    
+    # Like the dateparser path, the last date mentioned wins
+    match = matches[-1]
+    date = _resolve_fast_date(match, today or _today(), rules)
+    if date is None:
+        return None
+    
+    _note_cut(text, match.start(), match.end())
+    clean_text = _WHITESPACE_RE.sub(" ", text[:match.start()] + text[match.end():]).strip()
+    return {"date": date.strftime("%Y-%m-%d"), "text": clean_text}
+
+def _resolve_fast_date(match, today, rules):
+    """Turn a match of rules.fast_date_re into a date, or None if it isn't valid."""
+    if match.group("relative"):
+        phrase = _WHITESPACE_RE.sub(" ", match.group("relative").lower())
+        return today + datetime.timedelta(days=rules.relative_days[phrase])
+    
+    if match.group("count"):
+        days = int(match.group("count")) * rules.date_units[match.group("unit").lower()]
+        return today + datetime.timedelta(days=days)
+    
+    if match.group("weekday"):
+        days_ahead = (rules.weekday_numbers[match.group("weekday").lower()] - today.weekday()) % 7
+        modifier = (match.group("modifier") or "").lower()
+        if days_ahead == 0 and modifier in rules.next_words:
+            days_ahead = 7
+        return today + datetime.timedelta(days=days_ahead)
+    
+    try:
+        if match.group("iso_year"):
+            return datetime.date(int(match.group("iso_year")), int(match.group("iso_month")),
+                                 int(match.group("iso_day")))
+        return datetime.date(int(match.group("year")), int(match.group("month")),
+                             int(match.group("day")))
+    except ValueError:
+        return None
+
+def _search_date_in_text(text):
+    """
+    Extract a date with dateparser's search, pinned to the parse's language.
+    
+    Returns:
+        dict: {"date": "YYYY-MM-DD" or "", "text": "remaining text"}
+    """
+    settings = DATE_SEARCH_SETTINGS
+    context = _parse_context.get()
+    if _frozen_now is not None or (context is not None and context.now is not None):
+        settings = {**settings, "RELATIVE_BASE": _now()}
+    
+    search_dates = _load_search_dates()
+    results = search_dates(text, languages=_rules().date_languages, settings=settings)
+    
+    if not results:
+        return {"date": "", "text": text}
+    
+    date_match, date_obj = results[-1]
+    formatted_date = date_obj.strftime("%Y-%m-%d")
+    if date_match:
+        start = text.find(date_match)
+        while start != -1:
+            _note_cut(text, start, start + len(date_match))
+            start = text.find(date_match, start + len(date_match))
+    clean_text = text.replace(date_match, "").strip()
+    
+    return {"date": formatted_date, "text": clean_text}
+
+def _replace_weekday_with_date(text):
+    """
+    CURRENTLY NOT FUNCTIONING!!!
+    Replace weekday words with a natural language date.
+    Makes the API work. Don't ask.
+    
+    Examples:
+    - "monday" → "oct 13"
+    
+    Returns:
+        str: Formatted date string
+    """
+    
+    return text
+
+# =============================================================================
+# FREQUENCY PARSING (MOST COMPLEX PART)
+# =============================================================================
+
+@_timed("extract_frequency_pattern")
+def _extract_frequency_pattern(text):
+    """
+    Extract frequency pattern from text for daily tasks.
+    
+    This is the most complex parsing because it needs to handle:
+    - "every day", "daily" → daily frequency
+    - "every monday" → weekly on mondays
+    - "every monday and friday", "weekdays", "mon-fri" → weekly on multiple days
+    - "every 2 weeks", "every other tuesday" → weekly with interval
+    - "every 15th", "every 2nd and 15th" → monthly on specific days
+    
+    Args:
+        text (str): Task text
+    
+    Returns:
+        dict: Frequency information in Habitica format
+    """
+    started = time.perf_counter()
+    
+    # Try smart parsing first with recurrent library, if it knows the
+    # language and the budget allows
+    result = None
+    if _rules().recurrent:
+        result = _within_budget("frequency", _try_smart_frequency_parsing, text)
+    branch = "smart"
+    
+    # Fall back to manual pattern matching
+    if not result:
+        result = _manual_frequency_parsing(text)
+        branch = "manual"
+    
+    if METRICS_ENABLED:
+        _FREQUENCY_SECONDS.observe(time.perf_counter() - started, branch)
+    _note_branch("frequency", branch)
+    return result
+
+def _try_smart_frequency_parsing(text):
+    """
+    Use the recurrent library for intelligent frequency parsing.
+    
+    This handles complex natural language like "every other tuesday"
+    or "twice a week" that simple regex can't handle.
+    """
+    try:
+        parser = _task_parser.recurring_event()
+        rrule = parser.parse(text.lower())
+        
+        if rrule:
+            return _convert_rrule_to_habitica_format(rrule, text)
+            
+    except Exception:
+        # If smart parsing fails, we'll use manual parsing
+        pass
+    
+    return None
+
+def _convert_rrule_to_habitica_format(rrule, original_text):
+    """
+    Convert a dateutil rrule object into Habitica's frequency format.
+    
+    This maps recurrent's output to what Habitica expects in the API.
+    """
+    frequency = rrule._freq
+    interval = rrule._interval or 1
+    weekdays = rrule._byweekday
+    month_days = rrule._bymonthday
+    
+    clean_text = _remove_frequency_words_from_text(original_text)
+    base_result = {"text": clean_text}
+    
+    if frequency == DAILY:
+        return {
+            "frequency": "daily",
+            "everyX": interval,
+            **base_result
+        }
+    
+    elif frequency == WEEKLY:
+        result = {
+            "frequency": "weekly",
+            "everyX": interval,
+            **base_result
+        }
+        
+        # Add specific weekdays if specified
+        if weekdays:
+            result["repeat"] = _build_weekday_repeat_object(weekdays)
+        
+        return result
+    
+    elif frequency == MONTHLY:
         result = {
             "frequency": "monthly", 
             "everyX": interval,
             **base_result
         }
         
-        # Add specific days of month if specified  
-        if month_days:
-            result["daysOfMonth"] = list(month_days)
+        # Add specific days of month if specified  
+        if month_days:
+            result["daysOfMonth"] = list(month_days)
+        
+        return result
+    
+    return None
+
+def _manual_frequency_parsing(text):
+    """
+    Manual frequency parsing, from a single scan of the recurrence recognizer.
+    
+    This is the fallback when smart parsing fails. The most specific thing
+    found wins: an interval in days, then in weeks (on the weekdays named,
+    if any), then in months or days of the month, then bare weekdays;
+    without any of them the task repeats daily.
+    """
+    recurrence = _scan_recurrence(text)
+    intervals = recurrence.intervals
+    
+    if "day" in intervals:
+        name, result = "daily", {"frequency": "daily", "everyX": intervals["day"]}
+    elif "week" in intervals:
+        name, result = "weekly", {"frequency": "weekly", "everyX": intervals["week"]}
+        if recurrence.weekdays:
+            result["repeat"] = _build_repeat(recurrence.weekdays)
+    elif "month" in intervals or recurrence.month_days:
+        name, result = "monthly", {"frequency": "monthly", "everyX": intervals.get("month", 1)}
+        if recurrence.month_days:
+            result["daysOfMonth"] = recurrence.month_days
+    elif recurrence.weekdays:
+        name, result = "weekday", {"frequency": "weekly", "everyX": 1,
+                                   "repeat": _build_repeat(recurrence.weekdays)}
+    else:
+        name, result = "default", {"frequency": "daily", "everyX": 1}
+    
+    _note_branch("frequencyPattern", name)
+    result["text"] = recurrence.text
+    return result
+
+# =============================================================================
+# RECURRENCE RECOGNIZER
+# =============================================================================
+
+# Habitica day codes in week order
+_WEEK = ("m", "t", "w", "th", "f", "s", "su")
+
+_DIGITS_RE = re.compile(r"\d+")
+
+def _recurrence_pattern(table):
+    """
+    Every recurrence form of table's language, merged into one regex.
+    
+    Each form is an alternative with a named group. At each position the
+    forms are tried in this order, so a form has to come before any shorter
+    form that matches a prefix of it ("every other monday" before "every
+    other day", "mon-fri" before "mon").
+    """
+    every = _alternation(table["every"])
+    other = _alternation(table["other"])
+    conjunction = _alternation(table["and"])
+    days = {**table["weekdays"], **table["recurring_weekdays"]}
+    day = _alternation(days)
+    range_day = _alternation({**days, **table["range_weekdays"]})
+    ordinal = table["ordinal"]
+    forms = (
+        ("interval", rf"(?:{every})\s+(?P<count>\d+|{other})\s+(?P<unit>{_alternation(table['units'])})"),
+        ("other_weekday", rf"(?:{every})\s+(?:{other})\s+(?P<other_day>{day})"),
+        ("month_days", rf"(?:{every})\s+(?P<ordinals>{ordinal}(?:\s*(?:,|&|{conjunction})\s*{ordinal})*)"
+                       rf"(?:\s+(?:{_alternation(table['month_suffix'])}))?"),
+        ("day_range", rf"(?:(?:{_alternation(table['every'] + table['on'] + table['range_from'])})\s+)?"
+                      rf"(?P<first_day>{range_day})\s*(?:-|–|{_alternation(table['range_to'])})\s*"
+                      rf"(?P<last_day>{range_day})"),
+        ("workdays", rf"(?:(?:{_alternation(table['every'] + table['on'])})\s+)?"
+                     rf"(?:{_alternation(table['workdays'])})"
+                     rf"|(?:{every})\s+(?:{_alternation(table['workday'])})"),
+        ("weekends", rf"(?:(?:{_alternation(table['every'] + table['on'])})\s+)?"
+                     rf"(?:{_alternation(table['weekends'])})"
+                     rf"|(?:{every})\s+(?:{_alternation(table['weekend'])})"),
+        ("period", rf"(?:{every})\s+(?P<every_unit>{_alternation(table['period_units'])})"
+                   rf"|(?P<adverb>{_alternation(table['adverbs'])})"),
+        ("weekday", rf"(?:(?:{_alternation(table['every'] + table['on'] + table['and'] + table['or'])})\s+)?"
+                    rf"(?P<day>{day})"),
+    )
+    # The lookahead lists the first letters of all forms. re can only skip
+    # ahead to candidate positions with a plain character set up front, and
+    # \b alone would have every alternative tried at every word boundary.
+    # The forms end in (?!\w) rather than \b, which would need a word
+    # character after an ordinal like the German "15.".
+    initials = {phrase[0] for key in ("every", "on", "and", "or", "range_from", "weekdays",
+                                      "recurring_weekdays", "range_weekdays", "workdays",
+                                      "weekends", "adverbs")
+                for phrase in table[key]}
+    return re.compile(
+        rf"(?=[{re.escape(''.join(sorted(initials)))}])\b(?:"
+        + "|".join(f"(?P<{name}>{pattern})" for name, pattern in forms) + r")(?!\w)",
+        re.IGNORECASE,
+    )
+
+class _Recurrence:
+    """
+    What one scan of a text found.
+    
+    Attributes:
+        intervals (dict): Unit ("day", "week", "month", "year") → every how
+            many; the first mention of a unit wins
+        weekdays (list): Habitica day codes, without repeats
+        month_days (list): Days of the month, without repeats
+        text (str): The text with every recurrence phrase cut out
+    """
+    
+    __slots__ = ("intervals", "weekdays", "month_days", "text")
+    
+    def __init__(self):
+        self.intervals = {}
+        self.weekdays = []
+        self.month_days = []
+        self.text = ""
+    
+    def add_weekdays(self, codes):
+        """Add day codes that aren't there yet, keeping their order."""
+        self.weekdays.extend(code for code in codes if code not in self.weekdays)
+
+def _on_interval(match, recurrence, rules):
+    count = match["count"]
+    # The only words a count can be are those for "other"
+    recurrence.intervals.setdefault(rules.units[match["unit"].lower()],
+                                    int(count) if count.isdigit() else 2)
+
+def _on_other_weekday(match, recurrence, rules):
+    recurrence.intervals.setdefault("week", 2)
+    recurrence.add_weekdays([rules.weekday_codes[match["other_day"].lower()]])
+
+def _on_month_days(match, recurrence, rules):
+    for ordinal in _DIGITS_RE.findall(match["ordinals"]):
+        day = int(ordinal)
+        if 1 <= day <= 31 and day not in recurrence.month_days:
+            recurrence.month_days.append(day)
+
+def _on_day_range(match, recurrence, rules):
+    first = _WEEK.index(rules.weekday_codes[match["first_day"].lower()])
+    last = _WEEK.index(rules.weekday_codes[match["last_day"].lower()])
+    # "fri-mon" wraps around the weekend
+    recurrence.add_weekdays(_WEEK[(first + offset) % 7] for offset in range((last - first) % 7 + 1))
+
+def _on_workdays(match, recurrence, rules):
+    recurrence.add_weekdays(_WEEK[:5])
+
+def _on_weekends(match, recurrence, rules):
+    recurrence.add_weekdays(_WEEK[5:])
+
+def _on_period(match, recurrence, rules):
+    period = match["every_unit"] or match["adverb"]
+    recurrence.intervals.setdefault(rules.units[period.lower()], 1)
+
+def _on_weekday(match, recurrence, rules):
+    recurrence.add_weekdays([rules.weekday_codes[match["day"].lower()]])
+
+# Form name → what a match of it means
+_RECURRENCE_HANDLERS = {
+    "interval": _on_interval,
+    "other_weekday": _on_other_weekday,
+    "month_days": _on_month_days,
+    "day_range": _on_day_range,
+    "workdays": _on_workdays,
+    "weekends": _on_weekends,
+    "period": _on_period,
+    "weekday": _on_weekday,
+}
+
+# Not @_timed: it runs inside extract_frequency_pattern, which is, and
+# observing a histogram would cost a good share of the call
+def _scan_recurrence(text):
+    """
+    Recognize every recurrence phrase in text in a single regex scan.
+    
+    Handles "daily", "every 3 days", "every other day", "every 2 weeks",
+    "every monday and friday", "every other tuesday", "weekdays",
+    "weekends", "mon-fri", "every 15th", "every 2nd and 15th" and the like,
+    in the parse's language. Each match is handed to the handler of its
+    form and cut from the text.
+    
+    Args:
+        text (str): Task text
+    
+    Returns:
+        _Recurrence: What was found, and the text without it
+    """
+    rules = _rules()
+    recurrence = _Recurrence()
+    pieces = []
+    position = 0
+    for match in rules.recurrence_re.finditer(text):
+        _RECURRENCE_HANDLERS[match.lastgroup](match, recurrence, rules)
+        _note_cut(text, match.start(), match.end())
+        pieces.append(text[position:match.start()])
+        position = match.end()
+    pieces.append(text[position:])
+    # split() collapses the whitespace the cuts leave, like _normalize_text
+    recurrence.text = " ".join(" ".join(pieces).split())
+    return recurrence
+
+def _build_repeat(weekdays):
+    """Habitica repeat object with the given day codes switched on."""
+    return {day: day in weekdays for day in _WEEK}
+
+def _build_weekday_repeat_object(weekdays):
+    """Convert rrule weekdays to Habitica repeat object."""
+    habitica_days = {0: "m", 1: "t", 2: "w", 3: "th", 4: "f", 5: "s", 6: "su"}
+    repeat = {day: False for day in habitica_days.values()}
+    
+    for weekday in weekdays:
+        day_num = weekday.weekday if hasattr(weekday, 'weekday') else weekday
+        if day_num in habitica_days:
+            repeat[habitica_days[day_num]] = True
+    
+    return repeat
+
+def _remove_frequency_words_from_text(text):
+    """
+    Remove frequency-related words to get clean task description.
+    
+    This is important because we don't want "exercise every monday"
+    to become a task called "exercise every monday" - it should just be "exercise".
+    """
+    return _scan_recurrence(text).text
+
+# =============================================================================
+# TOKENIZER
+# =============================================================================
+
+_FREQUENCY = ("frequency", None)
+
+def _keyword_table(table, difficulties, weekday_codes):
+    """
+    Lowercased keyword → (category, value) for table's language, so
+    classifying a match is one lookup.
+    
+    Args:
+        table (dict): The language's table from languages.py
+        difficulties (list): (keyword, priority) pairs
+        weekday_codes (dict): Weekday name → Habitica day code
+    """
+    followers = {*table["other"], *table["units"], *table["period_units"], *weekday_codes,
+                 *(phrase.split()[0] for phrase in table["workday"] + table["weekend"])}
+    days = {**table["weekdays"], **table["recurring_weekdays"]}
+    return {
+        # Weekdays that are also frequency words ("montags") are frequency words
+        **{name: ("weekday", weekday_codes[name]) for name in days},
+        **{word: ("habit", None) for word in table["habit"]},
+        "+": ("sign", "up"),
+        "-": ("sign", "down"),
+        **{word: ("direction", "up") for word in table["up"]},
+        **{word: ("direction", "down") for word in table["down"]},
+        **{keyword: ("difficulty", value) for keyword, value in difficulties},
+        **{word: _FREQUENCY for word in table["frequency"]},
+        # Words that mean "every" only before the words in the set
+        **{word: ("qualified", frozenset(followers)) for word in table["qualified_every"]},
+        # Day ranges written as one word: "mon-fri", "monday–friday"
+        **{f"{first}{dash}{last}": _FREQUENCY
+           for first in weekday_codes for last in weekday_codes for dash in "-–"},
+    }
+
+# Characters trimmed off a word before looking it up, so "hard," and
+# "(mon)" are keywords; "!" only on the right, where it isn't "!3"
+_LEADING_PUNCTUATION = "([{\"'"
+_TRAILING_PUNCTUATION = ".,;:!?)]}\"'"
+
+_Token = namedtuple("_Token", "text start end category value index")
+_token_start = operator.attrgetter("start")
+
+class _Tokens:
+    """
+    Keyword tokens of a task text, with their spans and categories.
+    
+    The parsers ask the stream for the tokens they care about and remove
+    them by span, instead of rescanning the text with `in` and replace().
+    
+    Attributes:
+        text (str): The tokenized text
+        tokens (list): Keyword tokens in text order; `index` is the token's
+            position among all words of the text
+        word_count (int): Number of words in the text
+    """
+    
+    __slots__ = ("text", "tokens", "word_count", "_by_category")
+    
+    def __init__(self, text, tokens, word_count):
+        self.text = text
+        self.tokens = tokens
+        self.word_count = word_count
+        self._by_category = {}
+        for token in tokens:
+            self._by_category.setdefault(token.category, []).append(token)
+    
+    def has(self, category):
+        """Whether any token belongs to category."""
+        return category in self._by_category
+    
+    def having(self, category):
+        """Tokens of category, in text order."""
+        return list(self._by_category.get(category, ()))
+    
+    def at_edges(self, category):
+        """
+        Tokens of category in the unbroken runs of keywords at either end of
+        the text, e.g. "up" in "habit up floss" but not in "stand up from desk".
+        """
+        found = []
+        for position, token in enumerate(self.tokens):
+            if token.index != position:
+                break
+            if token.category == category:
+                found.append(token)
+        
+        for position, token in enumerate(reversed(self.tokens)):
+            if token.index != self.word_count - 1 - position:
+                break
+            if token.category == category and token not in found:
+                found.append(token)
+        return found
+    
+    def without(self, tokens):
+        """
+        The text with tokens cut out and the whitespace they leave collapsed.
+        
+        Tag tokens ("#work") are always cut: no title keeps them.
+        """
+        tokens = list(tokens) + self.having("tag")
+        if not tokens:
+            return self.text.strip()
+        pieces = []
+        position = 0
+        for token in sorted(set(tokens), key=_token_start):
+            pieces.append(self.text[position:token.start].strip())
+            position = token.end
+        pieces.append(self.text[position:].strip())
+        title = " ".join(filter(None, pieces))
+        if getattr(_trace, "cuts", None) is not None:
+            self._note_cuts(tokens, title)
+        return title
+    
+    def _note_cuts(self, tokens, title):
+        """Record the cut tokens, and where title's pieces are in the text."""
+        edges = [0]
+        for token in sorted(set(tokens), key=_token_start):
+            _note_cut(self.text, token.start, token.end)
+            edges += [token.start, token.end]
+        edges.append(len(self.text))
+        
+        pieces = []
+        offset = 0
+        for start, end in zip(edges[::2], edges[1::2]):
+            piece = self.text[start:end]
+            stripped = piece.strip()
+            if stripped:
+                pieces.append((offset, start + len(piece) - len(piece.lstrip()), len(stripped)))
+                offset += len(stripped) + 1
+        _trace.titles[title] = pieces
+
+# Not @_timed: observing a histogram would cost a good share of the call
+def _tokenize(text):
+    """
+    Split text into words and classify them in a single pass.
+    
+    Words are whitespace-separated, so "follow-up" and "2025-03-14" are one
+    word each and their "-" is not a habit sign, and "money" is never
+    "mon". Each word costs one dict lookup in the keyword table of the
+    parse's language.
+    
+    Args:
+        text (str): Normalized task text
+        
+    Returns:
+        _Tokens: The keyword token stream
+    """
+    keywords = _rules().keywords
+    tokens = []
+    position = 0
+    words = text.split()
+    for index, word in enumerate(words):
+        start = text.find(word, position)
+        position = start + len(word)
+        lowered = word.lower()
+        entry = keywords.get(lowered)
+        
+        if entry is None:
+            if lowered.isalnum():
+                # Plain word, by far the most common case
+                continue
+            core = lowered.lstrip(_LEADING_PUNCTUATION)
+            start += len(lowered) - len(core)
+            core = core.rstrip(_TRAILING_PUNCTUATION)
+            if not core:
+                continue
+            if core[0] == "$" or core[-1] == "$":
+                # "$5" or "5$"; without digits ("$abc") it only marks a reward
+                digits = core.strip("$")
+                entry = ("reward", digits if digits.isdigit() else "")
+            elif core[0] == "#" and len(core) > 1 and not core[1:].isdigit():
+                # "#work": tag the task, by the name as written
+                entry = ("tag", text[start + 1:start + len(core)])
+            elif core[0] in "+-" and len(core) > 1:
+                # A sign stuck to its habit, as in "+floss"
+                core = core[0]
+                entry = keywords[core]
+            else:
+                entry = keywords.get(core)
+                if entry is None:
+                    continue
+            word = text[start:start + len(core)]
+        
+        if entry[0] == "qualified":
+            # Polish "co" is "every" in "co tydzień", "co 2 dni", but "what" elsewhere
+            following = words[index + 1].lower() if index + 1 < len(words) else ""
+            if not (following[:1].isdigit() or following in entry[1]):
+                continue
+            entry = _FREQUENCY
+        
+        tokens.append(_Token(word, start, start + len(word), entry[0], entry[1], index))
+    return _Tokens(text, tokens, len(words))
+
+# =============================================================================
+# LANGUAGE RULES
+# =============================================================================
+
+# Languages texts may be written in, from the tables in languages.py; the
+# first is the default. Only these are compiled, so memory and startup grow
+# with the languages enabled rather than with the tables available.
+PARSE_LANGUAGES = [code.strip().lower() for code in
+                   os.environ.get("PARSE_LANGUAGES", "en").split(",") if code.strip()]
+DEFAULT_LANGUAGE = PARSE_LANGUAGES[0]
+
+class _LanguageRules:
+    """
+    One language's table, compiled into the lookups and regexes the parser uses.
+    
+    Args:
+        code (str): Language code
+        table (dict): The language's table from languages.py
+    """
+    
+    __slots__ = ("code", "keywords", "difficulty_ranks", "fast_date_re", "relative_days",
+                 "date_units", "next_words", "weekday_numbers", "recurrence_re", "units",
+                 "weekday_codes", "date_languages", "recurrent", "warmup")
+    
+    def __init__(self, code, table):
+        self.code = code
+        # Within a level the words come before the level's "!N" shortcut
+        difficulties = [(keyword, value)
+                        for level, (value, words) in enumerate(table["difficulty"].items())
+                        for keyword in (*words, f"!{level}")]
+        self.difficulty_ranks = {keyword: rank for rank, (keyword, _) in enumerate(difficulties)}
+        self.weekday_codes = {name: _WEEK[number] for name, number in
+                              {**table["weekdays"], **table["recurring_weekdays"],
+                               **table["range_weekdays"]}.items()}
+        self.keywords = _keyword_table(table, difficulties, self.weekday_codes)
+        
+        self.fast_date_re = _fast_date_pattern(table)
+        self.relative_days = dict(table["relative_days"])
+        self.date_units = dict(table["date_units"])
+        self.next_words = frozenset(table["next"])
+        self.weekday_numbers = dict(table["weekdays"])
+        self.date_languages = table["date_languages"] or DATE_LANGUAGES
         
-        return result
+        self.recurrence_re = _recurrence_pattern(table)
+        self.units = {**table["units"], **table["period_units"], **table["adverbs"]}
+        self.recurrent = table["recurrent"]
+        self.warmup = table["warmup"]
+
+def _alternation(phrases):
+    """
+    Regex alternation of phrases, longest first, with any run of whitespace
+    between words. Matches nothing if there are no phrases.
+    """
+    phrases = sorted(phrases, key=len, reverse=True)
+    if not phrases:
+        return "(?!)"
+    return "|".join(r"\s+".join(map(re.escape, phrase.split())) for phrase in phrases)
+
+def _compile_languages(codes):
+    """
+    Compile the rule tables of the given languages.
     
-    return None
+    Raises:
+        ValueError: If languages.py has no table for one of them
+    """
+    unknown = [code for code in codes if code not in languages.LANGUAGES]
+    if unknown:
+        raise ValueError(f"PARSE_LANGUAGES names unknown languages {unknown}; "
+                         f"known are {sorted(languages.LANGUAGES)}")
+    return {code: _LanguageRules(code, languages.LANGUAGES[code]) for code in codes}
 
-def _manual_frequency_parsing(text):
+_LANGUAGE_RULES = _compile_languages(PARSE_LANGUAGES)
+_DEFAULT_RULES = _LANGUAGE_RULES[DEFAULT_LANGUAGE]
+
+def _rules():
+    """The rules of the language the parse in progress is in."""
+    context = _parse_context.get()
+    return _DEFAULT_RULES if context is None else _LANGUAGE_RULES[context.language]
+
+@functools.lru_cache(maxsize=1024)
+def negotiate_language(accept_language):
     """
-    Manual frequency parsing using regex patterns.
+    Pick the enabled language a client prefers, from an Accept-Language header.
     
-    This is the fallback when smart parsing fails, using your original
-    approach but cleaned up and made more readable.
+    Args:
+        accept_language (str): Header value, e.g. "pl-PL,pl;q=0.9,en;q=0.8"
+    
+    Returns:
+        str or None: The enabled language with the highest q-value (the
+            earliest listed on a tie), None if the header accepts none
+    """
+    ranked = []
+    for position, item in enumerate((accept_language or "").split(",")):
+        tag, _, parameters = item.partition(";")
+        quality = 1.0
+        for parameter in parameters.split(";"):
+            name, _, value = parameter.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        code = tag.strip().lower().split("-")[0]
+        if quality > 0 and code in _LANGUAGE_RULES:
+            ranked.append((-quality, position, code))
+    return min(ranked)[2] if ranked else None
+
+def _with_language(context, language):
     """
-    text_lower = text.lower().strip()
+    context, switched to language.
     
-    # Try each pattern in order of specificity
-    patterns = [
-        (_match_daily_patterns, _build_daily_result),
-        (_match_weekly_patterns, _build_weekly_result),
-        (_match_monthly_patterns, _build_monthly_result),
-        (_match_weekday_patterns, _build_weekday_result),
-    ]
+    Args:
+        context (ParseContext): None for the server's clock
+        language (str): One of PARSE_LANGUAGES; None keeps context's
+    """
+    if language is None:
+        return context
+    if context is None:
+        return parse_context(language=language)
+    return context._replace(language=language)
+
+# =============================================================================
+# HEALTH STATE
+# =============================================================================
+
+# How long a status probe result is trusted before it counts as stale
+HEALTH_TTL = float(os.environ.get("HABITICA_HEALTH_TTL", "30"))
+# Consecutive failed task submissions before the circuit breaker opens
+BREAKER_THRESHOLD = int(os.environ.get("HABITICA_BREAKER_THRESHOLD", "5"))
+# How long an open breaker rejects work before letting a request through again
+BREAKER_COOLDOWN = float(os.environ.get("HABITICA_BREAKER_COOLDOWN", "30"))
+
+class _HealthState:
+    """
+    Shared, TTL-based view of whether Habitica is reachable.
     
-    for matcher, builder in patterns:
-        match_data = matcher(text_lower)
-        if match_data:
-            result = builder(match_data)
-            result["text"] = _remove_frequency_words_from_text(text)
-            return result
+    The cached value comes from the status probe (refreshed in the
+    background by the service, or on demand by the CLI) and is combined
+    with a circuit breaker fed by task submission results.
+    """
     
-    # Default fallback
-    return {
-        "frequency": "daily",
-        "everyX": 1,
-        "text": _remove_frequency_words_from_text(text)
-    }
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.is_up = None
+        self.checked_at = None
+        self.hits = 0
+        self.misses = 0
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.refresher = None
+
+_health = _HealthState()
+
+def _habitica_is_up(refresh_if_stale=True):
+    """
+    Read the cached Habitica health state.
+    
+    Args:
+        refresh_if_stale (bool): Probe Habitica synchronously when the cached
+            value is missing or older than HEALTH_TTL. The service passes
+            False and relies on the background refresher instead.
+        
+    Returns:
+        bool: False if the breaker is open or the last probe failed
+    """
+    now = time.monotonic()
+    with _health.lock:
+        fresh = _health.checked_at is not None and now - _health.checked_at < HEALTH_TTL
+        if fresh:
+            _health.hits += 1
+        else:
+            _health.misses += 1
+    
+    if not fresh and refresh_if_stale:
+        _refresh_health()
+    return _cached_health()
+
+def _cached_health():
+    """
+    _habitica_is_up without probing or counting a lookup, for pollers (the
+    job workers) whose lookups would swamp the hit/miss counters of /health.
+    """
+    now = time.monotonic()
+    with _health.lock:
+        if _health.opened_at is not None:
+            if now - _health.opened_at < BREAKER_COOLDOWN:
+                return False
+            # Half-open: let traffic through, the next failure re-opens it
+            _health.opened_at = None
+            _health.consecutive_failures = BREAKER_THRESHOLD - 1
+        # Nothing probed yet (refresher still starting): assume up
+        return _health.is_up is not False
+
+def _refresh_health():
+    """Probe Habitica once and store the result in the shared state."""
+    return _store_health(_check_habitica_connection())
+
+async def _refresh_health_async():
+    """Async variant of _refresh_health."""
+    return _store_health(await _check_habitica_connection_async())
+
+def _store_health(is_up):
+    with _health.lock:
+        _health.is_up = is_up
+        _health.checked_at = time.monotonic()
+    return is_up
+
+def _record_submission_result(ok):
+    """
+    Feed a task submission outcome into the circuit breaker.
+    
+    Args:
+        ok (bool): False for transport errors and 5xx responses; client
+            errors (bad token, invalid task) say nothing about Habitica's
+            health and should be reported as True.
+    """
+    with _health.lock:
+        if ok:
+            _health.consecutive_failures = 0
+            _health.opened_at = None
+            return
+        _health.consecutive_failures += 1
+        if _health.consecutive_failures >= BREAKER_THRESHOLD:
+            _health.opened_at = time.monotonic()
+
+def _start_health_refresher(interval=None):
+    """
+    Start an asyncio task on the running loop that re-probes Habitica every
+    `interval` seconds, on the loop's async client.
+    """
+    interval = interval or HEALTH_TTL
+    if _health.refresher and not _health.refresher.done():
+        return
+    
+    async def refresh_loop():
+        while True:
+            await _refresh_health_async()
+            await asyncio.sleep(interval)
+    
+    _health.refresher = asyncio.get_running_loop().create_task(refresh_loop(),
+                                                               name="habitica-health")
+
+async def _stop_health_refresher():
+    """Stop the background refresher started by _start_health_refresher."""
+    refresher, _health.refresher = _health.refresher, None
+    if refresher:
+        refresher.cancel()
+        try:
+            await refresher
+        except asyncio.CancelledError:
+            pass
+
+def _health_stats():
+    """
+    Snapshot of the health cache for tuning the TTL.
+    
+    Returns:
+        dict: Cached value, age, staleness, hit/miss counters and breaker state
+    """
+    now = time.monotonic()
+    with _health.lock:
+        age = None if _health.checked_at is None else now - _health.checked_at
+        breaker_open = (_health.opened_at is not None
+                        and now - _health.opened_at < BREAKER_COOLDOWN)
+        return {
+            "isUp": _health.is_up,
+            "ageSeconds": age,
+            "ttlSeconds": HEALTH_TTL,
+            "stale": age is None or age >= HEALTH_TTL,
+            "hits": _health.hits,
+            "misses": _health.misses,
+            "breakerOpen": breaker_open,
+            "consecutiveFailures": _health.consecutive_failures,
+        }
 
 # =============================================================================
-# FREQUENCY PATTERN MATCHERS
+# HTTP CLIENT
 # =============================================================================
 
-def _match_daily_patterns(text):
-    """Match daily frequency patterns like 'every 3 days' or 'daily'."""
-    if re.search(r"daily|every day|everyday", text):
-        return {"interval": 1}
+# API root; point it at a stand-in (benchmarks.fake_habitica) for load tests
+HABITICA_API_URL = os.environ.get("HABITICA_API_URL", "https://habitica.com/api/v3")
+
+# Statuses worth retrying: rate limited or a transient upstream failure
+RETRY_STATUSES = (429, 502, 503, 504)
+
+def _dumps(obj):
+    """Encode obj as compact JSON bytes, with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode()
+
+def _loads(data):
+    """Decode JSON bytes, with orjson when it is installed."""
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+def _seconds_until_rate_limit_reset(headers):
+    """
+    Read Habitica's X-RateLimit-Reset header as a delay in seconds.
     
-    match = re.search(r"every (\d+) days?", text)
-    if match:
-        return {"interval": int(match.group(1))}
+    Habitica sends a JavaScript date string such as
+    "Thu Apr 23 2020 11:54:20 GMT+0000 (Coordinated Universal Time)".
     
-    return None
+    Returns:
+        float or None: Seconds until the budget resets, None if unknown
+    """
+    reset = headers.get("X-RateLimit-Reset")
+    if not reset:
+        return None
+    try:
+        reset_at = date_parser.parse(reset.split(" (")[0])
+        now = datetime.datetime.now(reset_at.tzinfo)
+        return max(0.0, (reset_at - now).total_seconds())
+    except (ValueError, OverflowError):
+        return None
 
-def _match_weekly_patterns(text):
-    """Match weekly frequency patterns like 'every 2 weeks' or 'weekly'."""
-    if re.search(r"weekly|every week", text):
-        return {"interval": 1}
+class _RateLimitRetry(Retry):
+    """
+    Retry policy that also honours Habitica's rate-limit headers.
     
-    match = re.search(r"every (\d+) weeks?", text)
-    if match:
-        return {"interval": int(match.group(1))}
+    Habitica answers 429 with Retry-After, but also sends X-RateLimit-Reset
+    on every response; use it when Retry-After is missing.
+    """
     
-    return None
+    def get_retry_after(self, response):
+        retry_after = super().get_retry_after(response)
+        if retry_after is not None or response.status != 429:
+            return retry_after
+        return _seconds_until_rate_limit_reset(response.headers)
 
-def _match_monthly_patterns(text):
-    """Match monthly frequency patterns."""
-    if re.search(r"monthly|every month", text):
-        return {"interval": 1}
+class HabiticaClient:
+    """
+    Long-lived, pooled HTTP client for the Habitica API.
+    
+    Connections are kept alive and reused across calls, and requests that
+    hit 429 or a transient 5xx, or fail to connect, are retried with
+    exponential backoff. A read timeout is not retried: the task may
+    already exist.
     
-    match = re.search(r"every (\d+) months?", text)
-    if match:
-        return {"interval": int(match.group(1))}
+    Args:
+        base_url (str): Habitica API root
+        pool_size (int): Maximum number of kept-alive connections
+        connect_timeout (float): Seconds to wait for a TCP/TLS handshake
+        read_timeout (float): Seconds to wait for a response
+        retries (int): Retry attempts for 429/5xx responses
+        backoff (float): Backoff factor between retries (0.5 → 0.5s, 1s, 2s...)
+    """
     
-    # Match ordinal days like "every 15th"
-    match = re.search(r"every (\d+)(?:st|nd|rd|th)", text)
-    if match:
-        return {"interval": 1, "day": int(match.group(1))}
+    def __init__(self, base_url=HABITICA_API_URL, pool_size=10, connect_timeout=3.05,
+                 read_timeout=10, retries=3, backoff=0.5):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = (connect_timeout, read_timeout)
+        
+        retry = _RateLimitRetry(
+            total=retries,
+            # Habitica may have created the task before a read timed out, so
+            # only failed connects and RETRY_STATUSES are retried
+            read=0,
+            backoff_factor=backoff,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=None,  # POSTs are safe to retry on these statuses
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size,
+                              max_retries=retry)
+        
+        self.session = requests.Session()
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+    
+    def request(self, method, path, **kwargs):
+        """Send a request to `path` relative to the API root."""
+        kwargs.setdefault("timeout", self.timeout)
+        started = time.perf_counter()
+        try:
+            response = self.session.request(method, f"{self.base_url}{path}", **kwargs)
+        except requests.exceptions.RequestException:
+            _record_upstream(method, path, started, "error")
+            raise
+        _record_upstream(method, path, started, response.status_code)
+        return response
+    
+    def get(self, path, **kwargs):
+        """GET `path` relative to the API root."""
+        return self.request("GET", path, **kwargs)
+    
+    def post(self, path, **kwargs):
+        """POST to `path` relative to the API root."""
+        return self.request("POST", path, **kwargs)
+    
+    def close(self):
+        """Close all pooled connections."""
+        self.session.close()
+
+_client = None
+_client_lock = threading.Lock()
+
+def _get_client():
+    """
+    Return the process-wide HabiticaClient, creating it on first use.
     
-    return None
+    Pool size, timeouts and retries come from HABITICA_POOL_SIZE,
+    HABITICA_CONNECT_TIMEOUT, HABITICA_READ_TIMEOUT, HABITICA_RETRIES and
+    HABITICA_BACKOFF. The CLI loop and the FastAPI app share this instance.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = HabiticaClient(
+                    pool_size=int(os.environ.get("HABITICA_POOL_SIZE", "10")),
+                    connect_timeout=float(os.environ.get("HABITICA_CONNECT_TIMEOUT", "3.05")),
+                    read_timeout=float(os.environ.get("HABITICA_READ_TIMEOUT", "10")),
+                    retries=int(os.environ.get("HABITICA_RETRIES", "3")),
+                    backoff=float(os.environ.get("HABITICA_BACKOFF", "0.5")),
+                )
+    return _client
 
-def _match_weekday_patterns(text):
-    """Match specific weekday patterns like 'every monday and friday'."""
-    weekday_names = {
-        "monday": "m", "tuesday": "t", "wednesday": "w", "thursday": "th",
-        "friday": "f", "saturday": "s", "sunday": "su",
-        "mon": "m", "tue": "t", "wed": "w", "thu": "th",
-        "fri": "f", "sat": "s", "sun": "su"
-    }
+def _close_client():
+    """Close the shared client; the next call creates a fresh one."""
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+            _client = None
+
+class AsyncHabiticaClient:
+    """
+    Pooled asyncio counterpart of HabiticaClient, built on httpx.
     
-    found_days = []
-    for day_name, day_code in weekday_names.items():
-        if day_name in text:
-            found_days.append(day_code)
+    Same retry semantics: 429 and transient 5xx responses (and failed
+    connects) are retried with exponential backoff, honouring Retry-After
+    and X-RateLimit-Reset.
     
-    if found_days:
-        return {"days": found_days}
+    Args:
+        base_url (str): Habitica API root
+        pool_size (int): Maximum number of concurrent connections
+        connect_timeout (float): Seconds to wait for a TCP/TLS handshake
+        read_timeout (float): Seconds to wait for a response
+        retries (int): Retry attempts for 429/5xx responses
+        backoff (float): Backoff factor between retries
+    """
     
-    return None
+    def __init__(self, base_url=HABITICA_API_URL, pool_size=100, connect_timeout=3.05,
+                 read_timeout=10, retries=3, backoff=0.5):
+        self.retries = retries
+        self.backoff = backoff
+        self.client = httpx.AsyncClient(
+            base_url=base_url.rstrip("/"),
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            limits=httpx.Limits(max_connections=pool_size,
+                                max_keepalive_connections=pool_size),
+        )
+    
+    async def request(self, method, path, **kwargs):
+        """Send a request, retrying on RETRY_STATUSES and failed connects."""
+        started = time.perf_counter()
+        try:
+            response = await self._request_with_retries(method, path, **kwargs)
+        except httpx.HTTPError:
+            _record_upstream(method, path, started, "error")
+            raise
+        _record_upstream(method, path, started, response.status_code)
+        return response
+    
+    async def _request_with_retries(self, method, path, **kwargs):
+        for attempt in range(self.retries + 1):
+            last_attempt = attempt == self.retries
+            try:
+                response = await self.client.request(method, path, **kwargs)
+            except (httpx.ConnectError, httpx.ConnectTimeout):
+                if last_attempt:
+                    raise
+                await asyncio.sleep(self.backoff * 2 ** attempt)
+                continue
+            
+            if response.status_code not in RETRY_STATUSES or last_attempt:
+                return response
+            await asyncio.sleep(self._retry_delay(response, attempt))
+    
+    def _retry_delay(self, response, attempt):
+        retry_after = response.headers.get("Retry-After")
+        if retry_after and retry_after.isdigit():
+            return float(retry_after)
+        if response.status_code == 429:
+            reset = _seconds_until_rate_limit_reset(response.headers)
+            if reset is not None:
+                return reset
+        return self.backoff * 2 ** attempt
+    
+    async def get(self, path, **kwargs):
+        """GET `path` relative to the API root."""
+        return await self.request("GET", path, **kwargs)
+    
+    async def post(self, path, **kwargs):
+        """POST to `path` relative to the API root."""
+        return await self.request("POST", path, **kwargs)
+    
+    async def close(self):
+        """Close all pooled connections."""
+        await self.client.aclose()
+
+_async_client = None
+
+def _get_async_client():
+    """
+    Return the event loop's shared AsyncHabiticaClient, creating it on first use.
+    
+    Uses the same environment variables as _get_client, except that the
+    pool size defaults to HABITICA_ASYNC_POOL_SIZE (100).
+    """
+    global _async_client
+    if _async_client is None:
+        _async_client = AsyncHabiticaClient(
+            pool_size=int(os.environ.get("HABITICA_ASYNC_POOL_SIZE", "100")),
+            connect_timeout=float(os.environ.get("HABITICA_CONNECT_TIMEOUT", "3.05")),
+            read_timeout=float(os.environ.get("HABITICA_READ_TIMEOUT", "10")),
+            retries=int(os.environ.get("HABITICA_RETRIES", "3")),
+            backoff=float(os.environ.get("HABITICA_BACKOFF", "0.5")),
+        )
+    return _async_client
+
+async def _close_async_client():
+    """Close the shared async client; the next call creates a fresh one."""
+    global _async_client
+    if _async_client is not None:
+        await _async_client.close()
+        _async_client = None
 
 # =============================================================================
-# FREQUENCY RESULT BUILDERS
+# RATE LIMITING
 # =============================================================================
 
-def _build_daily_result(match_data):
-    """Build daily frequency result."""
-    return {
-        "frequency": "daily",
-        "everyX": match_data["interval"]
-    }
-
-def _build_weekly_result(match_data):
-    """Build weekly frequency result."""
-    return {
-        "frequency": "weekly", 
-        "everyX": match_data["interval"]
-    }
+# Habitica allows 30 requests per minute per user. The defaults keep any
+# 60-second window under that (burst + rate * 60 <= 30).
+RATE_LIMIT_PER_MINUTE = float(os.environ.get("RATE_LIMIT_PER_MINUTE", "25"))
+RATE_LIMIT_BURST = float(os.environ.get("RATE_LIMIT_BURST", "5"))
+# Longest a submission may wait for budget before it's refused
+RATE_LIMIT_MAX_WAIT = float(os.environ.get("RATE_LIMIT_MAX_WAIT", "30"))
+# Users whose buckets are tracked; least recently seen users are dropped
+RATE_LIMIT_MAX_USERS = int(os.environ.get("RATE_LIMIT_MAX_USERS", "10000"))
+# Largest array POST built from coalesced submissions
+COALESCE_MAX_TASKS = int(os.environ.get("COALESCE_MAX_TASKS", "50"))
 
-def _build_monthly_result(match_data):
-    """Build monthly frequency result."""
-    result = {
-        "frequency": "monthly",
-        "everyX": match_data["interval"]
-    }
+class _TokenBucket:
+    """Budget of one Habitica user."""
     
-    if "day" in match_data:
-        result["daysOfMonth"] = [match_data["day"]]
+    __slots__ = ("tokens", "updated_at", "blocked_until")
     
-    return result
+    def __init__(self, tokens, now):
+        self.tokens = tokens
+        self.updated_at = now
+        self.blocked_until = 0.0
 
-def _build_weekday_result(match_data):
-    """Build weekday-specific frequency result."""
-    repeat = {day: (day in match_data["days"]) 
-              for day in ["m", "t", "w", "th", "f", "s", "su"]}
+class RateLimiter:
+    """
+    Token-bucket limiter keyed by Habitica user id (x-api-user).
     
-    return {
-        "frequency": "weekly",
-        "everyX": 1,
-        "repeat": repeat
-    }
-
-def _build_weekday_repeat_object(weekdays):
-    """Convert rrule weekdays to Habitica repeat object."""
-    habitica_days = {0: "m", 1: "t", 2: "w", 3: "th", 4: "f", 5: "s", 6: "su"}
-    repeat = {day: False for day in habitica_days.values()}
+    Submissions reserve a token and sleep until it's theirs, so bursts are
+    queued rather than sent into a 429. Habitica's own X-RateLimit-Remaining
+    and X-RateLimit-Reset headers, and any 429 that gets through, pull the
+    local bucket down to what the server reports.
     
-    for weekday in weekdays:
-        day_num = weekday.weekday if hasattr(weekday, 'weekday') else weekday
-        if day_num in habitica_days:
-            repeat[habitica_days[day_num]] = True
+    Args:
+        per_minute (float): Sustained submissions per minute per user
+        burst (float): Bucket capacity
+        max_wait (float): Longest wait accepted before a submission is refused
+        max_users (int): Buckets kept before the least recently used is dropped
+    """
     
-    return repeat
+    def __init__(self, per_minute=RATE_LIMIT_PER_MINUTE, burst=RATE_LIMIT_BURST,
+                 max_wait=RATE_LIMIT_MAX_WAIT, max_users=RATE_LIMIT_MAX_USERS):
+        self.rate = per_minute / 60.0
+        self.burst = burst
+        self.max_wait = max_wait
+        self.max_users = max_users
+        self.events = {"immediate": 0, "waited": 0, "rejected": 0, "coalesced": 0,
+                       "batchesSplit": 0, "upstream429": 0}
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def _bucket(self, user_id, now):
+        bucket = self._buckets.get(user_id)
+        if bucket is None:
+            bucket = self._buckets[user_id] = _TokenBucket(self.burst, now)
+            if len(self._buckets) > self.max_users:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(user_id)
+            bucket.tokens = min(self.burst, bucket.tokens + (now - bucket.updated_at) * self.rate)
+            bucket.updated_at = now
+        return bucket
+    
+    def reserve(self, user_id):
+        """
+        Take a token for user_id.
+        
+        Returns:
+            float or None: Seconds to wait before sending, None if that would
+                exceed max_wait (no token is taken then)
+        """
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._bucket(user_id, now)
+            wait = max(0.0, bucket.blocked_until - now)
+            if bucket.tokens < 1:
+                wait = max(wait, (1 - bucket.tokens) / self.rate)
+            if wait > self.max_wait:
+                self.events["rejected"] += 1
+                return None
+            bucket.tokens -= 1
+            self.events["waited" if wait else "immediate"] += 1
+            return wait
+    
+    def acquire(self, user_id):
+        """Block until user_id may send. Returns False if the wait is too long."""
+        wait = self.reserve(user_id)
+        if wait is None:
+            return False
+        if wait:
+            time.sleep(wait)
+        return True
+    
+    def retry_after(self, user_id):
+        """Whole seconds until user_id has a token again."""
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._bucket(user_id, now)
+            wait = max(bucket.blocked_until - now, (1 - bucket.tokens) / self.rate, 0.0)
+        return int(wait) + 1
+    
+    def observe(self, user_id, status_code, headers):
+        """Align the user's bucket with the budget Habitica reports."""
+        remaining = headers.get("X-RateLimit-Remaining")
+        if status_code != 429 and remaining is None:
+            return
+        
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._bucket(user_id, now)
+            if remaining is not None and remaining.isdigit():
+                bucket.tokens = min(bucket.tokens, float(remaining))
+            if status_code == 429:
+                self.events["upstream429"] += 1
+                bucket.tokens = min(bucket.tokens, 0.0)
+                reset = _seconds_until_rate_limit_reset(headers)
+                if reset is not None:
+                    bucket.blocked_until = max(bucket.blocked_until, now + reset)
+    
+    def count(self, event):
+        """Increment one of the event counters."""
+        with self._lock:
+            self.events[event] += 1
+    
+    def snapshot(self):
+        """
+        Current limiter state for the status endpoint.
+        
+        Returns:
+            dict: Settings, event counters and each tracked user's budget
+                (user ids shortened to their first 8 characters)
+        """
+        now = time.monotonic()
+        with self._lock:
+            users = {}
+            for user_id, bucket in self._buckets.items():
+                tokens = min(self.burst, bucket.tokens + (now - bucket.updated_at) * self.rate)
+                users[user_id[:8]] = {
+                    "tokens": round(tokens, 3),
+                    "blockedForSeconds": round(max(0.0, bucket.blocked_until - now), 3),
+                }
+            return {
+                "perMinute": self.rate * 60,
+                "burst": self.burst,
+                "maxWaitSeconds": self.max_wait,
+                "events": dict(self.events),
+                "users": users,
+            }
 
-def _remove_frequency_words_from_text(text):
+_rate_limiter = RateLimiter()
+
+# Async submissions waiting for budget, per (user id, token), that later
+# submissions can join
+_pending_batches = {}
+_flush_tasks = set()
+
+# =============================================================================
+# USER DATA CACHE
+# =============================================================================
+
+# Refuse a todo whose title matches one of the user's open todos
+DUPLICATE_CHECK = os.environ.get("HABITICA_DUPLICATE_CHECK", "0") == "1"
+# Seconds before a user's cached todos and tags are revalidated with Habitica
+USER_CACHE_TTL = float(os.environ.get("HABITICA_USER_CACHE_TTL", "300"))
+# Users whose todos and tags are kept; least recently used are dropped
+USER_CACHE_MAX_USERS = int(os.environ.get("HABITICA_USER_CACHE_MAX_USERS", "1000"))
+# Parse on each user's clock, from their Habitica timezone and day start
+USER_TIMEZONES = os.environ.get("HABITICA_USER_TIMEZONES", "1") == "1"
+# Seconds before a user's cached preferences are refreshed
+USER_PREFERENCES_TTL = float(os.environ.get("HABITICA_USER_PREFERENCES_TTL", "3600"))
+
+# Cached kinds of user data: where they come from and the field holding the
+# name each item is looked up by (None for preferences, which aren't a list)
+_USER_DATA_SOURCES = {
+    "todos": ("/tasks/user", {"type": "todos"}, "text"),
+    "tags": ("/tags", None, "name"),
+    "preferences": ("/user", {"userFields": "preferences.timezoneOffset,preferences.dayStart"}, None),
+}
+
+def _lookup_key(name):
+    """How titles and tag names are compared: normalized and case-insensitive."""
+    return _normalize_text(name).lower()
+
+class _UserData:
+    """
+    Cached data of one user, per kind: {lookup key: id} for todos and tags,
+    (timezoneOffset, dayStart) for preferences.
     """
-    Remove frequency-related words to get clean task description.
     
-    This is important because we don't want "exercise every monday"
-    to become a task called "exercise every monday" - it should just be "exercise".
+    __slots__ = ("items", "etags", "fetched_at", "lock")
+    
+    def __init__(self):
+        self.items = {}
+        self.etags = {}
+        self.fetched_at = {}
+        # Held while refreshing or creating tags, so concurrent requests
+        # fetch once and don't create the same tag twice
+        self.lock = threading.RLock()
+
+class UserDataCache:
     """
-    # Define patterns to remove (more precise than word-by-word removal)
-    patterns_to_remove = [
-        r"\bevery\s+\d+\s+(?:days?|weeks?|months?|years?)\b",
-        r"\bevery\s+(?:day|week|month|year)\b", 
-        r"\b(?:daily|weekly|monthly|yearly|everyday)\b",
-        r"\bevery\s+(?:monday|tuesday|wednesday|thursday|friday|saturday|sunday)\b",
-        r"\bevery\s+(?:mon|tue|wed|thu|fri|sat|sun)\b",
-        r"\b(?:monday|tuesday|wednesday|thursday|friday|saturday|sunday)\b",
-        r"\b(?:mon|tue|wed|thu|fri|sat|sun)\b",
-        r"\bevery\s+\d+(?:st|nd|rd|th)\b",
-        r"\b(?:and|or)\s+(?:monday|tuesday|wednesday|thursday|friday|saturday|sunday)\b"
-    ]
+    Per-user cache of open todo titles and tag names, mapped to their ids,
+    and of the preferences parsing needs (timezone and day start).
+    
+    Entries are filled on first use, revalidated with a conditional GET
+    (If-None-Match) once older than `ttl`, and updated in place with the
+    tasks and tags we create, so duplicate checks and tag lookups are dict
+    lookups. Entries are keyed by user id and a hash of the API token, so a
+    caller never sees data fetched with someone else's credentials.
     
-    for pattern in patterns_to_remove:
-        text = re.sub(pattern, "", text, flags=re.IGNORECASE)
+    Args:
+        ttl (float): Seconds before todos and tags are revalidated
+        max_users (int): Entries kept before the least recently used is dropped
+        preferences_ttl (float): Seconds before preferences are refreshed
+    """
     
-    # Clean up extra whitespace
-    return re.sub(r"\s+", " ", text).strip()
+    def __init__(self, ttl=USER_CACHE_TTL, max_users=USER_CACHE_MAX_USERS,
+                 preferences_ttl=USER_PREFERENCES_TTL):
+        self.ttl = ttl
+        self.preferences_ttl = preferences_ttl
+        self.max_users = max_users
+        self.events = {"hits": 0, "misses": 0, "notModified": 0, "fetchFailures": 0,
+                       "duplicates": 0, "tagsCreated": 0}
+        self._users = OrderedDict()
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def key(user_id, api_token):
+        """Cache key for a user and API token."""
+        return f"{user_id}:{hashlib.sha256(api_token.encode()).hexdigest()[:16]}"
+    
+    def entry(self, key):
+        """The user's entry, created empty if missing."""
+        with self._lock:
+            data = self._users.get(key)
+            if data is None:
+                data = self._users[key] = _UserData()
+                if len(self._users) > self.max_users:
+                    self._users.popitem(last=False)
+            else:
+                self._users.move_to_end(key)
+            return data
+    
+    def is_fresh(self, data, kind):
+        """Whether data's kind was fetched or revalidated within the TTL."""
+        fetched_at = data.fetched_at.get(kind)
+        ttl = self.preferences_ttl if kind == "preferences" else self.ttl
+        return fetched_at is not None and time.monotonic() - fetched_at < ttl
+    
+    def store(self, data, kind, status_code, body, etag):
+        """
+        Apply a GET response to data.
+        
+        Args:
+            status_code (int): 200, or 304 if our ETag still matched
+            body (dict): Parsed 200 response
+            etag (str): The response's ETag, if any
+        """
+        if status_code == 304:
+            self.count("notModified")
+        elif kind == "preferences":
+            preferences = body.get("data", {}).get("preferences", {})
+            data.items[kind] = (int(preferences.get("timezoneOffset") or 0),
+                                int(preferences.get("dayStart") or 0))
+        else:
+            name_field = _USER_DATA_SOURCES[kind][2]
+            data.items[kind] = {_lookup_key(item[name_field]): item["id"]
+                                for item in body.get("data", []) if item.get(name_field)}
+            if etag:
+                data.etags[kind] = etag
+            else:
+                data.etags.pop(kind, None)
+        data.fetched_at[kind] = time.monotonic()
+    
+    def failed(self, data, kind):
+        """
+        Record a failed GET of data's kind.
+        
+        Todos and tags are fetched again on the next use. Preferences are
+        optional (parsing falls back to the server's clock), so the failure
+        is remembered for their TTL instead of adding a GET to every request.
+        """
+        self.count("fetchFailures")
+        if kind == "preferences":
+            data.fetched_at[kind] = time.monotonic()
+    
+    def add(self, key, kind, name, item_id):
+        """Record an item we created, if that kind is cached for the user."""
+        with self._lock:
+            data = self._users.get(key)
+        if data is not None and kind in data.items and name and item_id:
+            data.items[kind][_lookup_key(name)] = item_id
+            # The ETag describes the list without this item
+            data.etags.pop(kind, None)
+    
+    def count(self, event):
+        """Increment one of the event counters."""
+        with self._lock:
+            self.events[event] += 1
+    
+    def snapshot(self):
+        """
+        Cache state for the status endpoint.
+        
+        Returns:
+            dict: Settings, event counters and the number of cached users
+        """
+        with self._lock:
+            return {
+                "duplicateCheck": DUPLICATE_CHECK,
+                "ttlSeconds": self.ttl,
+                "maxUsers": self.max_users,
+                "users": len(self._users),
+                "events": dict(self.events),
+            }
+
+_user_cache = UserDataCache()
+
+# In-flight async refreshes by (cache key, kind) and tag creations by
+# (cache key, tag lookup key), so concurrent requests share one call
+_user_data_refreshes = {}
+_tag_creations = {}
 
 # =============================================================================
 # API COMMUNICATION
 # =============================================================================
 
+STATUS_HEADERS = {
+    'type': 'application/json',
+    'x-client': "1b016184-1869-4aca-a34a-b30210e3cce2-nlpInput"
+}
+
 def _check_habitica_connection():
     """Check if Habitica API is available.
     
-    Args:
-        user_id (str): Habitica user ID
-        
     Returns:
         bool: True if Habitica API is up, False otherwise
     """
     try:
-        headers ={
-            'type': 'application/json',
-            'x-client': f"1b016184-1869-4aca-a34a-b30210e3cce2-nlpInput"
-        }
-        response = requests.get("https://habitica.com/api/v3/status", timeout=5, headers=headers)
+        response = _get_client().get("/status", headers=STATUS_HEADERS)
         return response.json().get("data", {}).get("status") == "up"
     except Exception:
         return False
 
-def _send_task_to_habitica(user_id, api_token, task_data):
-    """Send the built task to Habitica API."""
-    endpoint = "https://habitica.com/api/v3/tasks/user"
-    headers = {
+async def _check_habitica_connection_async():
+    """Async variant of _check_habitica_connection."""
+    try:
+        response = await _get_async_client().get("/status", headers=STATUS_HEADERS)
+        return response.json().get("data", {}).get("status") == "up"
+    except Exception:
+        return False
+
+def _task_headers(user_id, api_token):
+    """Build the authenticated headers for a task request."""
+    return {
         "x-api-user": user_id,
         "x-api-key": api_token,
         "Content-Type": "application/json",
         "x-client": f"{user_id}-nlpInput",
     }
+
+def _handle_task_response(response, user_id, passthrough=False):
+    """
+    Turn Habitica's response to a task POST into our result dict.
+    
+    Works with both requests and httpx responses; HTTP error statuses are
+    raised by the client library's own raise_for_status. A success also
+    carries the undecoded body as "raw", for callers that pass it on as is.
+    With passthrough, a 2xx status is taken as success and the body isn't
+    decoded at all: the result has "raw" but no "data".
+    """
+    _record_submission_result(response.status_code < 500)
+    _rate_limiter.observe(user_id, response.status_code, response.headers)
+    response.raise_for_status()
+    
+    if passthrough:
+        return {"success": True, "raw": response.content}
+    data = _loads(response.content)
+    if data.get("success", False):
+        return {"success": True, "data": data, "raw": response.content}
+    else:
+        return {"success": False, "error": data.get("message", "Unknown API error"),
+                "retryable": False}
+
+def _user_data(user_id, api_token, kind):
+    """
+    The user's cached todos, tags or preferences, revalidated first if stale.
+    
+    Fetching waits for the user's rate limit budget like a submission. If
+    it fails, stale data is used when there is any.
+    
+    Returns:
+        The kind's items (see _UserData), None if never fetched successfully
+    """
+    data = _user_cache.entry(_user_cache.key(user_id, api_token))
+    with data.lock:
+        if _user_cache.is_fresh(data, kind):
+            _user_cache.count("hits")
+        else:
+            _user_cache.count("misses")
+            _refresh_user_data(user_id, api_token, kind, data)
+        return data.items.get(kind)
+
+def _refresh_user_data(user_id, api_token, kind, data):
+    """Conditional GET of one kind of user data into its cache entry."""
+    path, params, _ = _USER_DATA_SOURCES[kind]
+    headers = _task_headers(user_id, api_token)
+    if kind in data.etags:
+        headers["If-None-Match"] = data.etags[kind]
     
     try:
-        response = requests.post(endpoint, headers=headers, json=task_data, timeout=10)
-        response.raise_for_status()
-        
-        data = response.json()
-        if data.get("success", False):
-            return {"success": True, "data": data}
+        if not _rate_limiter.acquire(user_id):
+            raise RuntimeError("rate limited")
+        response = _get_client().get(path, params=params, headers=headers)
+        _rate_limiter.observe(user_id, response.status_code, response.headers)
+        body = _loads(response.content) if response.status_code == 200 else None
+        if response.status_code not in (200, 304) or (body is not None and not body.get("success")):
+            raise RuntimeError(f"status {response.status_code}")
+    except Exception:
+        _user_cache.failed(data, kind)
+        return
+    _user_cache.store(data, kind, response.status_code, body, response.headers.get("ETag"))
+
+async def _user_data_async(user_id, api_token, kind):
+    """Async variant of _user_data."""
+    key = _user_cache.key(user_id, api_token)
+    data = _user_cache.entry(key)
+    if _user_cache.is_fresh(data, kind):
+        _user_cache.count("hits")
+        return data.items.get(kind)
+    
+    await asyncio.shield(_user_data_refresh(user_id, api_token, kind, key, data))
+    return data.items.get(kind)
+
+def _user_data_refresh(user_id, api_token, kind, key, data):
+    """The in-flight async refresh of one kind of user data, started if there is none."""
+    refresh = _user_data_refreshes.get((key, kind))
+    if refresh is None:
+        _user_cache.count("misses")
+        refresh = asyncio.ensure_future(_refresh_user_data_async(user_id, api_token, kind, data))
+        _user_data_refreshes[(key, kind)] = refresh
+        refresh.add_done_callback(lambda _: _user_data_refreshes.pop((key, kind), None))
+    return refresh
+
+async def _refresh_user_data_async(user_id, api_token, kind, data):
+    """Async variant of _refresh_user_data."""
+    path, params, _ = _USER_DATA_SOURCES[kind]
+    headers = _task_headers(user_id, api_token)
+    if kind in data.etags:
+        headers["If-None-Match"] = data.etags[kind]
+    
+    try:
+        wait = _rate_limiter.reserve(user_id)
+        if wait is None:
+            raise RuntimeError("rate limited")
+        await asyncio.sleep(wait)
+        response = await _get_async_client().get(path, params=params, headers=headers)
+        _rate_limiter.observe(user_id, response.status_code, response.headers)
+        body = _loads(response.content) if response.status_code == 200 else None
+        if response.status_code not in (200, 304) or (body is not None and not body.get("success")):
+            raise RuntimeError(f"status {response.status_code}")
+    except Exception:
+        _user_cache.failed(data, kind)
+        return
+    _user_cache.store(data, kind, response.status_code, body, response.headers.get("ETag"))
+
+def _context_from_preferences(preferences):
+    """ParseContext for cached (timezoneOffset, dayStart) preferences, None if unknown."""
+    if preferences is None:
+        return None
+    offset, day_start = preferences
+    # Habitica's timezoneOffset is JavaScript's: minutes *behind* UTC
+    return parse_context(datetime.timezone(datetime.timedelta(minutes=-offset)), day_start)
+
+def _user_parse_context(user_id, api_token):
+    """
+    The ParseContext for a user, from their cached Habitica preferences.
+    
+    Returns:
+        ParseContext or None: None (the server's clock) with
+            HABITICA_USER_TIMEZONES=0 or if the preferences can't be fetched
+    """
+    if not USER_TIMEZONES:
+        return None
+    return _context_from_preferences(_user_data(user_id, api_token, "preferences"))
+
+async def _user_parse_context_async(user_id, api_token):
+    """
+    Async variant of _user_parse_context.
+    
+    Stale preferences are used while they are refreshed in the background,
+    so only a user's first request waits for GET /user.
+    """
+    if not USER_TIMEZONES:
+        return None
+    key = _user_cache.key(user_id, api_token)
+    data = _user_cache.entry(key)
+    preferences = data.items.get("preferences")
+    if _user_cache.is_fresh(data, "preferences"):
+        _user_cache.count("hits")
+    else:
+        refresh = _user_data_refresh(user_id, api_token, "preferences", key, data)
+        if preferences is None:
+            await asyncio.shield(refresh)
+            preferences = data.items.get("preferences")
+    return _context_from_preferences(preferences)
+
+def _duplicate_result(todos, task_data):
+    """Failure result if task_data is a todo the user already has open, else None."""
+    existing_id = todos.get(_lookup_key(task_data.get("text", ""))) if todos else None
+    if existing_id is None:
+        return None
+    _user_cache.count("duplicates")
+    return {"success": False, "error": f"An open todo with this title already exists ({existing_id})",
+            "retryable": False, "duplicate": True, "existingId": existing_id}
+
+def _split_tags(tags, names):
+    """
+    Resolve tag names against the user's cached tags.
+    
+    Returns:
+        tuple: (ids of known tags, names that have to be created), each once
+            however often or in whatever case the names repeat; both empty
+            if the user's tags couldn't be fetched, so tags are dropped rather
+            than created twice
+    """
+    if tags is None:
+        return [], []
+    ids, missing = {}, {}
+    for name in names:
+        key = _lookup_key(name)
+        tag_id = tags.get(key)
+        if tag_id:
+            ids.setdefault(tag_id, None)
         else:
-            return {"success": False, "error": data.get("message", "Unknown API error")}
+            missing.setdefault(key, name)
+    return list(ids), list(missing.values())
+
+def _prepare_task(user_id, api_token, task_data):
+    """
+    Drop parse notes, check for a duplicate todo and turn tag names into tag ids.
+    
+    Returns:
+        tuple: (task to send, None) or (None, failure result)
+    """
+    task_data = _strip_parse_notes(task_data)
+    if DUPLICATE_CHECK and task_data.get("type") == "todo":
+        duplicate = _duplicate_result(_user_data(user_id, api_token, "todos"), task_data)
+        if duplicate:
+            return None, duplicate
+    
+    if task_data.get("tags"):
+        data = _user_cache.entry(_user_cache.key(user_id, api_token))
+        with data.lock:
+            ids, missing = _split_tags(_user_data(user_id, api_token, "tags"), task_data["tags"])
+            ids += [tag_id for tag_id in (_create_tag(user_id, api_token, name) for name in missing)
+                    if tag_id]
+        task_data = {**task_data, "tags": ids}
+    return task_data, None
+
+async def _prepare_task_async(user_id, api_token, task_data):
+    """Async variant of _prepare_task."""
+    task_data = _strip_parse_notes(task_data)
+    if DUPLICATE_CHECK and task_data.get("type") == "todo":
+        todos = await _user_data_async(user_id, api_token, "todos")
+        duplicate = _duplicate_result(todos, task_data)
+        if duplicate:
+            return None, duplicate
+    
+    if task_data.get("tags"):
+        tags = await _user_data_async(user_id, api_token, "tags")
+        ids, missing = _split_tags(tags, task_data["tags"])
+        key = _user_cache.key(user_id, api_token)
+        for name in missing:
+            creation = _tag_creations.get((key, _lookup_key(name)))
+            if creation is None:
+                creation = asyncio.ensure_future(_create_tag_async(user_id, api_token, name))
+                _tag_creations[(key, _lookup_key(name))] = creation
+                creation.add_done_callback(
+                    lambda _, name=name: _tag_creations.pop((key, _lookup_key(name)), None))
+            tag_id = await asyncio.shield(creation)
+            if tag_id:
+                ids.append(tag_id)
+        task_data = {**task_data, "tags": ids}
+    return task_data, None
+
+def _create_tag(user_id, api_token, name):
+    """Create a tag for the user. Returns its id, or None if that failed."""
+    try:
+        if not _rate_limiter.acquire(user_id):
+            return None
+        response = _get_client().post("/tags", headers=_task_headers(user_id, api_token),
+                                      json={"name": name})
+        return _remember_tag(user_id, api_token, name, response)
+    except Exception:
+        return None
+
+async def _create_tag_async(user_id, api_token, name):
+    """Async variant of _create_tag."""
+    try:
+        wait = _rate_limiter.reserve(user_id)
+        if wait is None:
+            return None
+        await asyncio.sleep(wait)
+        response = await _get_async_client().post(
+            "/tags", headers=_task_headers(user_id, api_token), json={"name": name})
+        return _remember_tag(user_id, api_token, name, response)
+    except Exception:
+        return None
+
+def _remember_tag(user_id, api_token, name, response):
+    """Read a tag creation response and add the new tag to the cache."""
+    _rate_limiter.observe(user_id, response.status_code, response.headers)
+    response.raise_for_status()
+    tag_id = response.json().get("data", {}).get("id")
+    if tag_id:
+        _user_cache.add(_user_cache.key(user_id, api_token), "tags", name, tag_id)
+        _user_cache.count("tagsCreated")
+    return tag_id
+
+def _remember_created_tasks(user_id, api_token, result):
+    """
+    Add todos from a successful submission to the user's cached titles.
+    
+    The titles are only needed for HABITICA_DUPLICATE_CHECK, so a passed
+    through body is only decoded for them then.
+    """
+    if not result["success"] or not DUPLICATE_CHECK:
+        return
+    data = result["data"] if "data" in result else _loads(result["raw"])
+    created = data.get("data")
+    key = _user_cache.key(user_id, api_token)
+    for task in created if isinstance(created, list) else [created]:
+        if isinstance(task, dict) and task.get("type") == "todo":
+            _user_cache.add(key, "todos", task.get("text"), task.get("id"))
+
+def _is_retryable_status(status_code):
+    """True if a failed submission with this status may succeed when retried."""
+    return status_code in RETRY_STATUSES or status_code >= 500
+
+def _rate_limited_result(user_id):
+    """Failure result for a submission the local rate limiter refused."""
+    return {"success": False, "error": "Rate limit exceeded for this Habitica user",
+            "retryable": True, "retryAfter": _rate_limiter.retry_after(user_id)}
+
+def _send_task_to_habitica(user_id, api_token, task_data):
+    """
+    Send the built task to Habitica API.
+    
+    Waits for the user's rate limit budget first (at most RATE_LIMIT_MAX_WAIT
+    seconds).
+    
+    Tag names in task_data["tags"] are resolved to the user's tag ids
+    (creating missing tags), and with HABITICA_DUPLICATE_CHECK=1 a todo the
+    user already has open is refused; see UserDataCache.
+    
+    Returns:
+        dict: {"success": True, "data": ...} or {"success": False, "error": ...,
+            "retryable": bool}; retryable failures (transport errors, 429,
+            5xx, local rate limiting) may succeed if sent again later.
+            Refused duplicates also carry "duplicate": True and "existingId".
+    """
+    task_data, failure = _prepare_task(user_id, api_token, task_data)
+    if failure:
+        return failure
+    
+    if not _rate_limiter.acquire(user_id):
+        return _rate_limited_result(user_id)
+    
+    try:
+        response = _get_client().post("/tasks/user", headers=_task_headers(user_id, api_token),
+                                      data=_dumps(task_data))
+        result = _handle_task_response(response, user_id)
+        _remember_created_tasks(user_id, api_token, result)
+        return result
             
+    except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+        _record_submission_result(False)
+        return {"success": False, "error": f"Request failed: {str(e)}", "retryable": True}
+    except requests.exceptions.HTTPError as e:
+        return {"success": False, "error": f"Request failed: {str(e)}",
+                "retryable": _is_retryable_status(e.response.status_code)}
     except requests.exceptions.RequestException as e:
-        return {"success": False, "error": f"Request failed: {str(e)}"}
+        return {"success": False, "error": f"Request failed: {str(e)}", "retryable": False}
+    except Exception as e:
+        return {"success": False, "error": str(e), "retryable": False}
+
+async def _send_task_to_habitica_async(user_id, api_token, task_data, passthrough=False):
+    """
+    Async variant of _send_task_to_habitica.
+    
+    Tasks that have to wait for the user's rate limit budget are coalesced:
+    everything queued for the same user while waiting goes out in a single
+    array POST, which costs one request of budget. If Habitica rejects the
+    array, it is split in halves and sent again (see _post_batch).
+    
+    With passthrough, a task sent on its own isn't decoded (see
+    _handle_task_response); a coalesced one still is, to split the batch.
+    """
+    task_data, failure = await _prepare_task_async(user_id, api_token, task_data)
+    if failure:
+        return failure
+    
+    key = (user_id, api_token)
+    future = asyncio.get_running_loop().create_future()
+    
+    batch = _pending_batches.get(key)
+    if batch is not None and len(batch) < COALESCE_MAX_TASKS:
+        batch.append((task_data, future))
+        _rate_limiter.count("coalesced")
+        return await future
+    
+    wait = _rate_limiter.reserve(user_id)
+    if wait is None:
+        return _rate_limited_result(user_id)
+    if wait == 0:
+        return await _post_tasks_async(user_id, api_token, task_data, passthrough)
+    
+    # Wait for the token with a batch open so later tasks can ride along.
+    # The flush runs as its own task so a cancelled caller can't strand the
+    # tasks that joined its batch.
+    batch = [(task_data, future)]
+    _pending_batches[key] = batch
+    flush = asyncio.create_task(_flush_batch(key, batch, wait))
+    _flush_tasks.add(flush)
+    flush.add_done_callback(_flush_tasks.discard)
+    return await future
+
+async def _flush_batch(key, batch, wait):
+    """
+    Send a coalesced batch once its token is due and resolve every waiter.
+    
+    Retryable failures are shared, since nothing was created and each
+    caller may retry; see _post_batch for rejected arrays.
+    """
+    await asyncio.sleep(wait)
+    if _pending_batches.get(key) is batch:
+        del _pending_batches[key]
+    
+    user_id, api_token = key
+    results = await _post_batch(user_id, api_token, [task for task, _ in batch])
+    for (_, future), item_result in zip(batch, results):
+        if not future.done():
+            future.set_result(item_result)
+
+async def _post_batch(user_id, api_token, tasks):
+    """
+    POST tasks (a token already taken for them) and return one result per task.
+    
+    Habitica creates the whole array or nothing, so when it rejects the
+    array (one invalid task is enough) each half is sent again as its own
+    array, on its own token, until the invalid tasks are alone: the others
+    are created and an error reaches only its own caller. A single invalid
+    task in COALESCE_MAX_TASKS=50 costs 12 more requests rather than 50,
+    and the halves wait for their tokens concurrently.
+    """
+    if len(tasks) == 1:
+        return [await _post_tasks_async(user_id, api_token, tasks[0])]
+    result = await _post_tasks_async(user_id, api_token, tasks)
+    if result["success"] or result.get("retryable"):
+        return _split_batch_result(result, len(tasks))
+    
+    _rate_limiter.count("batchesSplit")
+    middle = len(tasks) // 2
+    first, second = await asyncio.gather(_post_batch_when_allowed(user_id, api_token, tasks[:middle]),
+                                         _post_batch_when_allowed(user_id, api_token, tasks[middle:]))
+    return first + second
+
+async def _post_batch_when_allowed(user_id, api_token, tasks):
+    """_post_batch once the user's rate limit budget allows it."""
+    wait = _rate_limiter.reserve(user_id)
+    if wait is None:
+        return [_rate_limited_result(user_id)] * len(tasks)
+    await asyncio.sleep(wait)
+    return await _post_batch(user_id, api_token, tasks)
+
+async def _post_tasks_async(user_id, api_token, task_data, passthrough=False):
+    """POST one task, or a list of tasks, to Habitica without rate limiting."""
+    try:
+        response = await _get_async_client().post(
+            "/tasks/user", headers=_task_headers(user_id, api_token), content=_dumps(task_data))
+        result = _handle_task_response(response, user_id, passthrough)
+        _remember_created_tasks(user_id, api_token, result)
+        return result
+    
+    except httpx.TransportError as e:
+        _record_submission_result(False)
+        return {"success": False, "error": f"Request failed: {str(e)}", "retryable": True}
+    except httpx.HTTPStatusError as e:
+        return {"success": False, "error": f"Request failed: {str(e)}",
+                "retryable": _is_retryable_status(e.response.status_code)}
     except Exception as e:
-        return {"success": False, "error": str(e)}
+        return {"success": False, "error": str(e), "retryable": False}
+
+def _split_batch_result(result, count):
+    """
+    Split the result of an array POST into one result per task.
+    
+    Habitica creates the whole array or nothing, so a failure is shared by
+    every task in the batch.
+    """
+    if not result["success"]:
+        return [result] * count
+    
+    data = result["data"]
+    tasks = data.get("data")
+    if not isinstance(tasks, list) or len(tasks) != count:
+        return [{"success": False, "error": "Unexpected response to batched submission",
+                 "retryable": False}] * count
+    return [{"success": True, "data": {**data, "data": task}} for task in tasks]
 
 # =============================================================================
 # ENTRY POINT
 # =============================================================================
 
+_startup_timings["moduleImportSeconds"] = time.perf_counter() - _IMPORT_STARTED
+
 if __name__ == "__main__":
-    print(_replace_weekday_with_date(input(" >> ")))
\ No newline at end of file
+    main()
\ No newline at end of file
@@ -0,0 +1,65 @@
+"""Coalesced submissions that Habitica rejects as an array."""
+
+import asyncio
+import json
+
+import httpx
+
+import script
+
+class _FakeHabitica:
+    """Creates tasks like Habitica: an array all or nothing, refusing titles with "invalid"."""
+    
+    def __init__(self):
+        self.posts = []
+    
+    async def post(self, path, headers=None, content=None):
+        body = json.loads(content)
+        tasks = body if isinstance(body, list) else [body]
+        self.posts.append(len(tasks))
+        request = httpx.Request("POST", "https://habitica.test/api/v3" + path)
+        if any("invalid" in task["text"] for task in tasks):
+            return httpx.Response(400, json={"success": False, "message": "invalid task"},
+                                  request=request)
+        created = [{**task, "id": f"id-{task['text']}"} for task in tasks]
+        return httpx.Response(201, json={"success": True,
+                                         "data": created if isinstance(body, list) else created[0]},
+                              request=request)
+
+def _submit_all(monkeypatch, texts, **limits):
+    habitica = _FakeHabitica()
+    monkeypatch.setattr(script, "_get_async_client", lambda: habitica)
+    monkeypatch.setattr(script, "_rate_limiter", script.RateLimiter(**limits))
+    monkeypatch.setattr(script.asyncio, "sleep", _no_sleep)
+    
+    async def submit():
+        return await asyncio.gather(*(
+            script._send_task_to_habitica_async("user", "token", {"type": "todo", "text": text})
+            for text in texts))
+    return asyncio.run(submit()), habitica
+
+_real_sleep = asyncio.sleep
+
+async def _no_sleep(seconds):
+    # Time isn't simulated: the limiter still counts tokens against max_wait
+    await _real_sleep(0)
+
+def test_rejected_batch_only_fails_the_invalid_task(monkeypatch):
+    texts = [f"task {i}" for i in range(50)]
+    texts[37] = "invalid task"
+    # One token up front goes to the first task; the other 49 wait and coalesce
+    results, habitica = _submit_all(monkeypatch, texts, per_minute=25, burst=1, max_wait=30)
+    
+    assert [result["success"] for result in results] == [text != "invalid task" for text in texts]
+    assert results[37]["retryable"] is False
+    assert results[36]["data"]["data"]["id"] == "id-task 36"
+    # The rejected array of 49 is bisected, not resent task by task
+    assert len(habitica.posts) <= 2 + 2 * 6
+
+def test_retryable_batch_failure_is_shared(monkeypatch):
+    async def unavailable(user_id, api_token, task_data, passthrough=False):
+        return {"success": False, "error": "Request failed: 503", "retryable": True}
+    monkeypatch.setattr(script, "_post_tasks_async", unavailable)
+    results, _ = _submit_all(monkeypatch, ["a", "b", "c"], per_minute=25, burst=1, max_wait=30)
+    
+    assert all(result["retryable"] for result in results)